@@ -0,0 +1,57 @@
+"""
+Measures how many team manifests per second each ManifestTemplate mode can render.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python benchmarks/manifest_template.py
+"""
+
+import os
+import timeit
+
+from engine.docker.compose.handler import DockerComposeManifestHandler
+from engine.docker.images import load_tool_images
+
+TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "templates", "team-template.yml"
+)
+
+TOOL_IMAGES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "templates", "tool-images.yml"
+)
+
+TOOL_IMAGE_VALUES = {
+    variable: image.tag for variable, image in load_tool_images(TOOL_IMAGES_PATH).items()
+}
+
+ROUNDS = 200
+
+
+def team_values(index: int) -> dict[str, str]:
+    return {
+        "teamname": f"team-{index}",
+        "subnet": f"10.{index // 256}.{index % 256}.0/24",
+        "web_ip": f"10.{index // 256}.{index % 256}.2",
+        "proxy_ip": f"10.{index // 256}.{index % 256}.3",
+        "dns_ip": f"10.{index // 256}.{index % 256}.4",
+        **TOOL_IMAGE_VALUES,
+    }
+
+
+def main():
+    handler = DockerComposeManifestHandler()
+
+    for structural in (False, True):
+        template = handler.load(TEMPLATE_PATH, structural=structural)
+
+        counter = iter(range(ROUNDS * 10))
+        elapsed = timeit.timeit(
+            lambda: template.compile(team_values(next(counter))), number=ROUNDS
+        )
+
+        mode = "structural" if structural else "textual"
+        print(f"{mode:>10}: {ROUNDS / elapsed:10.1f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
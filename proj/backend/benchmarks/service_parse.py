@@ -0,0 +1,70 @@
+"""
+Measures how many service specifications per second Service.parse can convert.
+
+The specifications are the services of the shipped compose templates,
+plus one service built from each image directory under templates/services.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python benchmarks/service_parse.py
+"""
+
+import os
+import timeit
+
+import yaml
+
+from engine.docker.compose.manifest import PLACEHOLDER_PATTERN
+from engine.docker.compose.models import Service
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+ROUNDS = 2000
+
+
+def template_specs() -> list[dict]:
+    specs = []
+
+    for name in sorted(os.listdir(TEMPLATES_PATH)):
+        if not name.endswith(".yml"):
+            continue
+
+        with open(os.path.join(TEMPLATES_PATH, name), "r", encoding="utf-8") as f:
+            # placeholders are replaced by their own name, which is enough to parse the template
+            manifest_str = PLACEHOLDER_PATTERN.sub(r"\1", f.read())
+
+        # e.g. tool-images.yml, which is not a compose file
+        services = (yaml.safe_load(manifest_str) or {}).get("services")
+        if not isinstance(services, dict):
+            continue
+
+        specs.extend(services.values())
+
+    services_path = os.path.join(TEMPLATES_PATH, "services")
+
+    for index, name in enumerate(sorted(os.listdir(services_path))):
+        specs.append(
+            {
+                "build": {"context": os.path.join(services_path, name)},
+                "container_name": f"team_{name}",
+                "networks": {"team_net": {"ipv4_address": f"10.0.0.{index + 5}"}},
+                "cap_add": ["NET_ADMIN"],
+                "restart": "unless-stopped",
+            }
+        )
+
+    return specs
+
+
+def main():
+    specs = template_specs()
+
+    elapsed = timeit.timeit(
+        lambda: [Service.parse(spec) for spec in specs], number=ROUNDS
+    )
+
+    print(f"{len(specs)} services: {ROUNDS * len(specs) / elapsed:10.1f} parses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures how long the containers of a team take to get their tools, installing them on every start
+as team-template.yml used to, against running the tool images built from templates/tool-images.yml.
+
+Every round starts a fresh container from each image and waits for its tools to be usable.
+Base images are pulled, and tool images built, before anything is timed:
+the build is a one-time cost, reported on its own.
+
+Needs a Docker daemon with network access. Run from the backend directory:
+
+    PYTHONPATH=src python benchmarks/team_boot.py
+"""
+
+import asyncio
+import os
+import subprocess
+import time
+
+from engine.docker.compose import AsyncDockerCompose
+from engine.docker.images import ToolImage, ToolImageBuilder, load_tool_images
+
+TEAM_COUNTS = [1, 10, 50]
+
+ROUNDS = 3
+
+# the tools a container needs before it can be configured, see Database._route_step
+CHECK = "command -v ip >/dev/null && command -v iptables >/dev/null && command -v curl >/dev/null"
+
+
+def boot(image: str, command: str) -> float:
+    start = time.perf_counter()
+
+    subprocess.run(
+        ["docker", "run", "--rm", "--user", "root", "--entrypoint", "/bin/sh", image, "-c", command],
+        check=True,
+        capture_output=True,
+    )
+
+    return time.perf_counter() - start
+
+
+def boot_installing(image: ToolImage) -> float:
+    # what every container of the template ran before its own command
+    return boot(image.base, f"apt update && apt install -y {' '.join(image.packages)} && {CHECK}")
+
+
+def boot_prebuilt(image: ToolImage) -> float:
+    return boot(image.tag, CHECK)
+
+
+async def build(builder: ToolImageBuilder, image: ToolImage) -> float:
+    start = time.perf_counter()
+
+    await builder.ensure(image.tag)
+
+    return time.perf_counter() - start
+
+
+def main():
+    images = load_tool_images(os.path.join("templates", "tool-images.yml"))
+
+    compose = AsyncDockerCompose()
+    builder = ToolImageBuilder(compose, images.values())
+
+    for image in images.values():
+        subprocess.run(["docker", "pull", "--quiet", image.base], check=True, capture_output=True)
+
+    build_time = sum(asyncio.run(build(builder, image)) for image in images.values())
+
+    installing = sum(
+        min(boot_installing(image) for _ in range(ROUNDS)) for image in images.values()
+    )
+    prebuilt = sum(
+        min(boot_prebuilt(image) for _ in range(ROUNDS)) for image in images.values()
+    )
+
+    print(f"{len(images)} containers per team, tool images built in {build_time:.1f}s (0 when cached)")
+    print(f"{'teams':>6} {'installing s':>13} {'prebuilt s':>11} {'+ build s':>10}")
+
+    for team_count in TEAM_COUNTS:
+        print(
+            f"{team_count:>6} {installing * team_count:>13.1f} {prebuilt * team_count:>11.1f}"
+            f" {prebuilt * team_count + build_time:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measures how the latency of listing teams grows with the number of teams.
+
+Every team references SERVICES_PER_TEAM services from a catalog of 40.
+The collections live in a local mongod when MONGODB_URI is set,
+and in mongomock (pip install mongomock) otherwise.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python benchmarks/team_listing.py
+"""
+
+from datetime import datetime
+import os
+import time
+
+from bson import DBRef, ObjectId
+
+from api.db import Database, ServiceCatalog
+
+TEAM_COUNTS = [10, 50, 200, 500]
+
+SERVICES_PER_TEAM = 8
+
+ROUNDS = 5
+
+
+def make_database() -> Database:
+    uri = os.getenv("MONGODB_URI")
+
+    if uri:
+        from pymongo import MongoClient
+
+        client = MongoClient(uri)
+    else:
+        import mongomock
+
+        client = mongomock.MongoClient()
+
+    client.drop_database("team_listing_benchmark")
+    db = client["team_listing_benchmark"]
+
+    # only the collections are needed, not the compose and IPAM machinery set up by the constructor
+    database = Database.__new__(Database)
+    database.team_collection = db["teams"]
+    database.service_collection = db["services"]
+    database.catalog = ServiceCatalog(database.service_collection)
+
+    return database
+
+
+def populate(database: Database, team_count: int):
+    database.team_collection.delete_many({})
+    database.service_collection.delete_many({})
+
+    service_ids = database.service_collection.insert_many(
+        [
+            {"name": f"service {index}", "slug": f"service-{index}", "image": "nginx", "tag": "Web"}
+            for index in range(40)
+        ]
+    ).inserted_ids
+
+    database.team_collection.insert_many(
+        [
+            {
+                "_id": ObjectId(),
+                "name": f"team {index}",
+                "cidr": f"10.{index // 256}.{index % 256}.0/24",
+                "services": [
+                    {
+                        "ref": DBRef(collection="services", id=str(service_ids[(index + offset) % len(service_ids)])),
+                        "deployed_at": datetime.now(),
+                        "ip_address": f"10.{index // 256}.{index % 256}.{offset + 5}",
+                    }
+                    for offset in range(SERVICES_PER_TEAM)
+                ],
+            }
+            for index in range(team_count)
+        ]
+    )
+
+
+def main():
+    database = make_database()
+
+    print(f"{'teams':>6} {'ms / GET /team/':>16} {'ms / team':>10}")
+
+    for team_count in TEAM_COUNTS:
+        populate(database, team_count)
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            teams = database.get_teams()
+        elapsed = (time.perf_counter() - start) / ROUNDS
+
+        assert len(teams) == team_count
+
+        print(f"{team_count:>6} {elapsed * 1000:>16.2f} {elapsed * 1000 / team_count:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
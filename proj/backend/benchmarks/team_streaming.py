@@ -0,0 +1,83 @@
+"""
+Measures the peak memory of listing every team at once, against streaming them page by page.
+
+Every team references SERVICES_PER_TEAM services. The collections live in mongomock
+(pip install mongomock), and teams are read through the threaded data layer.
+Peaks are measured with tracemalloc, so they only count Python allocations.
+
+mongomock copies the whole collection to evaluate any query, which a MongoDB server does on its side,
+so the peak of a bare page query is subtracted from the streamed peak.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python benchmarks/team_streaming.py
+"""
+
+import asyncio
+import json
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from api.async_db import ThreadedDatabase
+from api.db import Database
+from api.streaming import encode_json_array
+
+from team_listing import make_database, populate, SERVICES_PER_TEAM
+
+TEAM_COUNTS = [500, 1000, 2000]
+
+BATCH_SIZE = 100
+
+
+async def list_at_once(db: ThreadedDatabase, team_count: int) -> int:
+    teams, _ = await db.find_teams(limit=team_count)
+
+    # what FastAPI does with the list returned by a route
+    return len(json.dumps(jsonable_encoder(teams)))
+
+
+async def list_streamed(db: ThreadedDatabase) -> int:
+    size = 0
+
+    async for chunk in encode_json_array(db.iter_teams(batch_size=BATCH_SIZE)):
+        size += len(chunk)
+
+    return size
+
+
+async def query_page(db: ThreadedDatabase) -> int:
+    return len(list(db.database.team_collection.find({}).sort("_id", 1).limit(BATCH_SIZE + 1)))
+
+
+def peak(coroutine) -> tuple[int, float]:
+    tracemalloc.start()
+
+    size = asyncio.run(coroutine)
+
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size, peak_size / 2**20
+
+
+def main():
+    database: Database = make_database()
+    db = ThreadedDatabase(database)
+
+    print(f"{SERVICES_PER_TEAM} services per team, pages of {BATCH_SIZE} teams when streaming")
+    print(f"{'teams':>6} {'response MB':>12} {'at once MB':>11} {'streamed MB':>12}")
+
+    for team_count in TEAM_COUNTS:
+        populate(database, team_count)
+
+        _, at_once = peak(list_at_once(db, team_count))
+        size, streamed = peak(list_streamed(db))
+        _, query = peak(query_page(db))
+        streamed -= query
+
+        print(f"{team_count:>6} {size / 2**20:>12.1f} {at_once:>11.1f} {streamed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
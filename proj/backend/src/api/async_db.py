@@ -0,0 +1,232 @@
+"""
+Awaitable access to the teams and services read by the API routes.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Iterable, Optional
+import asyncio
+import os
+
+from bson import ObjectId
+
+from engine.models.network import CIDR
+
+from .db import Database, Service, Team, TeamCreationRequestPayload, split_page, team_query
+
+
+class AsyncDatabase(ABC):
+    """
+    Abstract class for the reads the API routes await, so that queries never block the event loop.
+
+    Every read takes at most `timeout` seconds, raising TimeoutError when it runs out.
+    Team specs are validated, and subnets suggested, in worker threads as well.
+    Writes, and everything else, stay with the synchronous `Database`.
+    """
+
+    def __init__(self, database: Database, timeout: Optional[float] = None):
+        self.database = database
+        self.timeout = timeout
+
+    @abstractmethod
+    async def find_teams(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        name_prefix: Optional[str] = None,
+        within: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> tuple[list[Team] | list[dict[str, Any]], Optional[str]]:
+        """Get a page of teams. See `Database.find_teams`."""
+
+    async def iter_teams(
+        self,
+        after: Optional[str] = None,
+        batch_size: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        name_prefix: Optional[str] = None,
+        within: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> AsyncIterator[list[Team] | list[dict[str, Any]]]:
+        """Get all the teams matching the filters of `find_teams`, one page of `batch_size` teams at a time.
+
+        Every page is a query of its own, resuming after the last team of the previous one,
+        so only a single page is ever held in memory.
+        """
+
+        if fields is not None:
+            fields = list(fields)
+
+        while True:
+            teams, after = await self.find_teams(after, batch_size, fields, name_prefix, within, contains)
+
+            yield teams
+
+            if after is None:
+                return
+
+    @abstractmethod
+    async def get_team(self, team_id: str) -> Optional[Team]:
+        """Get a team by id."""
+
+    async def get_services(self) -> list[Service]:
+        """Get all services."""
+
+        return await self._to_thread(self.database.get_services)
+
+    async def get_services_by_tag(self) -> dict[Optional[str], list[Service]]:
+        """Get all services, grouped by tag."""
+
+        return await self._to_thread(self.database.get_services_by_tag)
+
+    async def get_service(self, service_id: str) -> Optional[Service]:
+        """Get a service by id."""
+
+        return await self._to_thread(self.database.get_service, service_id)
+
+    async def get_service_by_slug(self, slug: str) -> Optional[Service]:
+        """Get a service by slug."""
+
+        return await self._to_thread(self.database.get_service_by_slug, slug)
+
+    async def validate_team_spec(self, team_spec: TeamCreationRequestPayload):
+        """Checks that a team can be created. See `Database.validate_team_spec`."""
+
+        await self._to_thread(self.database.validate_team_spec, team_spec)
+
+    async def validate_team_specs(self, team_specs: list[TeamCreationRequestPayload]):
+        """Checks that teams can all be created together. See `Database.validate_team_specs`."""
+
+        await self._to_thread(self.database.validate_team_specs, team_specs)
+
+    async def suggest_team_cidr(self, mask_size: int) -> Optional[CIDR]:
+        """Get the lowest free subnet of the given size inside the organization subnet."""
+
+        return await self._to_thread(self.database.suggest_team_cidr, mask_size)
+
+    async def close(self):
+        """Releases the connections held by this data layer."""
+
+    async def _to_thread(self, function, *args):
+        # services come from the catalog, which only queries MongoDB when it reloads,
+        # and validations check the in-memory CIDR index, besides a few lookups by id
+        async with asyncio.timeout(self.timeout):
+            return await asyncio.to_thread(function, *args)
+
+
+class ThreadedDatabase(AsyncDatabase):
+    """
+    Runs the reads of the synchronous `Database` in worker threads, keeping the event loop free.
+
+    A timeout stops waiting for a query right away, but the query runs to completion in its thread.
+    """
+
+    async def find_teams(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        name_prefix: Optional[str] = None,
+        within: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> tuple[list[Team] | list[dict[str, Any]], Optional[str]]:
+        return await self._to_thread(
+            self.database.find_teams, after, limit, fields, name_prefix, within, contains
+        )
+
+    async def get_team(self, team_id: str) -> Optional[Team]:
+        return await self._to_thread(self.database.get_team, team_id)
+
+
+class MotorDatabase(AsyncDatabase):
+    """
+    Queries teams with Motor, the asyncio driver for MongoDB, over its own connection pool.
+
+    Timeouts are enforced by the server as well, through the driver's timeoutMS,
+    so queries that ran out of time do not linger there.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        uri: str,
+        db_name: str,
+        pool_size: int = 100,
+        timeout: Optional[float] = None,
+    ):
+        super().__init__(database, timeout)
+
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        self.client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=pool_size,
+            timeoutMS=int(timeout * 1000) if timeout is not None else None,
+        )
+        self.team_collection = self.client[db_name][database.team_collection.name]
+
+    async def find_teams(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        name_prefix: Optional[str] = None,
+        within: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> tuple[list[Team] | list[dict[str, Any]], Optional[str]]:
+        query, projection = team_query(after, fields, name_prefix, within, contains)
+
+        async with asyncio.timeout(self.timeout):
+            # one more than asked for, to know whether there is a next page
+            documents = await self.team_collection.find(query, projection).sort("_id", 1).to_list(limit + 1)
+
+        documents, next_cursor = split_page(documents, limit)
+
+        return await self._to_thread(self.database.teams_from_documents, documents, projection), next_cursor
+
+    async def get_team(self, team_id: str) -> Optional[Team]:
+        async with asyncio.timeout(self.timeout):
+            document = await self.team_collection.find_one(ObjectId(team_id))
+
+        if not document:
+            return None
+
+        return (await self._to_thread(self.database.teams_from_documents, [document]))[0]
+
+    async def close(self):
+        self.client.close()
+
+
+def get_async_database(name: Optional[str], database: Database) -> AsyncDatabase:
+    """Get the awaitable data layer by name.
+
+    Args:
+        name (Optional[str]): either "async", using Motor, or "sync", using the synchronous client in worker threads.
+            Taken from DATABASE_DRIVER when not given.
+        database (Database): the synchronous data layer, shared by both
+
+    Returns:
+        AsyncDatabase: the data layer
+
+    Raises:
+        ValueError: if there is no data layer with the given name
+    """
+
+    if name is None:
+        name = os.getenv("DATABASE_DRIVER", "async")
+
+    timeout = float(os.getenv("MONGODB_QUERY_TIMEOUT", "10"))
+
+    match name:
+        case "async":
+            return MotorDatabase(
+                database,
+                os.getenv("MONGODB_URI"),
+                os.getenv("MONGODB_DB_NAME"),
+                pool_size=int(os.getenv("MONGODB_POOL_SIZE", "100")),
+                timeout=timeout,
+            )
+        case "sync":
+            return ThreadedDatabase(database, timeout)
+        case _:
+            raise ValueError(f"Unknown database driver: {name}")
@@ -1,30 +1,51 @@
 """
 """
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Literal, Optional
 from datetime import datetime
+import asyncio
 import os
-import subprocess
-import shlex
+import re
+import threading
+import time
+import traceback
 
 from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 from bson import ObjectId
 from bson import DBRef
 from pydantic import BaseModel
 
 from dotenv import load_dotenv
-from engine.docker.compose import DockerCompose
+from engine.docker.compose import AsyncDockerCompose
 from engine.docker.compose.handler import DockerComposeManifestHandler
+from engine.docker.compose.manifest import Manifest
 from engine.docker.compose.models.service import NetworkSpec as DockerNetworkSpec
 from engine.docker.compose.models.service import Service as DockerService
+from engine.docker.images import ToolImageBuilder, load_tool_images
 
 # FIXME: yikes...
 interface_no = 1
 
 # Importing Network, CIDR, IPAddress
-from engine.models.network import CIDR, Network
+from engine.models.network import CIDR, IPAddress, Network, CIDRIndex
+
+from .ipam import IPAMStore
+from .provisioning import PostProvisionExecutor, Step, StepResult
+from .jobs import JobContext
+from .events import EventBus
 
 load_dotenv()  # Load environment variables from .env file
 
+# seconds to wait for docker compose, and for single docker commands
+COMPOSE_TIMEOUT = float(os.getenv("COMPOSE_TIMEOUT", "600"))
+EXEC_TIMEOUT = float(os.getenv("EXEC_TIMEOUT", "30"))
+
+# how many teams of a batch are provisioned at the same time, and the seconds a whole batch may take
+BULK_PARALLELISM = int(os.getenv("TEAM_BULK_PARALLELISM", "4"))
+BULK_TIMEOUT = float(os.getenv("TEAM_BULK_TIMEOUT", "3600"))
+
 # FIXME: THIS FILE DOES TO MUCH BUT I CAN'T BE ARSED RIGHT NOW
 
 
@@ -38,7 +59,7 @@ class Service(BaseModel):
     description: Optional[str] = None
     image: Optional[str] = None
     tag: Optional[str] = None
-    deployedAt: Optional[str] = None
+    deployedAt: Optional[datetime] = None
     ipAddress: Optional[str] = None
 
 
@@ -52,6 +73,36 @@ class TeamCreationRequestPayload(BaseModel):
     cidr: str
     services: List[str]
 
+
+class TeamServicePayload(BaseModel):
+    """Model representing a service to add to a running team."""
+
+    slug: str
+
+
+class TeamCreationResult(BaseModel):
+    """Model representing the outcome of creating one team of a batch."""
+
+    name: str
+    team_id: str
+    status: Literal["created", "failed"]
+    error: Optional[str] = None
+
+
+@dataclass(kw_only=True)
+class _PreparedTeam:
+    """A validated team, with its addresses allocated, that is ready to be stored and provisioned."""
+
+    team_id: ObjectId
+    name: str
+    cidr: CIDR
+    network: Network
+    network_name: str
+    router_ip: IPAddress
+    document: dict[str, Any]
+    manifest: Manifest
+
+
 class Team(BaseModel):
     """Model representing a team."""
 
@@ -62,6 +113,271 @@ class Team(BaseModel):
     services: List[Service]
     createdAt: Optional[datetime] = None
     updatedAt: Optional[datetime] = None
+    provisionedAt: Optional[datetime] = None
+
+
+def _parse_cidr(cidr: str) -> CIDR:
+    """Parses a CIDR, or a single address as a /32."""
+
+    return CIDR.from_string(cidr if "/" in cidr else f"{cidr}/32")
+
+
+def _cidr_bounds(cidr: CIDR) -> dict[str, int]:
+    """The first and last address of a subnet as integers, stored with teams so that they can be filtered by subnet."""
+
+    return {"cidr_start": int(cidr.network_address), "cidr_end": int(cidr.broadcast_address)}
+
+
+def team_query(
+    after: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    name_prefix: Optional[str] = None,
+    within: Optional[str] = None,
+    contains: Optional[str] = None,
+) -> tuple[dict[str, Any], Optional[dict[str, int]]]:
+    """Builds the query and projection listing teams, as described by `Database.find_teams`.
+
+    Returns:
+        tuple[dict[str, Any], Optional[dict[str, int]]]: the query, and the projection, None for all fields
+
+    Raises:
+        ValueError: if the cursor, a field, or a CIDR is not valid
+    """
+
+    conditions = []
+
+    if after is not None:
+        if not ObjectId.is_valid(after):
+            raise ValueError(f"Invalid cursor: {after}")
+
+        conditions.append({"_id": {"$gt": ObjectId(after)}})
+
+    if name_prefix:
+        conditions.append({"name": {"$regex": f"^{re.escape(name_prefix)}"}})
+
+    if within is not None:
+        bounds = _cidr_bounds(_parse_cidr(within))
+        conditions.append({"cidr_start": {"$gte": bounds["cidr_start"]}, "cidr_end": {"$lte": bounds["cidr_end"]}})
+
+    if contains is not None:
+        bounds = _cidr_bounds(_parse_cidr(contains))
+        conditions.append({"cidr_start": {"$lte": bounds["cidr_start"]}, "cidr_end": {"$gte": bounds["cidr_end"]}})
+
+    projection = None
+
+    if fields is not None:
+        fields = set(fields) - {"id"}
+
+        unknown = fields - Team.model_fields.keys()
+        if unknown:
+            raise ValueError(f"Unknown team fields: {", ".join(sorted(unknown))}")
+
+        projection = {"_id": 1, **{field: 1 for field in fields}}
+
+    return ({"$and": conditions} if conditions else {}), projection
+
+
+def split_page(documents: list[dict], limit: int) -> tuple[list[dict], Optional[str]]:
+    """Splits the documents fetched for a page, `limit` + 1 of them at most, into the page and the cursor of the next one."""
+
+    next_cursor = str(documents[limit - 1]["_id"]) if len(documents) > limit else None
+
+    return documents[:limit], next_cursor
+
+
+class _CatalogSnapshot:
+    """The whole service catalog as loaded at one point in time, indexed for lookups."""
+
+    def __init__(self, services: list[Service], version: Optional[str]):
+        self.services = services
+        self.by_id = {service.id: service for service in services}
+        self.by_slug = {service.slug: service for service in services}
+
+        self.by_tag: dict[Optional[str], list[Service]] = {}
+        for service in services:
+            self.by_tag.setdefault(service.tag, []).append(service)
+
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+
+class ServiceCatalog:
+    """
+    Read-through cache of the services collection, a small catalog that rarely changes.
+
+    The whole catalog is loaded at once and kept for at most `ttl` seconds.
+    Once started, it is also dropped as soon as the collection changes: through a change stream
+    when MongoDB offers one (replica sets), or else by polling the collection's hash every `poll_interval` seconds.
+    Lookups of services missing from the cache fall back to the collection and cause a reload.
+    """
+
+    def __init__(self, collection: Collection, ttl: float = 300, poll_interval: float = 5):
+        self.collection = collection
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+
+        self._snapshot: Optional[_CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+        # bumped by every invalidation, so that a load started before one is not kept
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts watching the collection for changes, in a background thread."""
+
+        self._stopped.clear()
+        self._watcher = threading.Thread(target=self._watch, name="service-catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """Stops watching the collection. The cache then only expires through its TTL."""
+
+        self._stopped.set()
+
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval)
+            self._watcher = None
+
+    def invalidate(self):
+        """Drops the cached catalog, so that the next lookup reloads it."""
+
+        with self._generation_lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def all(self) -> list[Service]:
+        """Get all services."""
+
+        return [service.model_copy() for service in self._get_snapshot().services]
+
+    def by_tag(self) -> dict[Optional[str], list[Service]]:
+        """Get all services, grouped by tag."""
+
+        return {
+            tag: [service.model_copy() for service in services]
+            for tag, services in self._get_snapshot().by_tag.items()
+        }
+
+    def get(self, service_id: str) -> Optional[Service]:
+        """Get a service by id."""
+
+        return self.get_many([service_id]).get(str(service_id))
+
+    def get_by_slug(self, slug: str) -> Optional[Service]:
+        """Get a service by slug."""
+
+        service = self._get_snapshot().by_slug.get(slug)
+
+        if service is None and self.collection.find_one({"slug": slug}, {"_id": 1}) is not None:
+            self.invalidate()
+            service = self._get_snapshot().by_slug.get(slug)
+
+        return service.model_copy() if service is not None else None
+
+    def get_many(self, service_ids: Iterable[str]) -> dict[str, Service]:
+        """Get the services with the given ids, leaving out those that do not exist.
+
+        Returns:
+            dict[str, Service]: the services found, by id
+        """
+
+        snapshot = self._get_snapshot()
+
+        services = {}
+        missing = set()
+
+        for service_id in map(str, service_ids):
+            if service_id in snapshot.by_id:
+                services[service_id] = snapshot.by_id[service_id]
+            elif ObjectId.is_valid(service_id):
+                missing.add(service_id)
+
+        # added since the catalog was loaded, and not noticed yet
+        if missing and self.collection.find_one({"_id": {"$in": [ObjectId(service_id) for service_id in missing]}}, {"_id": 1}):
+            self.invalidate()
+            snapshot = self._get_snapshot()
+
+            services.update({service_id: snapshot.by_id[service_id] for service_id in missing if service_id in snapshot.by_id})
+
+        return {service_id: service.model_copy() for service_id, service in services.items()}
+
+    def _get_snapshot(self) -> _CatalogSnapshot:
+        snapshot = self._snapshot
+
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            # another thread may have reloaded it while this one waited
+            with self._generation_lock:
+                snapshot, generation = self._snapshot, self._generation
+
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.ttl:
+                snapshot = self._load()
+
+                # the collection changed while it was loaded: this caller may use what it read, but it is not kept
+                with self._generation_lock:
+                    if self._generation == generation:
+                        self._snapshot = snapshot
+
+        return snapshot
+
+    def _load(self) -> _CatalogSnapshot:
+        version = self._version()
+
+        services = []
+
+        for service in self.collection.find():
+            service["id"] = str(service["_id"])
+            del service["_id"]
+
+            services.append(Service(**service))
+
+        return _CatalogSnapshot(services, version)
+
+    def _version(self) -> Optional[str]:
+        """Get a stamp of the collection's contents, or None if the server cannot compute one."""
+
+        try:
+            result = self.collection.database.command("dbHash", collections=[self.collection.name])
+        except Exception:
+            return None
+
+        return result.get("collections", {}).get(self.collection.name)
+
+    def _watch(self):
+        while not self._stopped.is_set():
+            try:
+                with self.collection.watch(max_await_time_ms=1000) as stream:
+                    while not self._stopped.is_set():
+                        if stream.try_next() is not None:
+                            self.invalidate()
+            except OperationFailure:
+                # standalone servers have no change streams
+                self._poll()
+                return
+            except Exception:
+                traceback.print_exc()
+
+                # changes may have been missed while the stream was down
+                self.invalidate()
+                self._stopped.wait(self.poll_interval)
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            snapshot = self._snapshot
+
+            if snapshot is None or snapshot.version is None:
+                continue
+
+            try:
+                if self._version() != snapshot.version:
+                    self.invalidate()
+            except Exception:
+                traceback.print_exc()
 
 class Database:
     """Class for managing database interactions with MongoDB."""
@@ -76,69 +392,248 @@ class Database:
         self.client = MongoClient(uri)
         self.db = self.client[db_name]
 
+        # _id is always indexed, only the team listing filters need their own indexes
         self.team_collection = self.db["teams"]
-        self.team_collection.create_index({"_id": 1})
+        self.team_collection.create_index({"name": 1})
+        self.team_collection.create_index({"cidr_start": 1, "cidr_end": 1})
 
         self.service_collection = self.db["services"]
-        self.service_collection.create_index({"_id": 1})
 
-        self.compose = DockerCompose()
+        self.catalog = ServiceCatalog(
+            self.service_collection,
+            ttl=float(os.getenv("SERVICE_CATALOG_TTL", "300")),
+            poll_interval=float(os.getenv("SERVICE_CATALOG_POLL_INTERVAL", "5")),
+        )
+
+        self.events = EventBus(max_queue_size=int(os.getenv("EVENT_QUEUE_SIZE", "100")))
+
+        self.compose = AsyncDockerCompose(listener=self.events.publish)
+        self.post_provision = PostProvisionExecutor(
+            self.compose,
+            max_workers=int(os.getenv("POST_PROVISION_WORKERS", "8")),
+            timeout=EXEC_TIMEOUT,
+        )
         self.handler = DockerComposeManifestHandler()
 
-        self.manifest_template = self.handler.load(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "templates", "team-template.yml")) # FIXME: black magic
+        self.ipam = IPAMStore(self.db["ipam"])
+        self._cidr_index: Optional[CIDRIndex] = None
+
+        # the index is read by validations in worker threads while jobs update it, see AsyncDatabase
+        self._cidr_lock = threading.RLock()
+
+        # jobs allocate and release the addresses of a team from worker threads
+        self._ipam_lock = threading.Lock()
+
+        self._migrate()
+
+        self.manifest_template = self.handler.load(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "templates", "team-template.yml"), structural=True) # FIXME: black magic
+
+        # the images of the team template, with their tools installed at build time rather than on every start
+        self.tool_images = load_tool_images(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "templates", "tool-images.yml"))
+        self.tool_image_builder = ToolImageBuilder(self.compose, self.tool_images.values())
+
+    def _team_manifest_vars(self, team_name_escaped: str, team_subnet_cidr: CIDR, addresses: dict[str, IPAddress]) -> dict[str, str]:
+        """Builds the variables used to compile the team manifest template."""
+
+        return {
+            "teamname": team_name_escaped,
+            "subnet": str(team_subnet_cidr),
+            "web_ip": str(addresses["web_ip"]),
+            "proxy_ip": str(addresses["proxy_ip"]),
+            "dns_ip": str(addresses["dns_ip"]),
+            **{variable: image.tag for variable, image in self.tool_images.items()},
+        }
+
+    def _get_team_addresses(self, team_id: str) -> dict[str, IPAddress]:
+        """Get the infrastructure addresses (gateway, web, proxy, dns, router) allocated to a team."""
+
+        team = self.team_collection.find_one(ObjectId(team_id), {"addresses": 1})
+
+        return {name: IPAddress.from_string(address) for name, address in team["addresses"].items()}
+
+    @property
+    def cidr_index(self) -> CIDRIndex:
+        """Index of the CIDRs allocated to teams inside the organization subnet.
+
+        Built from the team documents on first use, not at startup, and kept up to date on team creation and deletion.
+        The index is not thread-safe: it must only be used while holding `_cidr_lock`.
+        """
+
+        with self._cidr_lock:
+            if self._cidr_index is None:
+                cidr_index = CIDRIndex(CIDR.from_string(os.getenv("ORG_SUBNET")))
+
+                for team in self.team_collection.find({}, {"cidr": 1}):
+                    team_subnet_cidr = CIDR.from_string(team["cidr"])
+
+                    # teams created before admission checks existed may not fit the index
+                    if cidr_index.within_supernet(team_subnet_cidr) and not cidr_index.overlaps(team_subnet_cidr):
+                        cidr_index.add(team_subnet_cidr)
+
+                self._cidr_index = cidr_index
+
+        return self._cidr_index
+
+    def suggest_team_cidr(self, mask_size: int) -> Optional[CIDR]:
+        """Get the lowest free subnet of the given size inside the organization subnet."""
+
+        with self._cidr_lock:
+            return self.cidr_index.next_free(mask_size)
+
+    def get_team_images(self) -> list[str]:
+        """Get the images teams can be made of: those of the team template, then those of the catalog services."""
+
+        template_services = self.manifest_template.compile({
+            "teamname": 0,
+            "subnet": 0,
+            "web_ip": 0,
+            "proxy_ip": 0,
+            "dns_ip": 0,
+            **{variable: image.tag for variable, image in self.tool_images.items()},
+        }).services
+
+        images = [service.image for service in template_services.values()]
+        images += [service.image for service in self.get_services()]
+
+        return list(dict.fromkeys(image for image in images if image))
 
     def get_services(self) -> list[Service]:
         """Get all services."""
 
-        services = []
+        return self.catalog.all()
 
-        for service in self.service_collection.find():
-            service["id"] = str(service["_id"])
-            del service["_id"]
-
-            services.append(Service(**service))
+    def get_services_by_tag(self) -> dict[Optional[str], list[Service]]:
+        """Get all services, grouped by tag."""
 
-        return services
+        return self.catalog.by_tag()
 
     def get_service(self, service_id: int) -> Optional[Service]:
         """Get a service by id."""
 
-        service = self.service_collection.find_one(ObjectId(service_id))
+        return self.catalog.get(service_id)
 
-        if not service:
-            return None
+    def get_service_by_slug(self, slug: str) -> Optional[Service]:
+        """Get a service by slug."""
+
+        return self.catalog.get_by_slug(slug)
+
+    def _migrate(self):
+        """Brings the documents stored by earlier versions up to date.
+
+        Every migration runs once: the number of migrations applied is stored in the `meta` collection,
+        so that starting an up-to-date database does not scan the teams.
+        """
+
+        migrations = [self._add_cidr_bounds, self._add_team_addresses]
+
+        meta_collection = self.db["meta"]
+
+        schema = meta_collection.find_one({"_id": "schema"}) or {}
+        version = schema.get("version", 0)
+
+        for number, migration in enumerate(migrations[version:], start=version + 1):
+            migration()
+
+            meta_collection.update_one({"_id": "schema"}, {"$set": {"version": number}}, upsert=True)
+
+    def _add_cidr_bounds(self):
+        """Stores the first and last address of their subnet as integers in teams created without them."""
+
+        for team in self.team_collection.find({"cidr_start": {"$exists": False}}, {"cidr": 1}):
+            self.team_collection.update_one({"_id": team["_id"]}, {"$set": _cidr_bounds(CIDR.from_string(team["cidr"]))})
+
+    def _add_team_addresses(self):
+        """Stores the infrastructure addresses, and the address management state, of teams created without them.
+
+        Addresses are allocated again in the order teams were created with: the gateway, web, proxy
+        and dns addresses, one address per service, then the router address.
+        """
+
+        for team in self.team_collection.find({"addresses": {"$exists": False}}, {"name": 1, "cidr": 1, "services": 1}):
+            team_network = Network(f"{team['name'].replace(' ', '-')}-network", cidr=CIDR.from_string(team["cidr"]))
+
+            addresses = {
+                "gateway_ip": team_network.next_host_address(),
+                "web_ip": team_network.next_host_address(),
+                "proxy_ip": team_network.next_host_address(),
+                "dns_ip": team_network.next_host_address(),
+            }
+
+            for _ in team.get("services", []):
+                team_network.next_host_address()
+
+            addresses["router_ip"] = team_network.next_host_address()
 
-        service["id"] = str(service["_id"])
-        del service["_id"]
+            if self.ipam.get(team["_id"]) is None:
+                self.ipam.create(team["_id"], team_network)
 
-        return Service(**service)
+            self.team_collection.update_one(
+                {"_id": team["_id"]},
+                {"$set": {"addresses": {name: str(address) for name, address in addresses.items()}}},
+            )
 
-    def get_teams(self) -> list[Service]:
+    def get_teams(self) -> list[Team]:
         """Get all teams."""
 
-        teams = []
+        return self._to_teams(list(self.team_collection.find()))
 
-        for team in self.team_collection.find():
-            team["id"] = str(team["_id"])
-            del team["_id"]
+    def find_teams(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        name_prefix: Optional[str] = None,
+        within: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> tuple[list[Team] | list[dict[str, Any]], Optional[str]]:
+        """Get a page of teams, in creation order.
 
-            services = []
-            for service in team["services"]:
+        Args:
+            after (Optional[str]): the cursor returned with the previous page, None for the first page
+            limit (int): the maximum number of teams in the page
+            fields (Optional[Iterable[str]]): the Team fields to return, all of them when None. The id is always returned.
+            name_prefix (Optional[str]): only return teams whose name starts with this prefix
+            within (Optional[str]): only return teams whose subnet lies inside this CIDR
+            contains (Optional[str]): only return teams whose subnet contains this address or CIDR
 
-                service_ref = service["ref"]
-                deployed_at = service["deployed_at"]
-                ip_address = service["ip_address"]
+        Returns:
+            tuple[list[Team] | list[dict[str, Any]], Optional[str]]: the teams, as Team models when
+                all fields are requested and as dictionaries otherwise, and the cursor of the next page,
+                None if this is the last one
 
-                service = self.get_service(service_ref.id)
-                service.deployedAt = deployed_at
-                service.ipAddress = ip_address
+        Raises:
+            ValueError: if the cursor, a field, or a CIDR is not valid
+        """
 
-                services.append(service)
+        query, projection = team_query(after, fields, name_prefix, within, contains)
 
-            team["services"] = services
-            teams.append(Team(**team))
+        # one more than asked for, to know whether there is a next page
+        documents = list(self.team_collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+
+        documents, next_cursor = split_page(documents, limit)
+
+        return self.teams_from_documents(documents, projection), next_cursor
+
+    def teams_from_documents(
+        self, documents: list[dict], projection: Optional[dict[str, int]] = None
+    ) -> list[Team] | list[dict[str, Any]]:
+        """Builds the teams returned by `find_teams` from the documents matched by its query.
+
+        Args:
+            documents (list[dict]): the team documents, fetched with the given projection
+            projection (Optional[dict[str, int]]): the projection built by `team_query`
+
+        Returns:
+            list[Team] | list[dict[str, Any]]: Team models without a projection, dictionaries of the projected fields otherwise
+        """
 
-        return teams
+        if projection is None:
+            return self._to_teams(documents)
+
+        if "services" in projection:
+            self._join_services(documents)
+
+        return [{"id": str(team.pop("_id")), **team} for team in documents]
 
     def get_team(self, team_id: int) -> Optional[Team]:
         """Get a team by id."""
@@ -148,46 +643,168 @@ class Database:
         if not team:
             return None
 
-        team["id"] = str(team["_id"])
-        del team["_id"]
+        return self._to_teams([team])[0]
 
-        services = []
-        for service in team["services"]:
+    def _to_teams(self, teams: list[dict]) -> list[Team]:
+        """Builds Team models from team documents.
 
-            service_ref = service["ref"]
-            deployed_at = service["deployed_at"]
-            ip_address = service["ip_address"]
+        The services referenced by all the teams are looked up in the catalog at once and joined in memory.
+        References to services that no longer exist are left out.
+        """
 
-            service = self.get_service(str(service_ref.id))
-            service.deployedAt = deployed_at
-            service.ipAddress = ip_address
+        self._join_services(teams)
 
-            services.append(service)
+        result = []
 
-        team["services"] = services
+        for team in teams:
+            team["id"] = str(team["_id"])
+            del team["_id"]
 
-        return Team(**team)
+            result.append(Team(**team))
 
-    def create_team(self, team_spec: TeamCreationRequestPayload) -> Team:
-        """Add a team to an existing organization."""
+        return result
+
+    def _join_services(self, teams: list[dict]):
+        """Replaces the service references of team documents by the services they point to."""
+
+        services_by_id = self.catalog.get_many(
+            str(service["ref"].id) for team in teams for service in team["services"]
+        )
+
+        for team in teams:
+            services = []
+            for service in team["services"]:
+
+                team_service = services_by_id.get(str(service["ref"].id))
+
+                if team_service is None:
+                    continue
+
+                services.append(
+                    team_service.model_copy(
+                        update={"deployedAt": service["deployed_at"], "ipAddress": service["ip_address"]}
+                    )
+                )
+
+            team["services"] = services
+
+    def validate_team_spec(self, team_spec: TeamCreationRequestPayload) -> CIDR:
+        """Check that a team can be created with the given specification, returning its subnet."""
 
         team_subnet_cidr = CIDR.from_string(team_spec.cidr)
 
-        team_name_escaped = team_spec.name.replace(' ', '-')
+        with self._cidr_lock:
+            if not self.cidr_index.within_supernet(team_subnet_cidr):
+                raise ValueError(f"{team_subnet_cidr} does not belong to the organization subnet {self.cidr_index.supernet}")
+
+            overlap = self.cidr_index.find_overlap(team_subnet_cidr)
+
+        if overlap is not None:
+            raise ValueError(f"{team_subnet_cidr} overlaps the subnet {overlap} of an existing team")
+
+        return team_subnet_cidr
+
+    def validate_team_specs(self, team_specs: list[TeamCreationRequestPayload]) -> list[CIDR]:
+        """Check that all the given teams can be created together, returning their subnets.
+
+        Raises:
+            ValueError: if a team cannot be created, or two teams share a name or overlapping subnets
+        """
+
+        if not team_specs:
+            raise ValueError("No teams to create")
+
+        batch_index = CIDRIndex(self.cidr_index.supernet)
+        names = set()
+
+        team_subnet_cidrs = []
+
+        for team_spec in team_specs:
+            try:
+                team_subnet_cidr = self.validate_team_spec(team_spec)
+            except ValueError as e:
+                raise ValueError(f"Team {team_spec.name}: {e}") from e
+
+            if team_spec.name in names:
+                raise ValueError(f"Team {team_spec.name} appears more than once")
+
+            overlap = batch_index.find_overlap(team_subnet_cidr)
+            if overlap is not None:
+                raise ValueError(f"Team {team_spec.name}: {team_subnet_cidr} overlaps the subnet {overlap} of another new team")
+
+            names.add(team_spec.name)
+            batch_index.add(team_subnet_cidr)
+            team_subnet_cidrs.append(team_subnet_cidr)
 
-        team_network_name = f"{team_name_escaped}_net"
+        return team_subnet_cidrs
+
+    def _team_service(self, team_name_escaped: str, service: Service, ip_address: str) -> tuple[str, DockerService]:
+        """Builds the compose service running a catalog service inside a team network, along with its name."""
+
+        service_name = f"{team_name_escaped}_{service.slug}"
+
+        # TODO: these should be handled by model converters
+        docker_service = DockerService(
+            image=service.image,  # TODO: get image from service
+            networks={
+                f"{team_name_escaped}_net": DockerNetworkSpec(
+                    ipv4_address=ip_address,
+                )
+            },
+            command=None,  # TODO: might need a custom command for additional setup, like setting up scripts or variables inside the container
+            container_name=service_name
+        )
+
+        return service_name, docker_service
+
+    def _route_step(self, container: str, router_ip: IPAddress) -> Step:
+        """Builds the step routing the organization subnet of a team container through the team router."""
+
+        return Step(
+            name="route",
+            container=container,
+            command=["/bin/sh", "-c", f"command -v ip >/dev/null 2>&1 && ip r add {os.getenv("ORG_SUBNET")} via {str(router_ip)}"],
+        )
+
+    def _report_step_results(self, team_name: str, results: list[StepResult], job: JobContext):
+        """Logs the post-provisioning steps that failed, and publishes the outcome of every step."""
+
+        for result in results:
+            if result.ok:
+                if result.step.name == "route":
+                    job.publish("route.configured", {"team": team_name, "container": result.step.container})
+            else:
+                error = result.error or f"exit code {result.exit_code}"
+
+                print(
+                    f"Step {result.step.name} failed on {result.step.container} after {result.attempts} attempt(s): {error}"
+                )
+                job.publish(
+                    "failure",
+                    {"team": team_name, "step": result.step.name, "container": result.step.container, "error": error},
+                )
+
+    def _prepare_team(self, team_spec: TeamCreationRequestPayload, team_subnet_cidr: CIDR) -> _PreparedTeam:
+        """Allocates the addresses of a validated team and builds its document and compose manifest, without creating anything.
+
+        Raises:
+            ValueError: if one of the services of the team does not exist
+        """
+
+        team_name_escaped = team_spec.name.replace(' ', '-')
 
         team_network = Network(f"{team_name_escaped}-network", cidr=team_subnet_cidr)
-        _gateway_ip = team_network.next_host_address()
 
-        manifest_vars = {
-            "teamname": team_name_escaped,
-            "subnet": str(team_subnet_cidr),
-            "web_ip": str(team_network.next_host_address()),
-            "proxy_ip": str(team_network.next_host_address()),
-            "dns_ip": str(team_network.next_host_address()),
+        # the first host address is taken by the bridge gateway docker creates
+        addresses = {
+            "gateway_ip": team_network.next_host_address(),
+            "web_ip": team_network.next_host_address(),
+            "proxy_ip": team_network.next_host_address(),
+            "dns_ip": team_network.next_host_address(),
         }
 
+        manifest_vars = self._team_manifest_vars(team_name_escaped, team_subnet_cidr, addresses)
+
         manifest = self.manifest_template.compile(manifest_vars)
 
         team_spec_data = team_spec.model_dump()
@@ -195,7 +812,6 @@ class Database:
         team_services_ids = team_spec_data['services']
         del team_spec_data['services']
 
-        services: dict[str, DockerService] = {}
         team_services = []
 
         # Deploy services when a team is created
@@ -203,115 +819,466 @@ class Database:
 
             service = self.get_service(team_service_id)
 
-            service_address = team_network.next_host_address()
+            if service is None:
+                raise ValueError(f"Service {team_service_id} of team {team_spec.name} does not exist")
 
-            service_name = f"{team_name_escaped}_{service.slug}"
+            service_address = team_network.next_host_address()
 
-            # TODO: these should be handled by model converters
-            docker_service = DockerService(
-                image=service.image,  # TODO: get image from service
-                networks={
-                    team_network_name: DockerNetworkSpec(
-                        ipv4_address=str(service_address),
-                    )
-                },
-                command=None,  # TODO: might need a custom command for additional setup, like setting up scripts or variables inside the container
-                container_name=service_name
-            )
+            service_name, docker_service = self._team_service(team_name_escaped, service, str(service_address))
 
-            services[service_name] = docker_service
+            manifest.services[service_name] = docker_service
             team_services.append({"ref": DBRef(collection='services', id=team_service_id), "deployed_at": datetime.now(), "ip_address": str(service_address)})
 
-        result = self.team_collection.insert_one(
-            {
-                **team_spec_data,
-                "services": team_services,
-                "createdAt": datetime.now(),
-                "updatedAt": datetime.now(),
-            }
+        addresses["router_ip"] = team_network.next_host_address()
+
+        team_id = ObjectId()
+
+        document = {
+            "_id": team_id,
+            **team_spec_data,
+            "services": team_services,
+            "addresses": {name: str(address) for name, address in addresses.items()},
+            **_cidr_bounds(team_subnet_cidr),
+            "createdAt": datetime.now(),
+            "updatedAt": datetime.now(),
+        }
+
+        return _PreparedTeam(
+            team_id=team_id,
+            name=team_spec.name,
+            cidr=team_subnet_cidr,
+            network=team_network,
+            network_name=f"{team_name_escaped}_net",
+            router_ip=addresses["router_ip"],
+            document=document,
+            manifest=manifest,
         )
 
-        manifest.services.update(services)
+    def _register_teams(self, teams: list[_PreparedTeam]):
+        """Stores prepared teams and their address allocations, all of them or none.
+
+        Raises:
+            ValueError: if the subnet of a team was taken since it was validated
+        """
+
+        with self._cidr_lock:
+            # checked again along with claiming the subnets, as another job may have claimed one meanwhile
+            for team in teams:
+                overlap = self.cidr_index.find_overlap(team.cidr)
+
+                if overlap is not None:
+                    raise ValueError(f"Team {team.name}: {team.cidr} overlaps the subnet {overlap} of an existing team")
+
+            for team in teams:
+                self.cidr_index.add(team.cidr)
+
+        try:
+            for team in teams:
+                self.ipam.create(team.team_id, team.network)
+
+            self.team_collection.insert_many([team.document for team in teams])
+        except:
+            with self._cidr_lock:
+                for team in teams:
+                    self.cidr_index.remove(team.cidr)
+
+            for team in teams:
+                self.ipam.delete(team.team_id)
+            raise
+
+    def _set_provisioned(self, team_id: ObjectId):
+        """Records that all the containers of a team were started and configured."""
+
+        self.team_collection.update_one({"_id": team_id}, {"$set": {"provisionedAt": datetime.now()}})
+
+    def _unregister_team(self, team_id: str, team_subnet_cidr: CIDR):
+        """Removes a team along with its address allocations, freeing its subnet."""
+
+        self.team_collection.delete_one({"_id": ObjectId(team_id)})
+
+        self.ipam.delete(team_id)
 
-        print(self.compose.handler.dump(manifest))
+        with self._cidr_lock:
+            if team_subnet_cidr in self.cidr_index:
+                self.cidr_index.remove(team_subnet_cidr)
 
-        self.compose.provision(manifest)
+    def _add_service_to_team(self, team_id: str, team_name: str, service: Service) -> IPAddress:
+        """Allocates an address to a service and stores it in a team, unless the team already runs it.
 
-        router_ip = team_network.next_host_address()
-        subprocess.run(
-            shlex.split(f"docker network connect --ip {str(router_ip)} {team_network_name} {os.getenv("ORG_NAME")}_router"),
-            check=True,
-            capture_output=False,
+        The service is stored before it is provisioned, so that a concurrent request for the same service
+        fails here instead of provisioning it twice.
+
+        Returns:
+            IPAddress: the address of the service
+
+        Raises:
+            ValueError: if the team has no address management state, or already runs the service
+        """
+
+        with self._ipam_lock:
+            team_network = self.ipam.get(team_id)
+
+            if team_network is None:
+                raise ValueError(f"Team {team_name} has no address management state")
+
+            service_address = team_network.next_host_address()
+            self.ipam.save(team_id)
+
+        service_refs = [DBRef(collection='services', id=service.id)]
+
+        if ObjectId.is_valid(service.id):
+            service_refs.append(DBRef(collection='services', id=ObjectId(service.id)))
+
+        result = self.team_collection.update_one(
+            {"_id": ObjectId(team_id), "services.ref": {"$nin": service_refs}},
+            {
+                "$push": {"services": {"ref": service_refs[0], "deployed_at": datetime.now(), "ip_address": str(service_address)}},
+                "$set": {"updatedAt": datetime.now()},
+            },
         )
 
-        subprocess.run(
-            shlex.split(f"docker exec {os.getenv("ORG_NAME")}_router /bin/sh -c 'iptables -P FORWARD ACCEPT'"),
-            check=True,
-            capture_output=False,
+        if result.matched_count == 0:
+            self._release_team_address(team_id, service_address)
+
+            raise ValueError(f"Team {team_name} already runs {service.slug}")
+
+        return service_address
+
+    def _remove_service_from_team(self, team_id: str, ip_address: str):
+        """Removes the service with the given address from a team and releases the address."""
+
+        self.team_collection.update_one(
+            {"_id": ObjectId(team_id)},
+            {
+                "$pull": {"services": {"ip_address": ip_address}},
+                "$set": {"updatedAt": datetime.now()},
+            },
         )
 
-        for service in manifest.services.values():
+        self._release_team_address(team_id, IPAddress.from_string(ip_address))
 
-            print(f"Attempting default gateway for service {service.container_name} to {str(router_ip)}")
-            try:
-                subprocess.run(
-                    shlex.split(f"docker exec {service.container_name} /bin/sh -c 'command -v ip >/dev/null 2>&1 && ip r add {os.getenv("ORG_SUBNET")} via {str(router_ip)}'"),
-                    check=True,
-                    capture_output=False,
+    def _release_team_address(self, team_id: str, address: IPAddress):
+        """Releases an address of a team network, if the team has address management state."""
+
+        with self._ipam_lock:
+            team_network = self.ipam.get(team_id)
+
+            if team_network is not None:
+                team_network.release_host_address(address)
+                self.ipam.save(team_id)
+
+    async def _provision_team(self, team: _PreparedTeam, job: JobContext, step_prefix: str = ""):
+        """Starts the containers of a registered team, connects them to the organization router and configures their routes."""
+
+        print(self.compose.handler.dump(team.manifest))
+
+        # usually built at startup already, see ImageWarmer
+        async with job.step(f"{step_prefix}build images"):
+            await asyncio.gather(
+                *(
+                    self.tool_image_builder.ensure(image, timeout=COMPOSE_TIMEOUT)
+                    for image in {service.image for service in team.manifest.services.values()}
+                    if image in self.tool_image_builder
                 )
-            except:
-                print(f"Failed to configure default gateway for service {service.container_name} to {str(router_ip)}")
+            )
 
-        team = self.get_team(result.inserted_id)
+        async with job.step(f"{step_prefix}provision"):
+            await self.compose.provision(team.manifest, timeout=COMPOSE_TIMEOUT)
 
-        return team
+        router_name = f"{os.getenv("ORG_NAME")}_router"
+
+        async with job.step(f"{step_prefix}connect router"):
+            await self.compose.connect_network(team.network_name, router_name, str(team.router_ip), timeout=EXEC_TIMEOUT)
+
+        steps = [
+            Step(name="forwarding", container=router_name, command=["/bin/sh", "-c", "iptables -P FORWARD ACCEPT"], required=True),
+        ]
+
+        for service in team.manifest.services.values():
+            steps.append(self._route_step(service.container_name, team.router_ip))
+
+        async with job.step(f"{step_prefix}configure containers"):
+            results = await self.post_provision.run(steps)
+
+            self._report_step_results(team.name, results, job)
+
+            if any(result.step.required and not result.ok for result in results):
+                raise RuntimeError(f"Failed to configure {router_name} for team {team.name}")
 
         # TODO: configure router, routes, DNS, etc etc
 
-    def delete_team(self, team_id: int):
-        """Remove a team from an existing organization."""
+    async def create_team(self, team_spec: TeamCreationRequestPayload, job: Optional[JobContext] = None) -> Team:
+        """Add a team to an existing organization."""
+
+        if job is None:
+            job = JobContext(events=self.events)
+
+        # MongoDB is only queried from worker threads, so that reads of other requests are not held up
+        async with job.step("validate"):
+            team_subnet_cidr = await asyncio.to_thread(self.validate_team_spec, team_spec)
+
+            prepared_team = await asyncio.to_thread(self._prepare_team, team_spec, team_subnet_cidr)
+
+        # a backend restart in the middle of provisioning must not leave a half-created team behind
+        await job.on_interrupt("roll_back_teams", {"team_ids": [str(prepared_team.team_id)]})
+
+        await asyncio.to_thread(self._register_teams, [prepared_team])
+
+        await self._provision_team(prepared_team, job)
+
+        await asyncio.to_thread(self._set_provisioned, prepared_team.team_id)
+
+        team = await asyncio.to_thread(self.get_team, prepared_team.team_id)
+
+        return team
+
+    async def create_teams(
+        self,
+        team_specs: list[TeamCreationRequestPayload],
+        parallelism: int = BULK_PARALLELISM,
+        timeout: Optional[float] = BULK_TIMEOUT,
+        job: Optional[JobContext] = None,
+    ) -> list[TeamCreationResult]:
+        """Add many teams to an existing organization at once.
+
+        Every team is validated and stored before any is provisioned, so a single invalid team
+        rejects the whole batch. Teams are then provisioned concurrently, at most `parallelism` at a time.
+        Teams that fail, or that are not provisioned before `timeout` seconds, are reported as failed
+        and kept, like a team whose creation fails on its own: they can be deleted, or retried.
+
+        Args:
+            team_specs (list[TeamCreationRequestPayload]): the teams to create
+            parallelism (int): how many teams to provision at the same time
+            timeout (Optional[float]): the wall-clock budget of the whole operation, in seconds, None for no limit
+            job (Optional[JobContext]): the job reporting the progress of the operation
+
+        Returns:
+            list[TeamCreationResult]: the outcome for every team, in the order they were given
+
+        Raises:
+            ValueError: if any of the teams cannot be created
+        """
+
+        if job is None:
+            job = JobContext(events=self.events)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        async with job.step("validate"):
+            team_subnet_cidrs = await asyncio.to_thread(self.validate_team_specs, team_specs)
+
+            prepared_teams = await asyncio.to_thread(
+                lambda: [
+                    self._prepare_team(team_spec, team_subnet_cidr)
+                    for team_spec, team_subnet_cidr in zip(team_specs, team_subnet_cidrs)
+                ]
+            )
+
+        # teams already provisioned when the backend restarts are kept, see roll_back_teams
+        await job.on_interrupt("roll_back_teams", {"team_ids": [str(team.team_id) for team in prepared_teams]})
+
+        async with job.step("register"):
+            await asyncio.to_thread(self._register_teams, prepared_teams)
+
+        semaphore = asyncio.Semaphore(parallelism)
 
-        team = self.get_team(team_id)
+        async def provision(team: _PreparedTeam):
+            async with semaphore:
+                await self._provision_team(team, job, step_prefix=f"{team.name}: ")
+
+            await asyncio.to_thread(self._set_provisioned, team.team_id)
+
+        tasks = [asyncio.create_task(provision(team)) for team in prepared_teams]
+
+        remaining = deadline - loop.time() if deadline is not None else None
+
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=max(remaining, 0) if remaining is not None else None)
+        except asyncio.CancelledError:
+            # the teams must not keep being provisioned once the job is cancelled
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+
+        for team, task in zip(prepared_teams, tasks):
+            error = None
+
+            if task in pending:
+                error = f"Not provisioned within the {timeout:g}s budget"
+            elif task.exception() is not None:
+                error = str(task.exception()) or type(task.exception()).__name__
+
+            results.append(
+                TeamCreationResult(
+                    name=team.name,
+                    team_id=str(team.team_id),
+                    status="failed" if error else "created",
+                    error=error,
+                )
+            )
+
+            if error:
+                job.publish("failure", {"team": team.name, "error": error})
+
+        return results
+
+    async def delete_team(self, team_id: int, job: Optional[JobContext] = None, partial: bool = False):
+        """Remove a team from an existing organization.
+
+        Args:
+            team_id (int): the id of the team
+            job (Optional[JobContext]): the job reporting the progress of the operation
+            partial (bool): whether the team may not have been completely provisioned,
+                in which case the organization router may not be connected to it
+        """
+
+        if job is None:
+            job = JobContext(events=self.events)
+
+        team = await asyncio.to_thread(self.get_team, team_id)
 
         team_subnet_cidr = CIDR.from_string(team.cidr)
-        team_network = Network(f"{team.name}-network", cidr=team_subnet_cidr)
-        team_network.next_host_address() # skip gateway
 
         team_name_escaped = team.name.replace(' ', '-')
 
-        manifest_vars = {
-            "teamname": team_name_escaped,
-            "subnet": str(team_subnet_cidr),
-            "web_ip": str(team_network.next_host_address()),
-            "proxy_ip": str(team_network.next_host_address()),
-            "dns_ip": str(team_network.next_host_address()),
-        }
+        addresses = await asyncio.to_thread(self._get_team_addresses, team_id)
+
+        manifest_vars = self._team_manifest_vars(team_name_escaped, team_subnet_cidr, addresses)
 
         manifest = self.manifest_template.compile(manifest_vars)
 
         for service in team.services:
 
-            service_name = f"{team_name_escaped}_{service.slug}"
-
-            docker_service = DockerService(
-                image=service.image,  # TODO: get image from service
-                networks={
-                    f"{team_name_escaped}_net": DockerNetworkSpec(
-                        ipv4_address=service.ipAddress,
-                    )
-                },
-                command=None,  # TODO: might need a custom command for additional setup, like setting up scripts or variables inside the container
-                container_name=service_name
-            )
+            service_name, docker_service = self._team_service(team_name_escaped, service, service.ipAddress)
 
             manifest.services[service_name] = docker_service
 
-        subprocess.run(
-            shlex.split(f"docker network disconnect {team_name_escaped}_net {os.getenv("ORG_NAME")}_router"),
-            check=True,
-            capture_output=False,
+        try:
+            async with job.step("disconnect router"):
+                await self.compose.disconnect_network(f"{team_name_escaped}_net", f"{os.getenv("ORG_NAME")}_router", timeout=EXEC_TIMEOUT)
+        except Exception:
+            if not partial:
+                raise
+
+        async with job.step("tear down"):
+            await self.compose.tear_down(manifest, timeout=COMPOSE_TIMEOUT)
+
+        await asyncio.to_thread(self._unregister_team, team_id, team_subnet_cidr)
+
+    async def roll_back_teams(self, team_ids: list[str], job: Optional[JobContext] = None) -> list[str]:
+        """Remove the teams of an interrupted creation whose provisioning did not finish.
+
+        Teams that were completely provisioned, or that no longer exist, are left alone.
+
+        Args:
+            team_ids (list[str]): the ids of the teams the creation registered
+            job (Optional[JobContext]): the job reporting the progress of the operation
+
+        Returns:
+            list[str]: the ids of the teams that were removed
+        """
+
+        removed = []
+
+        for team_id in team_ids:
+            team = await asyncio.to_thread(self.team_collection.find_one, ObjectId(team_id), {"provisionedAt": 1})
+
+            if team is None or team.get("provisionedAt") is not None:
+                continue
+
+            await self.delete_team(team_id, job, partial=True)
+
+            removed.append(team_id)
+
+        return removed
+
+    async def add_team_service(self, team_id: str, slug: str, job: Optional[JobContext] = None) -> Team:
+        """Start a service of the catalog inside a running team, leaving its other containers untouched.
+
+        Raises:
+            ValueError: if the team or the service do not exist, or the team already runs the service
+        """
+
+        if job is None:
+            job = JobContext(events=self.events)
+
+        team = await asyncio.to_thread(self.get_team, team_id)
+
+        if team is None:
+            raise ValueError(f"Team {team_id} does not exist")
+
+        service = await asyncio.to_thread(self.get_service_by_slug, slug)
+
+        if service is None:
+            raise ValueError(f"Service {slug} does not exist")
+
+        if any(team_service.slug == slug for team_service in team.services):
+            raise ValueError(f"Team {team.name} already runs {slug}")
+
+        team_name_escaped = team.name.replace(' ', '-')
+
+        addresses = await asyncio.to_thread(self._get_team_addresses, team_id)
+
+        async with job.step("allocate address"):
+            service_address = await asyncio.to_thread(self._add_service_to_team, team_id, team.name, service)
+
+        service_name, docker_service = self._team_service(team_name_escaped, service, str(service_address))
+
+        manifest = self.manifest_template.compile(
+            self._team_manifest_vars(team_name_escaped, CIDR.from_string(team.cidr), addresses)
         )
 
-        self.compose.tear_down(manifest)
+        # the networks of the team, with only the new service: compose leaves the other containers as they are
+        manifest.services = {service_name: docker_service}
+
+        try:
+            async with job.step("provision"):
+                await self.compose.provision(manifest, timeout=COMPOSE_TIMEOUT)
+        except BaseException:
+            await asyncio.to_thread(self._remove_service_from_team, team_id, str(service_address))
+            raise
+
+        async with job.step("configure container"):
+            results = await self.post_provision.run([self._route_step(service_name, addresses["router_ip"])])
+
+            self._report_step_results(team.name, results, job)
+
+        return await asyncio.to_thread(self.get_team, team_id)
+
+    async def remove_team_service(self, team_id: str, slug: str, job: Optional[JobContext] = None):
+        """Stop and remove a service from a running team, leaving its other containers untouched.
+
+        Raises:
+            ValueError: if the team does not exist or does not run the service
+        """
+
+        if job is None:
+            job = JobContext(events=self.events)
+
+        team = await asyncio.to_thread(self.get_team, team_id)
+
+        if team is None:
+            raise ValueError(f"Team {team_id} does not exist")
+
+        service = next((team_service for team_service in team.services if team_service.slug == slug), None)
+
+        if service is None:
+            raise ValueError(f"Team {team.name} does not run {slug}")
+
+        team_name_escaped = team.name.replace(' ', '-')
+
+        async with job.step("remove container"):
+            await self.compose.remove_container(f"{team_name_escaped}_{slug}", timeout=EXEC_TIMEOUT)
 
-        result = self.team_collection.delete_one({"_id": ObjectId(team_id)})
+        async with job.step("release address"):
+            await asyncio.to_thread(self._remove_service_from_team, team_id, service.ipAddress)
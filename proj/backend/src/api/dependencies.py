@@ -1,7 +1,90 @@
-from .db import Database
+import os
+
+from .db import Database, TeamCreationRequestPayload
+from .async_db import get_async_database
+from .jobs import JobQueue, JobContext
+from .images import ImageWarmer
 
 db = Database()
 
+async_db = get_async_database(None, db)
+
+events = db.events
+
+jobs = JobQueue(db.db["jobs"], workers=int(os.getenv("JOB_WORKERS", "2")), events=events)
+
+images = ImageWarmer(
+    db.compose,
+    db.get_team_images,
+    concurrency=int(os.getenv("IMAGE_PULL_CONCURRENCY", "2")),
+    interval=float(os.getenv("IMAGE_WARM_INTERVAL", "300")),
+    timeout=float(os.getenv("IMAGE_PULL_TIMEOUT", "1800")),
+    builder=db.tool_image_builder,
+    events=events,
+)
+
+
+async def _create_team(payload: dict, job: JobContext) -> dict:
+    team = await db.create_team(TeamCreationRequestPayload(**payload), job)
+
+    return {"team_id": team.id}
+
+
+async def _create_teams(payload: dict, job: JobContext) -> dict:
+    results = await db.create_teams([TeamCreationRequestPayload(**team) for team in payload["teams"]], job=job)
+
+    return {
+        "created": sum(result.status == "created" for result in results),
+        "failed": sum(result.status == "failed" for result in results),
+        "teams": [result.model_dump() for result in results],
+    }
+
+
+async def _delete_team(payload: dict, job: JobContext) -> dict:
+    await db.delete_team(payload["team_id"], job)
+
+    return {"team_id": payload["team_id"]}
+
+
+async def _roll_back_teams(payload: dict, job: JobContext) -> dict:
+    return {"team_ids": await db.roll_back_teams(payload["team_ids"], job)}
+
+
+async def _add_team_service(payload: dict, job: JobContext) -> dict:
+    await db.add_team_service(payload["team_id"], payload["slug"], job)
+
+    return payload
+
+
+async def _remove_team_service(payload: dict, job: JobContext) -> dict:
+    await db.remove_team_service(payload["team_id"], payload["slug"], job)
+
+    return payload
+
+
+jobs.register("create_team", _create_team)
+jobs.register("create_teams", _create_teams)
+jobs.register("delete_team", _delete_team)
+jobs.register("roll_back_teams", _roll_back_teams)
+jobs.register("add_team_service", _add_team_service)
+jobs.register("remove_team_service", _remove_team_service)
+
 
 def get_db():
     return db
+
+
+def get_async_db():
+    return async_db
+
+
+def get_jobs():
+    return jobs
+
+
+def get_events():
+    return events
+
+
+def get_images():
+    return images
@@ -0,0 +1,89 @@
+"""
+In-process publish/subscribe of provisioning events, streamed to clients at /events.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator
+import asyncio
+import itertools
+
+from pydantic import BaseModel
+
+
+class Event(BaseModel):
+    """Model representing something that happened while provisioning."""
+
+    id: int
+    type: str
+    timestamp: datetime
+    data: dict[str, Any] = {}
+
+
+class Subscription:
+    """
+    The events received by one subscriber, buffered in a bounded queue.
+
+    When the subscriber falls behind and the queue fills up, the oldest events are dropped,
+    so a slow subscriber never slows down whoever publishes.
+    """
+
+    def __init__(self, max_size: int):
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(max_size)
+
+        self.dropped = 0
+        """How many events were dropped because this subscriber fell behind."""
+
+    def put(self, event: Event):
+        """Adds an event to the queue, dropping the oldest one if it is full."""
+
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+
+        self._queue.put_nowait(event)
+
+    async def get(self) -> Event:
+        """Waits for the next event."""
+
+        return await self._queue.get()
+
+
+class EventBus:
+    """
+    Hands every published event to all current subscribers.
+
+    Publishing never blocks nor fails, whatever the subscribers do.
+    Events are only kept in memory: a subscriber receives those published while it is subscribed.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+
+        self._subscriptions: set[Subscription] = set()
+        self._ids = itertools.count(1)
+
+    def publish(self, type: str, data: dict[str, Any]):
+        """Publishes an event. Must be called from the thread running the event loop.
+
+        Args:
+            type (str): the kind of event, e.g. "step.started"
+            data (dict[str, Any]): what the event is about, e.g. the job and step names
+        """
+
+        event = Event(id=next(self._ids), type=type, timestamp=datetime.now(), data=data)
+
+        for subscription in self._subscriptions:
+            subscription.put(event)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        """Subscribes to the events published until the context exits."""
+
+        subscription = Subscription(self.max_queue_size)
+        self._subscriptions.add(subscription)
+
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
@@ -0,0 +1,176 @@
+"""
+Pulling and building the images teams are made of ahead of time, so that creating a team never waits on a cold pull.
+"""
+
+from datetime import datetime
+from typing import Callable, Iterable, Literal, Optional
+import asyncio
+import time
+import traceback
+
+from pydantic import BaseModel
+
+from engine.docker.compose import AsyncDockerCompose
+from engine.docker.images import ToolImageBuilder
+
+from .events import EventBus
+
+ImageState = Literal["pending", "pulling", "building", "ready", "failed"]
+
+
+class ImageStatus(BaseModel):
+    """Model representing the local state of an image."""
+
+    image: str
+    status: ImageState
+    digest: Optional[str] = None
+    pulled: bool = False
+    built: bool = False
+    duration: Optional[float] = None
+    error: Optional[str] = None
+    updatedAt: datetime
+
+
+class ImageWarmer:
+    """
+    Keeps the images teams are made of present on the Docker host.
+
+    Once started, the images listed by `images` are checked in the background, and those missing
+    are pulled, at most `concurrency` at a time. Images of the `builder` are built instead of pulled.
+    The list is read again every `interval` seconds, so that images of services added to the catalog
+    are pulled too. Images that are already present, or were pulled, are not pulled again:
+    the digest they had is reported instead. Ready images are looked up again on every interval,
+    and pulled or built again if they were removed from the host.
+    """
+
+    def __init__(
+        self,
+        compose: AsyncDockerCompose,
+        images: Callable[[], Iterable[str]],
+        concurrency: int = 2,
+        interval: float = 300,
+        timeout: Optional[float] = None,
+        builder: Optional[ToolImageBuilder] = None,
+        events: Optional[EventBus] = None,
+    ):
+        self.compose = compose
+        self.images = images
+        self.builder = builder
+        self.concurrency = concurrency
+        self.interval = interval
+        self.timeout = timeout
+        self.events = events
+
+        self._statuses: dict[str, ImageStatus] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Starts warming images in the background."""
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops warming images. Pulls in progress are cancelled."""
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> list[ImageStatus]:
+        """Get the state of every known image."""
+
+        return list(self._statuses.values())
+
+    def is_ready(self, image: str) -> bool:
+        """Whether an image is known to be present locally."""
+
+        status = self._statuses.get(image)
+
+        return status is not None and status.status == "ready"
+
+    async def warm(self, images: Optional[Iterable[str]] = None):
+        """Makes sure images are present locally, pulling or building those that are missing.
+
+        Images being pulled or built are left alone, and those ready are only looked up again.
+
+        Args:
+            images (Optional[Iterable[str]]): the images, all those listed by `images` when not given
+        """
+
+        if images is None:
+            images = await asyncio.to_thread(lambda: list(self.images()))
+
+        pending = []
+
+        for image in dict.fromkeys(images):
+            status = self._statuses.get(image)
+
+            if status is not None and status.status in ("pending", "pulling", "building"):
+                continue
+
+            if status is None or status.status == "failed":
+                self._statuses[image] = ImageStatus(image=image, status="pending", updatedAt=datetime.now())
+
+            pending.append(image)
+
+        await asyncio.gather(*(self._warm(image) for image in pending))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.warm()
+            except Exception:
+                traceback.print_exc()
+
+            await asyncio.sleep(self.interval)
+
+    async def _warm(self, image: str):
+        async with self._semaphore:
+            started_at = time.monotonic()
+            pulled = built = False
+            operation = "build_image" if self.builder is not None and image in self.builder else "pull_image"
+            previous = self._statuses.get(image)
+
+            try:
+                info = await self.compose.inspect_image(image, timeout=self.timeout)
+
+                if info is None:
+                    if operation == "build_image":
+                        # the builder would otherwise still believe it present
+                        self.builder.forget(image)
+                        self._set(image, "building")
+
+                        built = await self.builder.ensure(image, timeout=self.timeout)
+                    else:
+                        self._set(image, "pulling")
+
+                        await self.compose.pull_image(image, timeout=self.timeout)
+                        pulled = True
+
+                    info = await self.compose.inspect_image(image, timeout=self.timeout)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+                self._set(image, "failed", duration=time.monotonic() - started_at, error=error)
+                self._publish("failure", {"operation": operation, "image": image, "error": error})
+
+                return
+
+            # the digest of the image in its registry, or the id of an image that was never pushed
+            digest = ((info or {}).get("RepoDigests") or [(info or {}).get("Id")])[0]
+
+            # looked up again, and still the same
+            if previous is not None and previous.status == "ready" and not (pulled or built) and previous.digest == digest:
+                return
+
+            self._set(image, "ready", digest=digest, pulled=pulled, built=built, duration=time.monotonic() - started_at)
+            self._publish("image.ready", {"image": image, "digest": digest, "pulled": pulled, "built": built})
+
+    def _set(self, image: str, status: ImageState, **fields):
+        self._statuses[image] = ImageStatus(image=image, status=status, updatedAt=datetime.now(), **fields)
+
+    def _publish(self, type: str, data: dict):
+        if self.events is not None:
+            self.events.publish(type, data)
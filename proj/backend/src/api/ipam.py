@@ -0,0 +1,136 @@
+"""
+Persistent IP address management for team networks.
+"""
+
+from typing import Optional
+
+from pymongo.collection import Collection
+
+from engine.models.network import CIDR, Network, AddressAllocator
+
+
+class IPAMConflictError(RuntimeError):
+    """Raised when the stored allocation state changed since it was loaded."""
+
+
+class IPAMStore:
+    """
+    Keeps the allocation state of every team network in MongoDB.
+
+    Each network is a single document holding the compressed allocation bitmap and a version number.
+    Networks are loaded on first use and cached, and every change is written back with
+    a single conditional update on that version, so concurrent writers cannot overwrite each other.
+    """
+
+    def __init__(self, collection: Collection):
+        self.collection = collection
+        self._networks: dict[str, Network] = {}
+        self._versions: dict[str, int] = {}
+
+    def get(self, network_id: str) -> Optional[Network]:
+        """Get the network with the given id, loading it from the database if needed.
+
+        Args:
+            network_id (str): the id of the network, usually the id of the team owning it
+
+        Returns:
+            Optional[Network]: the network, or None if there is no allocation state stored for it
+        """
+
+        network_id = str(network_id)
+
+        if network_id in self._networks:
+            return self._networks[network_id]
+
+        document = self.collection.find_one({"_id": network_id})
+
+        if not document:
+            return None
+
+        cidr = CIDR.from_string(document["cidr"])
+
+        network = Network(document["name"], cidr=cidr, policy=document["policy"])
+        network.allocator = AddressAllocator.from_bytes(
+            cidr, document["bitmap"], policy=document["policy"], cursor=document["cursor"]
+        )
+
+        self._networks[network_id] = network
+        self._versions[network_id] = document["version"]
+
+        return network
+
+    def create(self, network_id: str, network: Network):
+        """Stores the allocation state of a new network.
+
+        Args:
+            network_id (str): the id of the network, usually the id of the team owning it
+            network (Network): the network to store
+        """
+
+        network_id = str(network_id)
+
+        self.collection.insert_one(
+            {
+                "_id": network_id,
+                "name": network.name,
+                "cidr": str(network.cidr),
+                "policy": network.allocator.policy,
+                "bitmap": network.allocator.to_bytes(),
+                "cursor": network.allocator.cursor,
+                "version": 0,
+            }
+        )
+
+        self._networks[network_id] = network
+        self._versions[network_id] = 0
+
+    def save(self, network_id: str):
+        """Writes the current allocation state of a loaded network back to the database.
+
+        Args:
+            network_id (str): the id of the network
+
+        Raises:
+            IPAMConflictError: if the stored state was changed by someone else since it was loaded.
+                The cached network is dropped, so the next `get` reloads it.
+        """
+
+        network_id = str(network_id)
+
+        network = self._networks[network_id]
+        version = self._versions[network_id]
+
+        result = self.collection.update_one(
+            {"_id": network_id, "version": version},
+            {
+                "$set": {
+                    "bitmap": network.allocator.to_bytes(),
+                    "cursor": network.allocator.cursor,
+                },
+                "$inc": {"version": 1},
+            },
+        )
+
+        if result.matched_count == 0:
+            self._networks.pop(network_id, None)
+            self._versions.pop(network_id, None)
+
+            raise IPAMConflictError(
+                f"Allocation state of network {network_id} changed concurrently"
+            )
+
+        self._versions[network_id] = version + 1
+
+    def delete(self, network_id: str):
+        """Removes the allocation state of a network.
+
+        Args:
+            network_id (str): the id of the network
+        """
+
+        network_id = str(network_id)
+
+        self.collection.delete_one({"_id": network_id})
+
+        self._networks.pop(network_id, None)
+        self._versions.pop(network_id, None)
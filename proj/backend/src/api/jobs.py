@@ -0,0 +1,352 @@
+"""
+Background jobs, persisted in MongoDB and run by a fixed pool of workers.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional
+import asyncio
+import traceback
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import BaseModel
+from pymongo import DESCENDING
+from pymongo.collection import Collection
+
+from .events import EventBus
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobStep(BaseModel):
+    """Model representing a step of a job."""
+
+    name: str
+    status: JobStatus
+    startedAt: datetime
+    finishedAt: Optional[datetime] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Job(BaseModel):
+    """Model representing a background job."""
+
+    id: str
+    kind: str
+    status: JobStatus
+    payload: dict[str, Any]
+    steps: list[JobStep] = []
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    onInterrupt: Optional[dict[str, Any]] = None
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+
+
+class JobContext:
+    """
+    Handed to a running job, so it can report the steps it goes through.
+
+    Steps are stored with the job when there is a queue, and published as "step.started"
+    and "step.finished" events when there is an event bus. A context with neither tracks nothing,
+    which lets the same code run outside of a job.
+    """
+
+    def __init__(
+        self,
+        queue: Optional["JobQueue"] = None,
+        job_id: Optional[ObjectId] = None,
+        events: Optional[EventBus] = None,
+    ):
+        self.queue = queue
+        self.job_id = job_id
+        self.events = events
+
+        self._step_count = 0
+
+    @asynccontextmanager
+    async def step(self, name: str) -> AsyncIterator[None]:
+        """Records the timing and outcome of the enclosed block as a step of this job.
+
+        Args:
+            name (str): what the step does
+        """
+
+        if self.queue is None and self.events is None:
+            yield
+            return
+
+        index = self._step_count
+        self._step_count += 1
+
+        started_at = datetime.now()
+        if self.queue is not None:
+            await asyncio.to_thread(
+                self.queue.collection.update_one,
+                {"_id": self.job_id},
+                {"$push": {"steps": {"name": name, "status": "running", "startedAt": started_at}}},
+            )
+
+        self.publish("step.started", {"step": name})
+
+        status, error = "succeeded", None
+        try:
+            yield
+        except BaseException as e:
+            status, error = "failed", str(e) or type(e).__name__
+            raise
+        finally:
+            finished_at = datetime.now()
+            duration = (finished_at - started_at).total_seconds()
+
+            if self.queue is not None:
+                await asyncio.to_thread(
+                    self.queue.collection.update_one,
+                    {"_id": self.job_id},
+                    {
+                        "$set": {
+                            f"steps.{index}.status": status,
+                            f"steps.{index}.finishedAt": finished_at,
+                            f"steps.{index}.duration": duration,
+                            f"steps.{index}.error": error,
+                        }
+                    },
+                )
+
+            self.publish(
+                "step.finished",
+                {"step": name, "status": status, "duration": duration, "error": error},
+            )
+
+    async def on_interrupt(self, kind: str, payload: dict[str, Any]):
+        """Sets the job to queue if this one is interrupted by a backend shutdown or restart, e.g. to undo what it did so far.
+
+        Only the last job set is queued. Jobs that finish, whether they succeed or fail, queue nothing.
+
+        Args:
+            kind (str): the kind of the job to queue
+            payload (dict[str, Any]): the arguments of the job to queue
+        """
+
+        if self.queue is not None:
+            await asyncio.to_thread(
+                self.queue.collection.update_one,
+                {"_id": self.job_id},
+                {"$set": {"onInterrupt": {"kind": kind, "payload": payload}}},
+            )
+
+    def publish(self, type: str, data: dict[str, Any]):
+        """Publishes an event about this job, if there is an event bus.
+
+        Args:
+            type (str): the kind of event
+            data (dict[str, Any]): what the event is about. The job id is added to it.
+        """
+
+        if self.events is not None:
+            self.events.publish(
+                type, {"job_id": str(self.job_id) if self.job_id else None, **data}
+            )
+
+
+JobHandler = Callable[[dict[str, Any], JobContext], Awaitable[Optional[dict[str, Any]]]]
+"""Runs a job of a given kind from its payload, returning an optional result to store with the job."""
+
+
+class JobQueue:
+    """
+    Queue of background jobs executed by a fixed number of worker tasks.
+
+    Every job is a document in MongoDB, so the queue survives restarts:
+    jobs still queued are picked up again, while jobs that were running are marked as failed,
+    since their handlers may have stopped half-way. Interrupted jobs queue the job they set
+    with `JobContext.on_interrupt`, if any, so that what they left half-done is undone.
+    Job documents are read and written in worker threads, so bookkeeping never blocks the event loop.
+    """
+
+    def __init__(
+        self, collection: Collection, workers: int = 2, events: Optional[EventBus] = None
+    ):
+        self.collection = collection
+        self.collection.create_index([("createdAt", DESCENDING)])
+        self.collection.create_index([("status", 1), ("createdAt", 1)])
+
+        self.workers = workers
+        self.events = events
+
+        self._handlers: dict[str, JobHandler] = {}
+        self._queue: asyncio.Queue[ObjectId] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler):
+        """Registers the handler running jobs of the given kind.
+
+        Args:
+            kind (str): the kind of job, e.g. "create_team"
+            handler (JobHandler): the coroutine function running those jobs
+        """
+
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """Recovers the jobs left over by a previous run and starts the workers."""
+
+        interrupted = await asyncio.to_thread(
+            lambda: list(self.collection.find({"status": "running"}, {"kind": 1, "onInterrupt": 1}))
+        )
+
+        queued = await asyncio.to_thread(
+            lambda: list(self.collection.find({"status": "queued"}, {"_id": 1}).sort("createdAt", 1))
+        )
+
+        for job in queued:
+            self._queue.put_nowait(job["_id"])
+
+        for job in interrupted:
+            await self._interrupted(job, "Interrupted by a backend restart")
+
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stops the workers. Jobs they were running are cancelled and marked as failed."""
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, kind: str, payload: dict[str, Any]) -> str:
+        """Queues a job.
+
+        Args:
+            kind (str): the kind of job
+            payload (dict[str, Any]): the arguments of the job
+
+        Returns:
+            str: the id of the job
+
+        Raises:
+            ValueError: if there is no handler for the given kind of job
+        """
+
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        result = await asyncio.to_thread(
+            self.collection.insert_one,
+            {
+                "kind": kind,
+                "status": "queued",
+                "payload": payload,
+                "steps": [],
+                "result": None,
+                "error": None,
+                "createdAt": datetime.now(),
+                "startedAt": None,
+                "finishedAt": None,
+            },
+        )
+
+        job_id = result.inserted_id
+
+        self._queue.put_nowait(job_id)
+
+        return str(job_id)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id."""
+
+        try:
+            job_id = ObjectId(job_id)
+        except InvalidId:
+            return None
+
+        job = await asyncio.to_thread(self.collection.find_one, job_id)
+
+        return self._to_model(job) if job else None
+
+    async def find(self, status: Optional[JobStatus] = None, limit: int = 50) -> list[Job]:
+        """Get the most recent jobs, optionally only those with the given status."""
+
+        query = {"status": status} if status is not None else {}
+
+        jobs = await asyncio.to_thread(
+            lambda: list(self.collection.find(query).sort("createdAt", DESCENDING).limit(limit))
+        )
+
+        return [self._to_model(job) for job in jobs]
+
+    def _to_model(self, job: dict[str, Any]) -> Job:
+        job["id"] = str(job.pop("_id"))
+
+        return Job(**job)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: ObjectId):
+        job = await asyncio.to_thread(
+            self.collection.find_one_and_update,
+            {"_id": job_id, "status": "queued"},
+            {"$set": {"status": "running", "startedAt": datetime.now()}},
+        )
+
+        # another worker, or a previous run, already took care of it
+        if job is None:
+            return
+
+        context = JobContext(self, job_id, self.events)
+
+        try:
+            result = await self._handlers[job["kind"]](job["payload"], context)
+        except asyncio.CancelledError:
+            # the job it sets is only queued here, and run after the next start
+            job = await asyncio.to_thread(self.collection.find_one, job_id, {"kind": 1, "onInterrupt": 1})
+            await self._interrupted(job, "Cancelled by a backend shutdown", context)
+            raise
+        except Exception as e:
+            traceback.print_exc()
+
+            error = str(e) or type(e).__name__
+            await asyncio.to_thread(
+                self.collection.update_one,
+                {"_id": job_id},
+                {"$set": {"status": "failed", "error": error, "finishedAt": datetime.now()}},
+            )
+            context.publish("failure", {"kind": job["kind"], "error": error})
+        else:
+            await asyncio.to_thread(
+                self.collection.update_one,
+                {"_id": job_id},
+                {"$set": {"status": "succeeded", "result": result, "finishedAt": datetime.now()}},
+            )
+
+    async def _interrupted(self, job: dict[str, Any], error: str, context: Optional[JobContext] = None):
+        """Marks a job that was stopped half-way as failed, and queues the job it set to run if interrupted."""
+
+        follow_up = job.get("onInterrupt")
+
+        if follow_up is not None:
+            follow_up_id = await self.enqueue(follow_up["kind"], follow_up["payload"])
+            error = f"{error}, undone by job {follow_up_id}"
+
+        await asyncio.to_thread(
+            self.collection.update_one,
+            {"_id": job["_id"]},
+            {"$set": {"status": "failed", "error": error, "finishedAt": datetime.now()}},
+        )
+
+        if context is None:
+            context = JobContext(self, job["_id"], self.events)
+
+        context.publish("failure", {"kind": job["kind"], "error": error})
@@ -0,0 +1,138 @@
+"""
+Configuration steps run inside containers once a team has been provisioned.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import asyncio
+
+from engine.docker.api import DockerAPIError
+from engine.docker.compose import AsyncDockerCompose
+
+DOCKER_ERROR_EXIT_CODE = 125
+"""Exit code of `docker exec` when the command could not be started, e.g. the container is still starting."""
+
+
+@dataclass(kw_only=True, frozen=True)
+class Step:
+    """
+    A command to run inside a container.
+    """
+
+    name: str
+    """
+    What the step does, e.g. "route" or "forwarding".
+    """
+
+    container: str
+    """
+    The name of the container to run the command in.
+    """
+
+    command: list[str]
+    """
+    The command to run and its arguments.
+    """
+
+    required: bool = False
+    """
+    Whether the team cannot work without this step succeeding.
+    """
+
+
+@dataclass(kw_only=True, frozen=True)
+class StepResult:
+    """
+    The outcome of running a step.
+    """
+
+    step: Step
+    """
+    The step that was run.
+    """
+
+    exit_code: Optional[int]
+    """
+    The exit code of the command's last attempt, or None if it could not be run at all.
+    """
+
+    attempts: int
+    """
+    How many times the command was run.
+    """
+
+    error: Optional[str] = None
+    """
+    Why the last attempt could not be run, if it could not.
+    """
+
+    @property
+    def ok(self) -> bool:
+        """Whether the command ran and exited successfully."""
+
+        return self.exit_code == 0
+
+
+class PostProvisionExecutor:
+    """
+    Runs post-provisioning steps concurrently, with at most `max_workers` commands in flight
+    across all the runs sharing the executor.
+
+    Transient failures, where the command could not be started or timed out,
+    are retried with exponential backoff. Commands that ran and failed are not retried.
+    """
+
+    def __init__(
+        self,
+        compose: AsyncDockerCompose,
+        max_workers: int = 8,
+        retries: int = 2,
+        retry_delay: float = 0.5,
+        timeout: Optional[float] = None,
+    ):
+        self.compose = compose
+        self.max_workers = max_workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    async def run(self, steps: Iterable[Step]) -> list[StepResult]:
+        """Runs the given steps.
+
+        Args:
+            steps (Iterable[Step]): the steps to run, in no particular order
+
+        Returns:
+            list[StepResult]: the result of every step, in the order the steps were given
+        """
+
+        return list(await asyncio.gather(*(self._run_step(step) for step in steps)))
+
+    async def _run_step(self, step: Step) -> StepResult:
+        attempts = 0
+
+        while True:
+            attempts += 1
+            exit_code = error = None
+
+            # only the command holds a worker: steps waiting out their backoff leave it to others
+            async with self._semaphore:
+                try:
+                    exit_code = await self.compose.exec(
+                        step.container, step.command, timeout=self.timeout
+                    )
+                except TimeoutError:
+                    error = f"Timed out after {self.timeout}s"
+                except (DockerAPIError, OSError) as e:
+                    error = str(e)
+
+            transient = exit_code is None or exit_code == DOCKER_ERROR_EXIT_CODE
+
+            if not transient or attempts > self.retries:
+                return StepResult(
+                    step=step, exit_code=exit_code, attempts=attempts, error=error
+                )
+
+            await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
@@ -0,0 +1,56 @@
+from typing import AsyncIterator, Optional
+import asyncio
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from ..events import EventBus, Subscription
+from ..dependencies import get_events
+
+router = APIRouter(prefix="/events")
+
+# seconds between comments sent to keep idle connections open
+KEEPALIVE_INTERVAL = 15
+
+
+async def _stream(subscription: Subscription, types: Optional[set[str]]) -> AsyncIterator[str]:
+    dropped = 0
+
+    while True:
+        try:
+            event = await asyncio.wait_for(subscription.get(), KEEPALIVE_INTERVAL)
+        except TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+
+        # tell the client it fell behind, so it can refresh its state from the API
+        if subscription.dropped != dropped:
+            yield f"event: dropped\ndata: {subscription.dropped - dropped}\n\n"
+            dropped = subscription.dropped
+
+        if types is None or event.type in types:
+            yield f"id: {event.id}\nevent: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+
+@router.get("/")
+async def get_events_stream(
+    type: Optional[list[str]] = Query(default=None),
+    events: EventBus = Depends(get_events),
+):
+    """
+    Stream provisioning events as Server-Sent Events, optionally only those of the given types.
+
+    Events are "step.started", "step.finished", "container.up", "container.down",
+    "route.configured" and "failure". A "dropped" event tells how many events were skipped
+    because the client did not keep up.
+    """
+
+    async def stream() -> AsyncIterator[str]:
+        with events.subscribe() as subscription:
+            async for message in _stream(subscription, set(type) if type else None):
+                yield message
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from ..images import ImageWarmer
+from ..dependencies import get_images
+
+router = APIRouter(prefix="/images")
+
+
+@router.get("/status")
+async def get_images_status(images: ImageWarmer = Depends(get_images)):
+    """
+    Get the state of the images teams are made of, which are pulled or built in the background at startup.
+
+    `ready` is true once every image is present locally, so that creating a team does not wait on a pull.
+    """
+
+    statuses = images.status()
+
+    return {
+        "ready": bool(statuses) and all(status.status == "ready" for status in statuses),
+        "images": statuses,
+    }
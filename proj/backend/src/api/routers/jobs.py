@@ -0,0 +1,32 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from ..jobs import JobQueue, JobStatus
+from ..dependencies import get_jobs
+
+router = APIRouter(prefix="/jobs")
+
+
+@router.get("/")
+async def get_jobs_list(
+    status: Optional[JobStatus] = None, limit: int = 50, jobs: JobQueue = Depends(get_jobs)
+):
+    """
+    List the most recent background jobs.
+    """
+
+    return await jobs.find(status=status, limit=limit)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, jobs: JobQueue = Depends(get_jobs)):
+    """
+    Get the progress of a background job, with the timing and error of each step.
+    """
+
+    job = await jobs.get(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
@@ -1,26 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from ..db import Database
-from ..dependencies import get_db
+from ..async_db import AsyncDatabase
+from ..dependencies import get_db, get_async_db
 
 router = APIRouter(prefix="/services")
 
 
 @router.get("/")
-async def get_services(db: Database = Depends(get_db)):
+async def get_services(db: AsyncDatabase = Depends(get_async_db)):
     """
     Return existing services
     """
 
-    services = db.get_services()
-
-    grouped_services = {}
-    for service in services:
-        if service.tag not in grouped_services:
-            grouped_services[service.tag] = []
-
-        grouped_services[service.tag].append(service)
-
-    return grouped_services
+    return await db.get_services_by_tag()
 
 @router.get("/default")
 async def get_default_services(db: Database = Depends(get_db)):
@@ -34,17 +26,18 @@ async def get_default_services(db: Database = Depends(get_db)):
             "web_ip": 0,
             "proxy_ip": 0,
             "dns_ip": 0,
+            **{variable: 0 for variable in db.tool_images},
         }).services
 
     return list(map(lambda s: {"label": s.labels['service.label'], "description": s.labels['service.description']}, services.values()))
 
 @router.get("/{service_id}")
-async def get_team(service_id: str, db: Database = Depends(get_db)):
+async def get_team(service_id: str, db: AsyncDatabase = Depends(get_async_db)):
     """
     Get information about a specific team.
     """
 
-    team = db.get_service(service_id)
+    team = await db.get_service(service_id)
 
     if not team:
         raise HTTPException(status_code=404, detail="Service not found")
@@ -0,0 +1,53 @@
+"""
+Incremental JSON encoding of long listings, for streaming responses.
+"""
+
+from typing import Any, AsyncIterable, AsyncIterator
+import json
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    """Returns whether an Accept header asks for newline-delimited JSON."""
+
+    return accept is not None and any(
+        media_range.split(";")[0].strip() in (NDJSON_MEDIA_TYPE, "application/jsonl")
+        for media_range in accept.split(",")
+    )
+
+
+def encode(item: Any) -> str:
+    """Encodes an item the way FastAPI would in a regular response."""
+
+    if isinstance(item, BaseModel):
+        return item.model_dump_json()
+
+    return json.dumps(jsonable_encoder(item), separators=(",", ":"))
+
+
+async def encode_json_array(batches: AsyncIterable[list[Any]]) -> AsyncIterator[str]:
+    """Encodes batches of items as a single JSON array, one batch at a time."""
+
+    yield "["
+
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+
+        yield ("" if first else ",") + ",".join(map(encode, batch))
+        first = False
+
+    yield "]"
+
+
+async def encode_ndjson(batches: AsyncIterable[list[Any]]) -> AsyncIterator[str]:
+    """Encodes batches of items as newline-delimited JSON, one batch at a time."""
+
+    async for batch in batches:
+        if batch:
+            yield "".join(encode(item) + "\n" for item in batch)
@@ -3,6 +3,7 @@ Code related to a deployment engine for network configurations made in the appli
 """
 
 from abc import ABC, abstractmethod
+from typing import Any
 from .converter import Converter
 
 from .models import Deployment
@@ -21,9 +22,12 @@ class Engine(ABC):
         self.converters: dict[type[Converter], type[Converter]] = {}
 
     @abstractmethod
-    def deploy(self, config: Deployment) -> None:
+    def deploy(self, config: Deployment, dry_run: bool = False) -> Any:
         """
         Deploys the specified deployment configuration.
+
+        With `dry_run`, only reports the changes deploying it would make.
+        Returns an engine-specific description of those changes.
         """
 
     @abstractmethod
@@ -2,8 +2,12 @@
 Classes and methods related to a Docker deployment engine.
 """
 
+from typing import Optional
+
+from .api import DockerEngineClient
 from .compose import DockerCompose
 from .compose.models import *
+from .reconciler import Action, Plan, Reconciler
 
 from .. import Engine
 from ..models import NetworkConverter, Deployment
@@ -12,22 +16,44 @@ from ..models import NetworkConverter, Deployment
 class Docker(Engine):
     """
     A deployment engine that configures a network using Docker.
+
+    Deploying reconciles Docker with the deployment: only the containers and networks
+    that are missing, changed or no longer wanted are touched.
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, client: Optional[DockerEngineClient] = None):
         super().__init__(name)
 
         self.compose = DockerCompose()
+        self.reconciler = Reconciler(
+            client if client is not None else DockerEngineClient()
+        )
 
         # TODO: improve this configuration
         self.converters = {NetworkConverter: DockerNetworkConverter}
 
-    def deploy(self, config: Deployment) -> None:
-        # TODO: implement this function
+    def deploy(self, config: Deployment, dry_run: bool = False) -> Plan:
+        """Brings Docker to the state described by a deployment.
+
+        Args:
+            config (Deployment): the desired state
+            dry_run (bool): whether to only print the plan, without applying it
+
+        Returns:
+            Plan: the changes that were, or would have been, made
+
+        Raises:
+            ValueError: if objects the deployment does not own are in the way, see `Reconciler.apply`
+        """
+
+        plan = self.reconciler.plan(config)
 
-        manifest = None
+        if dry_run:
+            print(plan)
+        elif not plan.empty:
+            self.reconciler.apply(plan)
 
-        self.compose.provision(manifest)
+        return plan
 
     def is_available(self) -> bool:
         return self.compose.is_available()
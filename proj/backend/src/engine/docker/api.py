@@ -0,0 +1,605 @@
+"""
+Client for the Docker Engine API, spoken over the daemon's Unix socket.
+"""
+
+from typing import Any, Optional
+from urllib.parse import quote, urlencode
+import http.client
+import io
+import json
+import os
+import queue
+import select
+import socket
+import struct
+import tarfile
+
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+
+API_VERSION = "1.41"
+"""The Engine API version requests are made against, supported since Docker 20.10."""
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE"))
+"""Methods whose requests can be sent again when the daemon drops the connection before answering."""
+
+
+class DockerAPIError(RuntimeError):
+    """Raised when the Docker daemon answers a request with an error."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+
+        self.status = status
+        self.message = message
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection to a server listening on a Unix socket."""
+
+    def __init__(self, socket_path: str, timeout: Optional[float]):
+        super().__init__("localhost", timeout=timeout)
+
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+
+        self.sock = sock
+
+
+class DockerEngineClient:
+    """
+    A minimal Docker Engine API client covering networks, containers, exec and images.
+
+    Requests go over HTTP on the daemon's Unix socket. Idle connections are kept in a pool
+    and reused with keep-alive, so most requests skip connecting altogether.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        pool_size: int = 4,
+        timeout: Optional[float] = 60,
+    ):
+        if socket_path is None:
+            socket_path = os.getenv("DOCKER_SOCKET_PATH", DEFAULT_SOCKET_PATH)
+
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+        self._pool: queue.LifoQueue[_UnixHTTPConnection] = queue.LifoQueue(pool_size)
+
+    def close(self):
+        """Closes every idle connection in the pool."""
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def ping(self) -> bool:
+        """Checks whether the Docker daemon is reachable.
+
+        Returns:
+            bool: whether the daemon answered
+        """
+
+        try:
+            self._request("GET", "/_ping", raw=True)
+            return True
+        except (OSError, http.client.HTTPException, DockerAPIError):
+            return False
+
+    def create_network(
+        self,
+        name: str,
+        driver: Optional[str] = None,
+        subnet: Optional[str] = None,
+        gateway: Optional[str] = None,
+        internal: Optional[bool] = None,
+        attachable: Optional[bool] = None,
+        labels: Optional[dict[str, str]] = None,
+    ) -> str:
+        """Creates a network.
+
+        Args:
+            name (str): the name of the network
+            driver (Optional[str]): the network driver, bridge by default
+            subnet (Optional[str]): the subnet of the network, in CIDR notation
+            gateway (Optional[str]): the gateway address of the network
+            internal (Optional[bool]): whether to restrict external access to the network
+            attachable (Optional[bool]): whether standalone containers can attach to the network
+            labels (Optional[dict[str, str]]): labels attached to the network
+
+        Returns:
+            str: the id of the created network
+        """
+
+        spec: dict[str, Any] = {"Name": name, "CheckDuplicate": True}
+
+        if driver is not None:
+            spec["Driver"] = driver
+        if internal is not None:
+            spec["Internal"] = internal
+        if attachable is not None:
+            spec["Attachable"] = attachable
+        if labels:
+            spec["Labels"] = labels
+
+        if subnet is not None:
+            ipam_config = {"Subnet": subnet}
+            if gateway is not None:
+                ipam_config["Gateway"] = gateway
+
+            spec["IPAM"] = {"Config": [ipam_config]}
+
+        return self._request("POST", "/networks/create", body=spec)["Id"]
+
+    def inspect_network(self, network: str) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a network.
+
+        Args:
+            network (str): the name or id of the network
+
+        Returns:
+            Optional[dict[str, Any]]: the network information, or None if there is no such network
+        """
+
+        return self._request("GET", f"/networks/{quote(network)}", missing_ok=True)
+
+    def list_networks(
+        self, labels: Optional[dict[str, str]] = None
+    ) -> list[dict[str, Any]]:
+        """Lists networks, optionally only those carrying the given labels.
+
+        Args:
+            labels (Optional[dict[str, str]]): labels the networks must carry, with these values
+
+        Returns:
+            list[dict[str, Any]]: the information of every matching network
+        """
+
+        return self._request("GET", "/networks", params=_label_filters(labels))
+
+    def remove_network(self, network: str):
+        """Removes a network, if it exists.
+
+        Args:
+            network (str): the name or id of the network
+        """
+
+        self._request("DELETE", f"/networks/{quote(network)}", missing_ok=True)
+
+    def connect_network(
+        self, network: str, container: str, ipv4_address: Optional[str] = None
+    ):
+        """Connects a container to a network.
+
+        Args:
+            network (str): the name or id of the network
+            container (str): the name or id of the container
+            ipv4_address (Optional[str]): the address the container takes in the network
+        """
+
+        spec: dict[str, Any] = {"Container": container}
+
+        if ipv4_address is not None:
+            spec["EndpointConfig"] = {"IPAMConfig": {"IPv4Address": ipv4_address}}
+
+        self._request("POST", f"/networks/{quote(network)}/connect", body=spec)
+
+    def disconnect_network(self, network: str, container: str, force: bool = False):
+        """Disconnects a container from a network.
+
+        Args:
+            network (str): the name or id of the network
+            container (str): the name or id of the container
+            force (bool): whether to disconnect a container that is not running
+        """
+
+        self._request(
+            "POST",
+            f"/networks/{quote(network)}/disconnect",
+            body={"Container": container, "Force": force},
+        )
+
+    def create_container(self, name: str, spec: dict[str, Any]) -> str:
+        """Creates a container.
+
+        Args:
+            name (str): the name of the container
+            spec (dict[str, Any]): the container configuration, as defined by the Engine API
+
+        Returns:
+            str: the id of the created container
+        """
+
+        return self._request(
+            "POST", "/containers/create", params={"name": name}, body=spec
+        )["Id"]
+
+    def inspect_container(self, container: str) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a container.
+
+        Args:
+            container (str): the name or id of the container
+
+        Returns:
+            Optional[dict[str, Any]]: the container information, or None if there is no such container
+        """
+
+        return self._request(
+            "GET", f"/containers/{quote(container)}/json", missing_ok=True
+        )
+
+    def list_containers(
+        self, labels: Optional[dict[str, str]] = None
+    ) -> list[dict[str, Any]]:
+        """Lists containers, running or not, optionally only those carrying the given labels.
+
+        Args:
+            labels (Optional[dict[str, str]]): labels the containers must carry, with these values
+
+        Returns:
+            list[dict[str, Any]]: the summary of every matching container
+        """
+
+        return self._request(
+            "GET",
+            "/containers/json",
+            params={"all": True, **(_label_filters(labels) or {})},
+        )
+
+    def start_container(self, container: str):
+        """Starts a container. Starting a running container does nothing.
+
+        Args:
+            container (str): the name or id of the container
+        """
+
+        self._request("POST", f"/containers/{quote(container)}/start")
+
+    def stop_container(self, container: str, timeout: Optional[int] = None):
+        """Stops a container, if it exists and is running.
+
+        Args:
+            container (str): the name or id of the container
+            timeout (Optional[int]): seconds to wait before killing the container
+        """
+
+        params = {"t": timeout} if timeout is not None else None
+
+        self._request(
+            "POST",
+            f"/containers/{quote(container)}/stop",
+            params=params,
+            missing_ok=True,
+            # the daemon waits for the container to stop before answering
+            timeout=None,
+        )
+
+    def remove_container(self, container: str, force: bool = False):
+        """Removes a container, if it exists.
+
+        Args:
+            container (str): the name or id of the container
+            force (bool): whether to kill the container first if it is running
+        """
+
+        self._request(
+            "DELETE",
+            f"/containers/{quote(container)}",
+            params={"force": force},
+            missing_ok=True,
+        )
+
+    def exec(self, container: str, command: list[str]) -> tuple[int, bytes]:
+        """Runs a command inside a running container and waits for it to finish.
+
+        Args:
+            container (str): the name or id of the container
+            command (list[str]): the command to run and its arguments
+
+        Returns:
+            tuple[int, bytes]: the exit code of the command and its combined output
+        """
+
+        exec_id = self._request(
+            "POST",
+            f"/containers/{quote(container)}/exec",
+            body={"Cmd": command, "AttachStdout": True, "AttachStderr": True},
+        )["Id"]
+
+        output = self._request(
+            "POST",
+            f"/exec/{exec_id}/start",
+            body={"Detach": False, "Tty": False},
+            raw=True,
+            timeout=None,
+        )
+
+        exit_code = self._request("GET", f"/exec/{exec_id}/json")["ExitCode"]
+
+        return exit_code, _demultiplex(output)
+
+    def image_exists(self, image: str) -> bool:
+        """Checks whether an image is present locally.
+
+        Args:
+            image (str): the name of the image
+
+        Returns:
+            bool: whether the image is present
+        """
+
+        return self.inspect_image(image) is not None
+
+    def inspect_image(self, image: str) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a local image.
+
+        Args:
+            image (str): the name or id of the image
+
+        Returns:
+            Optional[dict[str, Any]]: the image, or None if it is not present locally
+        """
+
+        return self._request("GET", f"/images/{quote(image)}/json", missing_ok=True)
+
+    def pull_image(self, image: str):
+        """Pulls an image from its registry.
+
+        Args:
+            image (str): the name of the image, with an optional tag
+        """
+
+        repository, tag = _split_image(image)
+
+        output = self._request(
+            "POST",
+            "/images/create",
+            params={"fromImage": repository, "tag": tag},
+            raw=True,
+            timeout=None,
+        )
+
+        _check_progress(output)
+
+    def build_image(
+        self, tag: str, context_path: str, dockerfile: Optional[str] = None
+    ):
+        """Builds an image from a local build context.
+
+        Args:
+            tag (str): the name to tag the built image with
+            context_path (str): the path to the build context directory
+            dockerfile (Optional[str]): the path of the Dockerfile inside the build context
+        """
+
+        context = io.BytesIO()
+        with tarfile.open(fileobj=context, mode="w") as tar:
+            tar.add(context_path, arcname=".")
+
+        params = {"t": tag}
+        if dockerfile is not None:
+            params["dockerfile"] = dockerfile
+
+        output = self._request(
+            "POST",
+            "/build",
+            params=params,
+            data=context.getvalue(),
+            content_type="application/x-tar",
+            raw=True,
+            timeout=None,
+        )
+
+        _check_progress(output)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        body: Optional[dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        content_type: str = "application/json",
+        raw: bool = False,
+        missing_ok: bool = False,
+        timeout: Optional[float] = -1,
+    ) -> Any:
+        """Sends a request to the daemon on a pooled connection.
+
+        Args:
+            method (str): the HTTP method
+            path (str): the unversioned request path
+            params (Optional[dict[str, Any]]): query string parameters
+            body (Optional[dict[str, Any]]): a JSON request body
+            data (Optional[bytes]): a raw request body, used instead of `body`
+            content_type (str): the content type of a raw request body
+            raw (bool): whether to return the response body undecoded
+            missing_ok (bool): whether to return None instead of raising on a 404
+            timeout (Optional[float]): socket timeout for this request, -1 for the client default
+
+        Returns:
+            Any: the decoded JSON response, the raw response body, or None for empty responses
+
+        Raises:
+            DockerAPIError: if the daemon answers with an error status
+        """
+
+        url = f"/v{API_VERSION}{path}"
+        if params:
+            url += "?" + urlencode(
+                {
+                    key: str(value).lower() if isinstance(value, bool) else value
+                    for key, value in params.items()
+                }
+            )
+
+        headers = {}
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+        if data is not None:
+            headers["Content-Type"] = content_type
+
+        status, response_data = self._send(
+            method, url, data, headers, self.timeout if timeout == -1 else timeout
+        )
+
+        if status == 404 and missing_ok:
+            return None
+
+        if status >= 400:
+            try:
+                message = json.loads(response_data)["message"]
+            except (ValueError, KeyError, TypeError):
+                message = response_data.decode("utf-8", "replace")
+
+            raise DockerAPIError(status, message)
+
+        if raw:
+            return response_data
+
+        return json.loads(response_data) if response_data else None
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[bytes],
+        headers: dict[str, str],
+        timeout: Optional[float],
+    ) -> tuple[int, bytes]:
+        connection = self._pooled_connection()
+        reused = connection is not None
+
+        if connection is None:
+            connection = _UnixHTTPConnection(self.socket_path, self.timeout)
+
+        try:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+
+            # a reused connection may have been closed by the daemon in the meantime: retry once on a new one
+            retry = reused
+
+            while True:
+                try:
+                    connection.request(method, url, body=data, headers=headers)
+                except ConnectionError:
+                    if not retry:
+                        raise
+
+                    # the request could not be sent, so it never reached the daemon
+                    retry = False
+                    connection.close()
+                    continue
+
+                try:
+                    response = connection.getresponse()
+                except http.client.RemoteDisconnected:
+                    # the daemon may have carried out the request before closing the connection,
+                    # so only requests that can safely be repeated are
+                    if not retry or method not in IDEMPOTENT_METHODS:
+                        raise
+
+                    retry = False
+                    connection.close()
+                    continue
+
+                break
+
+            response_data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            connection.timeout = self.timeout
+            connection.sock.settimeout(self.timeout)
+
+            try:
+                self._pool.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+
+        return response.status, response_data
+
+    def _pooled_connection(self) -> Optional[_UnixHTTPConnection]:
+        """Takes an idle connection from the pool, skipping those the daemon closed, if there is any."""
+
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                return None
+
+            # an idle connection is only readable once the daemon closed it
+            if connection.sock is not None and not select.select([connection.sock], [], [], 0)[0]:
+                return connection
+
+            connection.close()
+
+
+def _label_filters(labels: Optional[dict[str, str]]) -> Optional[dict[str, str]]:
+    """Builds the `filters` query parameter selecting objects by label."""
+
+    if not labels:
+        return None
+
+    return {
+        "filters": json.dumps(
+            {"label": [f"{key}={value}" for key, value in labels.items()]}
+        )
+    }
+
+
+def _split_image(image: str) -> tuple[str, str]:
+    """Splits an image name into its repository and its tag, which defaults to latest, or its digest."""
+
+    name, at, digest = image.partition("@")
+
+    # e.g. nginx@sha256:..., where the digest pins the image and any tag next to it is ignored
+    if at:
+        return _split_image(name)[0], digest
+
+    repository, _, tag = image.rpartition(":")
+
+    # a colon before the last slash belongs to a registry port, not to a tag
+    if not repository or "/" in tag:
+        return image, "latest"
+
+    return repository, tag
+
+
+def _demultiplex(output: bytes) -> bytes:
+    """Joins the frames of a multiplexed stdout/stderr stream into a single output."""
+
+    chunks = []
+    offset = 0
+
+    while offset + 8 <= len(output):
+        _, size = struct.unpack_from(">BxxxL", output, offset)
+        chunks.append(output[offset + 8 : offset + 8 + size])
+        offset += 8 + size
+
+    return b"".join(chunks)
+
+
+def _check_progress(output: bytes):
+    """Raises the first error reported in a stream of JSON progress messages."""
+
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+
+        message = json.loads(line)
+        if "error" in message:
+            raise DockerAPIError(500, message["error"])
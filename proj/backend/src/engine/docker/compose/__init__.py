@@ -1,26 +1,49 @@
 """_summary_
 """
 
-import subprocess
-import shlex
-import tempfile
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from .manifest import Manifest
 from .handler import DockerComposeManifestHandler
+from .backends import ComposeBackend, CLIBackend, EngineAPIBackend, get_backend
+from .async_backends import (
+    AsyncComposeBackend,
+    AsyncCLIBackend,
+    ThreadedBackend,
+    OutputHandler,
+    get_async_backend,
+)
+
+EventListener = Callable[[str, dict[str, Any]], None]
+"""Receives the type of every event `AsyncDockerCompose` emits, e.g. "container.up", along with its data."""
 
 
-# FIXME: advanced development would do this through the docker IPC socket.
 class DockerCompose:
-    """_summary_"""
+    """
+    Provisions Compose projects and manages their containers.
+
+    Operations are carried out by a pluggable backend: the `docker` command line tools,
+    or the Engine API spoken directly over the daemon's socket.
+    The backend is picked from the DOCKER_BACKEND environment variable, "cli" by default.
+    """
 
-    def __init__(self, manifest_handler: Optional[DockerComposeManifestHandler] = None):
+    def __init__(
+        self,
+        manifest_handler: Optional[DockerComposeManifestHandler] = None,
+        backend: Optional[ComposeBackend | str] = None,
+    ):
         self.handler = (
             manifest_handler
             if manifest_handler is not None
             else DockerComposeManifestHandler()
         )
 
+        self.backend = (
+            backend
+            if isinstance(backend, ComposeBackend)
+            else get_backend(backend, self.handler)
+        )
+
     def provision(self, manifest: Manifest):
         """Provisions the project representation by the given Manifest
 
@@ -28,20 +51,7 @@ class DockerCompose:
             manifest (Manifest): a Manifest object representing a Compose project
         """
 
-        manifest_str = self.handler.dump(manifest)
-        with tempfile.NamedTemporaryFile(mode="+w", encoding="utf-8") as tmp_file:
-
-            with tmp_file.file as f:
-                f.write(manifest_str)
-
-            try:
-                subprocess.run(
-                    shlex.split(f"docker compose -f {tmp_file.name} up -d"),
-                    check=True,
-                    capture_output=False,
-                )
-            except subprocess.CalledProcessError:
-                pass
+        self.backend.provision(manifest)
 
     def tear_down(self, manifest: Manifest):
         """Tears down the Compose project represented by the given Manifest
@@ -50,20 +60,86 @@ class DockerCompose:
             manifest (Manifest): a Manifest object representing a Compose project
         """
 
-        manifest_str = self.handler.dump(manifest)
-        with tempfile.NamedTemporaryFile(mode="+w", encoding="utf-8") as tmp_file:
+        self.backend.tear_down(manifest)
+
+    def connect_network(
+        self, network: str, container: str, ipv4_address: Optional[str] = None
+    ):
+        """Connects a container to a network.
 
-            with tmp_file.file as f:
-                f.write(manifest_str)
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+            ipv4_address (Optional[str]): the address the container takes in the network
+        """
 
-            try:
-                subprocess.run(
-                    shlex.split(f"docker compose -f {tmp_file.name} down"),
-                    check=True,
-                    capture_output=True,
-                )
-            except subprocess.CalledProcessError:
-                pass
+        self.backend.connect_network(network, container, ipv4_address)
+
+    def disconnect_network(self, network: str, container: str):
+        """Disconnects a container from a network.
+
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+        """
+
+        self.backend.disconnect_network(network, container)
+
+    def remove_container(self, container: str):
+        """Stops and removes a single container, leaving the rest of its project untouched.
+
+        Args:
+            container (str): the name of the container
+        """
+
+        self.backend.remove_container(container)
+
+    def pull_image(self, image: str):
+        """Pulls an image from its registry.
+
+        Args:
+            image (str): the name of the image, with an optional tag
+        """
+
+        self.backend.pull_image(image)
+
+    def inspect_image(self, image: str) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a local image.
+
+        Args:
+            image (str): the name or id of the image
+
+        Returns:
+            Optional[dict[str, Any]]: the image, or None if it is not present locally
+        """
+
+        return self.backend.inspect_image(image)
+
+    def build_image(
+        self, tag: str, context_path: str, dockerfile: Optional[str] = None
+    ):
+        """Builds an image from a local build context.
+
+        Args:
+            tag (str): the name to tag the built image with
+            context_path (str): the path to the build context directory
+            dockerfile (Optional[str]): the path of the Dockerfile inside the build context
+        """
+
+        self.backend.build_image(tag, context_path, dockerfile)
+
+    def exec(self, container: str, command: list[str]) -> int:
+        """Runs a command inside a running container and waits for it to finish.
+
+        Args:
+            container (str): the name of the container
+            command (list[str]): the command to run and its arguments
+
+        Returns:
+            int: the exit code of the command
+        """
+
+        return self.backend.exec(container, command)
 
     def is_available(self) -> bool:
         """Returns whether Docker compose is available on this system.
@@ -72,10 +148,218 @@ class DockerCompose:
             bool: Whether Docker Compose is available on this system or not
         """
 
+        return self.backend.is_available()
+
+
+class AsyncDockerCompose:
+    """
+    Awaitable counterpart of `DockerCompose`, for use inside the event loop.
+
+    With the CLI backend, commands run as asyncio subprocesses and their output is streamed while they run.
+    With the API backend, requests are made from worker threads.
+    Every operation takes an optional timeout in seconds and can be cancelled.
+
+    Progress is reported to an optional listener: "container.up" and "container.down"
+    for every container of a project, and "failure" when an operation raises.
+    """
+
+    def __init__(
+        self,
+        manifest_handler: Optional[DockerComposeManifestHandler] = None,
+        backend: Optional[AsyncComposeBackend | ComposeBackend | str] = None,
+        listener: Optional[EventListener] = None,
+    ):
+        self.handler = (
+            manifest_handler
+            if manifest_handler is not None
+            else DockerComposeManifestHandler()
+        )
+
+        if isinstance(backend, AsyncComposeBackend):
+            self.backend = backend
+        elif isinstance(backend, ComposeBackend):
+            self.backend = ThreadedBackend(backend)
+        else:
+            self.backend = get_async_backend(backend, self.handler)
+
+        self.listener = listener
+
+    async def provision(self, manifest: Manifest, timeout: Optional[float] = None):
+        """Provisions the project representation by the given Manifest
+
+        Args:
+            manifest (Manifest): a Manifest object representing a Compose project
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if provisioning did not finish in time
+        """
+
+        try:
+            await self.backend.provision(manifest, timeout)
+        except BaseException as e:
+            self._emit("failure", {"operation": "provision", "error": str(e) or type(e).__name__})
+            raise
+
+        for name, service in manifest.services.items():
+            self._emit("container.up", {"service": name, "container": service.container_name or name})
+
+    async def tear_down(self, manifest: Manifest, timeout: Optional[float] = None):
+        """Tears down the Compose project represented by the given Manifest
+
+        Args:
+            manifest (Manifest): a Manifest object representing a Compose project
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if tearing down did not finish in time
+        """
+
         try:
-            subprocess.run(
-                shlex.split("docker compose version"), check=True, capture_output=True
-            )
-            return True
-        except subprocess.CalledProcessError:
-            return False
+            await self.backend.tear_down(manifest, timeout)
+        except BaseException as e:
+            self._emit("failure", {"operation": "tear_down", "error": str(e) or type(e).__name__})
+            raise
+
+        for name, service in manifest.services.items():
+            self._emit("container.down", {"service": name, "container": service.container_name or name})
+
+    async def connect_network(
+        self,
+        network: str,
+        container: str,
+        ipv4_address: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Connects a container to a network.
+
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+            ipv4_address (Optional[str]): the address the container takes in the network
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if connecting did not finish in time
+        """
+
+        await self.backend.connect_network(network, container, ipv4_address, timeout)
+
+    async def disconnect_network(
+        self, network: str, container: str, timeout: Optional[float] = None
+    ):
+        """Disconnects a container from a network.
+
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if disconnecting did not finish in time
+        """
+
+        await self.backend.disconnect_network(network, container, timeout)
+
+    async def remove_container(self, container: str, timeout: Optional[float] = None):
+        """Stops and removes a single container, leaving the rest of its project untouched.
+
+        Args:
+            container (str): the name of the container
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if removing did not finish in time
+        """
+
+        try:
+            await self.backend.remove_container(container, timeout)
+        except BaseException as e:
+            self._emit("failure", {"operation": "remove_container", "container": container, "error": str(e) or type(e).__name__})
+            raise
+
+        self._emit("container.down", {"container": container})
+
+    async def pull_image(self, image: str, timeout: Optional[float] = None):
+        """Pulls an image from its registry.
+
+        Args:
+            image (str): the name of the image, with an optional tag
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if pulling did not finish in time
+        """
+
+        await self.backend.pull_image(image, timeout)
+
+    async def inspect_image(
+        self, image: str, timeout: Optional[float] = None
+    ) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a local image.
+
+        Args:
+            image (str): the name or id of the image
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Returns:
+            Optional[dict[str, Any]]: the image, or None if it is not present locally
+
+        Raises:
+            TimeoutError: if inspecting did not finish in time
+        """
+
+        return await self.backend.inspect_image(image, timeout)
+
+    async def build_image(
+        self,
+        tag: str,
+        context_path: str,
+        dockerfile: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Builds an image from a local build context.
+
+        Args:
+            tag (str): the name to tag the built image with
+            context_path (str): the path to the build context directory
+            dockerfile (Optional[str]): the path of the Dockerfile inside the build context
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Raises:
+            TimeoutError: if building did not finish in time
+        """
+
+        await self.backend.build_image(tag, context_path, dockerfile, timeout)
+
+    async def exec(
+        self, container: str, command: list[str], timeout: Optional[float] = None
+    ) -> int:
+        """Runs a command inside a running container and waits for it to finish.
+
+        Args:
+            container (str): the name of the container
+            command (list[str]): the command to run and its arguments
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Returns:
+            int: the exit code of the command
+
+        Raises:
+            TimeoutError: if the command did not finish in time
+        """
+
+        return await self.backend.exec(container, command, timeout)
+
+    async def is_available(self) -> bool:
+        """Returns whether Docker compose is available on this system.
+
+        Returns:
+            bool: Whether Docker Compose is available on this system or not
+        """
+
+        return await self.backend.is_available()
+
+    def _emit(self, type: str, data: dict[str, Any]):
+        if self.listener is not None:
+            self.listener(type, data)
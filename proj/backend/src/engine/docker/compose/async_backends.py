@@ -0,0 +1,360 @@
+"""
+Awaitable counterparts of the `DockerCompose` backends.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+from .backends import ComposeBackend, EngineAPIBackend
+from .handler import DockerComposeManifestHandler
+from .manifest import Manifest
+
+OutputHandler = Callable[[str, str], None]
+"""Receives every line a command writes, along with the stream it came from ("stdout" or "stderr")."""
+
+
+def print_output(stream: str, line: str):
+    """Forwards a line of command output to the same stream of this process."""
+
+    print(line, file=sys.stderr if stream == "stderr" else sys.stdout)
+
+
+class AsyncComposeBackend(ABC):
+    """
+    Abstract class for the operations `AsyncDockerCompose` delegates to the Docker daemon.
+
+    Every operation takes an optional timeout in seconds, raising TimeoutError when it runs out,
+    and can be cancelled like any other coroutine.
+    """
+
+    @abstractmethod
+    async def provision(self, manifest: Manifest, timeout: Optional[float] = None):
+        """Creates and starts everything described by the given Manifest."""
+
+    @abstractmethod
+    async def tear_down(self, manifest: Manifest, timeout: Optional[float] = None):
+        """Stops and removes everything described by the given Manifest."""
+
+    @abstractmethod
+    async def connect_network(
+        self,
+        network: str,
+        container: str,
+        ipv4_address: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Connects a container to a network."""
+
+    @abstractmethod
+    async def disconnect_network(
+        self, network: str, container: str, timeout: Optional[float] = None
+    ):
+        """Disconnects a container from a network."""
+
+    @abstractmethod
+    async def remove_container(self, container: str, timeout: Optional[float] = None):
+        """Stops and removes a single container, if it exists."""
+
+    @abstractmethod
+    async def pull_image(self, image: str, timeout: Optional[float] = None):
+        """Pulls an image from its registry."""
+
+    @abstractmethod
+    async def inspect_image(
+        self, image: str, timeout: Optional[float] = None
+    ) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a local image, None if it is not present locally."""
+
+    @abstractmethod
+    async def build_image(
+        self,
+        tag: str,
+        context_path: str,
+        dockerfile: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Builds an image from a local build context."""
+
+    @abstractmethod
+    async def exec(
+        self, container: str, command: list[str], timeout: Optional[float] = None
+    ) -> int:
+        """Runs a command inside a running container and returns its exit code."""
+
+    @abstractmethod
+    async def is_available(self) -> bool:
+        """Returns whether this backend can reach Docker on this system."""
+
+
+class AsyncCLIBackend(AsyncComposeBackend):
+    """
+    Runs every operation through the `docker` and `docker compose` command line tools,
+    as asyncio subprocesses whose output is streamed line by line while they run.
+
+    A command that times out or whose caller is cancelled is killed before the error propagates.
+    A command that fails raises `subprocess.CalledProcessError`, except for `exec`, which returns its exit code.
+    """
+
+    def __init__(
+        self,
+        handler: DockerComposeManifestHandler,
+        output_handler: OutputHandler = print_output,
+    ):
+        self.handler = handler
+        self.output_handler = output_handler
+
+    async def provision(self, manifest: Manifest, timeout: Optional[float] = None):
+        await self._run_compose(manifest, ["up", "-d"], timeout, check=True)
+
+    async def tear_down(self, manifest: Manifest, timeout: Optional[float] = None):
+        await self._run_compose(manifest, ["down"], timeout, check=True)
+
+    async def connect_network(
+        self,
+        network: str,
+        container: str,
+        ipv4_address: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        ip_option = ["--ip", ipv4_address] if ipv4_address is not None else []
+
+        await self._run(
+            ["docker", "network", "connect", *ip_option, network, container],
+            timeout,
+            check=True,
+        )
+
+    async def disconnect_network(
+        self, network: str, container: str, timeout: Optional[float] = None
+    ):
+        await self._run(
+            ["docker", "network", "disconnect", network, container], timeout, check=True
+        )
+
+    async def remove_container(self, container: str, timeout: Optional[float] = None):
+        await self._run(["docker", "rm", "--force", container], timeout, check=True)
+
+    async def pull_image(self, image: str, timeout: Optional[float] = None):
+        await self._run(["docker", "pull", "--quiet", image], timeout, check=True)
+
+    async def inspect_image(
+        self, image: str, timeout: Optional[float] = None
+    ) -> Optional[dict[str, Any]]:
+        lines = []
+
+        def collect(stream: str, line: str):
+            if stream == "stdout":
+                lines.append(line)
+
+        returncode = await self._run(
+            ["docker", "image", "inspect", image], timeout, output_handler=collect
+        )
+
+        if returncode != 0:
+            return None
+
+        return json.loads("\n".join(lines))[0]
+
+    async def build_image(
+        self,
+        tag: str,
+        context_path: str,
+        dockerfile: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        dockerfile_option = (
+            ["--file", os.path.join(context_path, dockerfile)]
+            if dockerfile is not None
+            else []
+        )
+
+        await self._run(
+            ["docker", "build", "--tag", tag, *dockerfile_option, context_path],
+            timeout,
+            check=True,
+        )
+
+    async def exec(
+        self, container: str, command: list[str], timeout: Optional[float] = None
+    ) -> int:
+        return await self._run(["docker", "exec", container, *command], timeout)
+
+    async def is_available(self) -> bool:
+        try:
+            return await self._run(["docker", "compose", "version"], timeout=30) == 0
+        except (OSError, TimeoutError):
+            return False
+
+    async def _run_compose(
+        self,
+        manifest: Manifest,
+        arguments: list[str],
+        timeout: Optional[float],
+        check: bool = False,
+    ) -> int:
+        fd, path = tempfile.mkstemp(suffix=".yml")
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.handler.dump(manifest))
+
+            return await self._run(
+                ["docker", "compose", "-f", path, *arguments], timeout, check=check
+            )
+        finally:
+            os.unlink(path)
+
+    async def _run(
+        self,
+        args: list[str],
+        timeout: Optional[float],
+        check: bool = False,
+        output_handler: Optional[OutputHandler] = None,
+    ) -> int:
+        """Runs a command, streaming its output, and returns its exit code.
+
+        The output goes to `output_handler` when given, and to the output handler of the backend otherwise.
+
+        Raises:
+            TimeoutError: if the command did not finish in time. The command is killed.
+            subprocess.CalledProcessError: if `check` is set and the command failed
+        """
+
+        # in its own session, so killing it also kills the plugins docker spawns, e.g. docker-compose
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+
+        try:
+            async with asyncio.timeout(timeout):
+                await asyncio.gather(
+                    self._pump(process.stdout, "stdout", output_handler or self.output_handler),
+                    self._pump(process.stderr, "stderr", output_handler or self.output_handler),
+                )
+                returncode = await process.wait()
+        except BaseException:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+            await asyncio.shield(process.wait())
+
+            raise
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, args)
+
+        return returncode
+
+    async def _pump(
+        self, stream: asyncio.StreamReader, name: str, output_handler: OutputHandler
+    ):
+        while line := await stream.readline():
+            output_handler(name, line.decode("utf-8", "replace").rstrip("\n"))
+
+
+class ThreadedBackend(AsyncComposeBackend):
+    """
+    Runs the operations of a blocking backend in worker threads, keeping the event loop free.
+
+    A timeout or cancellation stops waiting for the operation right away,
+    but an API call that was already sent runs to completion in its thread.
+    """
+
+    def __init__(self, backend: ComposeBackend):
+        self.backend = backend
+
+    async def provision(self, manifest: Manifest, timeout: Optional[float] = None):
+        await self._call(timeout, self.backend.provision, manifest)
+
+    async def tear_down(self, manifest: Manifest, timeout: Optional[float] = None):
+        await self._call(timeout, self.backend.tear_down, manifest)
+
+    async def connect_network(
+        self,
+        network: str,
+        container: str,
+        ipv4_address: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        await self._call(
+            timeout, self.backend.connect_network, network, container, ipv4_address
+        )
+
+    async def disconnect_network(
+        self, network: str, container: str, timeout: Optional[float] = None
+    ):
+        await self._call(timeout, self.backend.disconnect_network, network, container)
+
+    async def remove_container(self, container: str, timeout: Optional[float] = None):
+        await self._call(timeout, self.backend.remove_container, container)
+
+    async def pull_image(self, image: str, timeout: Optional[float] = None):
+        await self._call(timeout, self.backend.pull_image, image)
+
+    async def inspect_image(
+        self, image: str, timeout: Optional[float] = None
+    ) -> Optional[dict[str, Any]]:
+        return await self._call(timeout, self.backend.inspect_image, image)
+
+    async def build_image(
+        self,
+        tag: str,
+        context_path: str,
+        dockerfile: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        await self._call(
+            timeout, self.backend.build_image, tag, context_path, dockerfile
+        )
+
+    async def exec(
+        self, container: str, command: list[str], timeout: Optional[float] = None
+    ) -> int:
+        return await self._call(timeout, self.backend.exec, container, command)
+
+    async def is_available(self) -> bool:
+        return await asyncio.to_thread(self.backend.is_available)
+
+    async def _call(self, timeout: Optional[float], function, *args):
+        async with asyncio.timeout(timeout):
+            return await asyncio.to_thread(function, *args)
+
+
+def get_async_backend(
+    name: Optional[str], handler: DockerComposeManifestHandler
+) -> AsyncComposeBackend:
+    """Get an awaitable backend by name.
+
+    Args:
+        name (Optional[str]): either "cli" or "api", taken from DOCKER_BACKEND when not given
+        handler (DockerComposeManifestHandler): the manifest handler used by the CLI backend
+
+    Returns:
+        AsyncComposeBackend: the backend
+
+    Raises:
+        ValueError: if there is no backend with the given name
+    """
+
+    if name is None:
+        name = os.getenv("DOCKER_BACKEND", "cli")
+
+    match name:
+        case "cli":
+            return AsyncCLIBackend(handler)
+        case "api":
+            return ThreadedBackend(EngineAPIBackend())
+        case _:
+            raise ValueError(f"Unknown Docker backend: {name}")
@@ -0,0 +1,626 @@
+"""
+The ways `DockerCompose` can carry out operations on the Docker daemon.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+import json
+import os
+import shlex
+import subprocess
+import tempfile
+
+from ..api import DockerEngineClient
+from .handler import DockerComposeManifestHandler
+from .manifest import Manifest
+from .models import Service, BuildSpec, Network, NetworkSpec
+from .models.traits import GenerateConfig
+
+
+class ComposeBackend(ABC):
+    """
+    Abstract class for the operations `DockerCompose` delegates to the Docker daemon.
+    """
+
+    @abstractmethod
+    def provision(self, manifest: Manifest):
+        """Creates and starts everything described by the given Manifest.
+
+        Args:
+            manifest (Manifest): a Manifest object representing a Compose project
+        """
+
+    @abstractmethod
+    def tear_down(self, manifest: Manifest):
+        """Stops and removes everything described by the given Manifest.
+
+        Args:
+            manifest (Manifest): a Manifest object representing a Compose project
+        """
+
+    @abstractmethod
+    def connect_network(
+        self, network: str, container: str, ipv4_address: Optional[str] = None
+    ):
+        """Connects a container to a network.
+
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+            ipv4_address (Optional[str]): the address the container takes in the network
+        """
+
+    @abstractmethod
+    def disconnect_network(self, network: str, container: str):
+        """Disconnects a container from a network.
+
+        Args:
+            network (str): the name of the network
+            container (str): the name of the container
+        """
+
+    @abstractmethod
+    def remove_container(self, container: str):
+        """Stops and removes a single container, if it exists.
+
+        Args:
+            container (str): the name of the container
+        """
+
+    @abstractmethod
+    def pull_image(self, image: str):
+        """Pulls an image from its registry.
+
+        Args:
+            image (str): the name of the image, with an optional tag
+        """
+
+    @abstractmethod
+    def inspect_image(self, image: str) -> Optional[dict[str, Any]]:
+        """Get the low-level information of a local image.
+
+        Args:
+            image (str): the name or id of the image
+
+        Returns:
+            Optional[dict[str, Any]]: the image, or None if it is not present locally
+        """
+
+    @abstractmethod
+    def build_image(
+        self, tag: str, context_path: str, dockerfile: Optional[str] = None
+    ):
+        """Builds an image from a local build context.
+
+        Args:
+            tag (str): the name to tag the built image with
+            context_path (str): the path to the build context directory
+            dockerfile (Optional[str]): the path of the Dockerfile inside the build context
+        """
+
+    @abstractmethod
+    def exec(self, container: str, command: list[str]) -> int:
+        """Runs a command inside a running container and waits for it to finish.
+
+        Args:
+            container (str): the name of the container
+            command (list[str]): the command to run and its arguments
+
+        Returns:
+            int: the exit code of the command
+        """
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Returns whether this backend can reach Docker on this system."""
+
+
+class CLIBackend(ComposeBackend):
+    """
+    Runs every operation through the `docker` and `docker compose` command line tools.
+    """
+
+    def __init__(self, handler: DockerComposeManifestHandler):
+        self.handler = handler
+
+    def provision(self, manifest: Manifest):
+        manifest_str = self.handler.dump(manifest)
+        with tempfile.NamedTemporaryFile(mode="+w", encoding="utf-8") as tmp_file:
+
+            with tmp_file.file as f:
+                f.write(manifest_str)
+
+            try:
+                subprocess.run(
+                    shlex.split(f"docker compose -f {tmp_file.name} up -d"),
+                    check=True,
+                    capture_output=False,
+                )
+            except subprocess.CalledProcessError:
+                pass
+
+    def tear_down(self, manifest: Manifest):
+        manifest_str = self.handler.dump(manifest)
+        with tempfile.NamedTemporaryFile(mode="+w", encoding="utf-8") as tmp_file:
+
+            with tmp_file.file as f:
+                f.write(manifest_str)
+
+            try:
+                subprocess.run(
+                    shlex.split(f"docker compose -f {tmp_file.name} down"),
+                    check=True,
+                    capture_output=True,
+                )
+            except subprocess.CalledProcessError:
+                pass
+
+    def connect_network(
+        self, network: str, container: str, ipv4_address: Optional[str] = None
+    ):
+        ip_option = f"--ip {ipv4_address} " if ipv4_address is not None else ""
+
+        subprocess.run(
+            shlex.split(f"docker network connect {ip_option}{network} {container}"),
+            check=True,
+            capture_output=False,
+        )
+
+    def disconnect_network(self, network: str, container: str):
+        subprocess.run(
+            shlex.split(f"docker network disconnect {network} {container}"),
+            check=True,
+            capture_output=False,
+        )
+
+    def remove_container(self, container: str):
+        subprocess.run(
+            ["docker", "rm", "--force", container],
+            check=True,
+            capture_output=False,
+        )
+
+    def pull_image(self, image: str):
+        subprocess.run(
+            ["docker", "pull", "--quiet", image], check=True, capture_output=True
+        )
+
+    def inspect_image(self, image: str) -> Optional[dict[str, Any]]:
+        process = subprocess.run(
+            ["docker", "image", "inspect", image], capture_output=True, text=True
+        )
+
+        if process.returncode != 0:
+            return None
+
+        return json.loads(process.stdout)[0]
+
+    def build_image(
+        self, tag: str, context_path: str, dockerfile: Optional[str] = None
+    ):
+        dockerfile_option = (
+            ["--file", os.path.join(context_path, dockerfile)]
+            if dockerfile is not None
+            else []
+        )
+
+        subprocess.run(
+            ["docker", "build", "--tag", tag, *dockerfile_option, context_path],
+            check=True,
+            capture_output=False,
+        )
+
+    def exec(self, container: str, command: list[str]) -> int:
+        return subprocess.run(
+            ["docker", "exec", container, *command], capture_output=False
+        ).returncode
+
+    def is_available(self) -> bool:
+        try:
+            subprocess.run(
+                shlex.split("docker compose version"), check=True, capture_output=True
+            )
+            return True
+        except subprocess.CalledProcessError:
+            return False
+
+
+class EngineAPIBackend(ComposeBackend):
+    """
+    Talks to the Docker daemon directly through the Engine API.
+
+    Provisioning covers the subset of the Compose specification used by the platform's templates:
+    images and local builds, commands, environment, users, labels, ports, bind mounts,
+    capabilities, restart policies, DNS servers, dependencies and networks with static addresses.
+    Manifests using anything else are rejected, and should go through the CLI backend instead.
+    """
+
+    SUPPORTED_SERVICE_ATTRIBUTES = frozenset(
+        (
+            "build",
+            "cap_add",
+            "cap_drop",
+            "command",
+            "container_name",
+            "depends_on",
+            "dns",
+            "entrypoint",
+            "environment",
+            "hostname",
+            "image",
+            "labels",
+            "networks",
+            "ports",
+            "privileged",
+            "restart",
+            "stdin_open",
+            "tty",
+            "user",
+            "volumes",
+            "working_dir",
+        )
+    )
+    """Service attributes this backend knows how to provision."""
+
+    def __init__(
+        self,
+        client: Optional[DockerEngineClient] = None,
+        project_dir: Optional[str] = None,
+    ):
+        self.client = client if client is not None else DockerEngineClient()
+
+        # relative bind mounts resolve against the same directory `docker compose` uses for our manifests
+        self.project_dir = (
+            project_dir if project_dir is not None else tempfile.gettempdir()
+        )
+
+    def provision(self, manifest: Manifest):
+        for service_name, service in manifest.services.items():
+            self._check_supported(service_name, service)
+
+        for network_name, network in manifest.networks.items():
+            self._create_network(network_name, network)
+
+        for service_name in self._start_order(manifest):
+            service = manifest.services[service_name]
+            container_name = service.container_name or service_name
+
+            container = self.client.inspect_container(container_name)
+
+            if container is None:
+                self._ensure_image(service_name, service)
+
+                networks = self._networks(service)
+
+                self.client.create_container(
+                    container_name,
+                    self._container_spec(
+                        service_name, service, networks[0] if networks else None
+                    ),
+                )
+
+                for network_name, network_spec in networks[1:]:
+                    self.client.connect_network(
+                        network_name,
+                        container_name,
+                        network_spec.ipv4_address if network_spec is not None else None,
+                    )
+
+                self.client.start_container(container_name)
+            elif not container["State"]["Running"]:
+                self.client.start_container(container_name)
+
+    def tear_down(self, manifest: Manifest):
+        for service_name in reversed(self._start_order(manifest)):
+            service = manifest.services[service_name]
+
+            self.client.remove_container(service.container_name or service_name, force=True)
+
+        for network_name, network in manifest.networks.items():
+            if isinstance(network, Network) and network.external:
+                continue
+
+            self.client.remove_network(self._network_name(network_name, network))
+
+    def connect_network(
+        self, network: str, container: str, ipv4_address: Optional[str] = None
+    ):
+        self.client.connect_network(network, container, ipv4_address)
+
+    def disconnect_network(self, network: str, container: str):
+        self.client.disconnect_network(network, container)
+
+    def remove_container(self, container: str):
+        self.client.remove_container(container, force=True)
+
+    def pull_image(self, image: str):
+        self.client.pull_image(image)
+
+    def inspect_image(self, image: str) -> Optional[dict[str, Any]]:
+        return self.client.inspect_image(image)
+
+    def build_image(
+        self, tag: str, context_path: str, dockerfile: Optional[str] = None
+    ):
+        self.client.build_image(tag, context_path, dockerfile)
+
+    def exec(self, container: str, command: list[str]) -> int:
+        exit_code, output = self.client.exec(container, command)
+
+        if output:
+            print(output.decode("utf-8", "replace"), end="")
+
+        return exit_code
+
+    def is_available(self) -> bool:
+        return self.client.ping()
+
+    def _check_supported(self, service_name: str, service: Service):
+        unsupported = [
+            attr
+            for attr, value in service.to_dict().items()
+            if attr not in self.SUPPORTED_SERVICE_ATTRIBUTES and value is not None
+        ]
+
+        if unsupported:
+            raise ValueError(
+                f"Service {service_name} uses attributes the Engine API backend does not support: "
+                f"{', '.join(unsupported)}"
+            )
+
+    def _network_name(self, network_name: str, network: Network | Any) -> str:
+        if isinstance(network, Network) and network.name is not None:
+            return network.name
+
+        return network_name
+
+    def _create_network(self, network_name: str, network: Network | Any):
+        name = self._network_name(network_name, network)
+
+        if self.client.inspect_network(name) is not None:
+            return
+
+        if not isinstance(network, Network):
+            self.client.create_network(name)
+            return
+
+        if network.external:
+            return
+
+        labels = getattr(network, "labels", None)
+
+        subnet = gateway = None
+        if network.ipam is not None and network.ipam.config:
+            subnet = network.ipam.config[0].subnet
+            gateway = network.ipam.config[0].gateway
+
+        self.client.create_network(
+            name,
+            driver=network.driver,
+            subnet=subnet,
+            gateway=gateway,
+            internal=network.internal,
+            attachable=network.attachable,
+            labels=labels if isinstance(labels, dict) else None,
+        )
+
+    def _start_order(self, manifest: Manifest) -> list[str]:
+        """Orders the services of a manifest so that every service comes after its dependencies."""
+
+        order: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(service_name: str):
+            if service_name in order:
+                return
+
+            if service_name in visiting:
+                raise ValueError(f"Circular dependency on service {service_name}")
+
+            visiting.add(service_name)
+
+            for dependency in manifest.services[service_name].depends_on or ():
+                if dependency in manifest.services:
+                    visit(dependency)
+
+            visiting.discard(service_name)
+            order.append(service_name)
+
+        for service_name in manifest.services:
+            visit(service_name)
+
+        return order
+
+    def _networks(self, service: Service) -> list[tuple[str, Optional[NetworkSpec]]]:
+        if isinstance(service.networks, dict):
+            return list(service.networks.items())
+
+        return [(network_name, None) for network_name in service.networks or ()]
+
+    def _image_name(self, service_name: str, service: Service) -> str:
+        if service.image is not None:
+            return service.image
+
+        # the name `docker compose` gives images it builds
+        return f"{os.path.basename(self.project_dir)}-{service_name}"
+
+    def _ensure_image(self, service_name: str, service: Service):
+        image = self._image_name(service_name, service)
+
+        if self.client.image_exists(image):
+            return
+
+        if service.build is None:
+            self.client.pull_image(image)
+        elif isinstance(service.build, BuildSpec):
+            self.client.build_image(
+                image,
+                os.path.join(self.project_dir, service.build.context),
+                service.build.dockerfile,
+            )
+        else:
+            self.client.build_image(
+                image, os.path.join(self.project_dir, service.build)
+            )
+
+    def _container_spec(
+        self,
+        service_name: str,
+        service: Service,
+        network: Optional[tuple[str, Optional[NetworkSpec]]],
+    ) -> dict[str, Any]:
+        """Translates a service into the container configuration expected by the Engine API."""
+
+        spec: dict[str, Any] = {"Image": self._image_name(service_name, service)}
+        host_config: dict[str, Any] = {}
+
+        if service.command is not None:
+            spec["Cmd"] = (
+                shlex.split(service.command)
+                if isinstance(service.command, str)
+                else service.command
+            )
+
+        if service.entrypoint is not None:
+            spec["Entrypoint"] = (
+                shlex.split(service.entrypoint)
+                if isinstance(service.entrypoint, str)
+                else service.entrypoint
+            )
+
+        if service.environment is not None:
+            spec["Env"] = (
+                [f"{key}={value}" for key, value in service.environment.items()]
+                if isinstance(service.environment, dict)
+                else [str(variable) for variable in service.environment]
+            )
+
+        if service.user is not None:
+            spec["User"] = str(service.user)
+        if service.working_dir is not None:
+            spec["WorkingDir"] = service.working_dir
+        if service.hostname is not None:
+            spec["Hostname"] = service.hostname
+        if service.tty is not None:
+            spec["Tty"] = service.tty
+        if service.stdin_open is not None:
+            spec["OpenStdin"] = service.stdin_open
+
+        labels = getattr(service, "labels", None)
+        if isinstance(labels, dict):
+            spec["Labels"] = {key: str(value) for key, value in labels.items()}
+        elif isinstance(labels, list):
+            spec["Labels"] = dict(label.partition("=")[::2] for label in labels)
+
+        if service.ports:
+            exposed_ports, port_bindings = _port_bindings(service.ports)
+            spec["ExposedPorts"] = exposed_ports
+            host_config["PortBindings"] = port_bindings
+
+        if service.volumes:
+            host_config["Binds"] = [self._bind(volume) for volume in service.volumes]
+
+        if service.cap_add is not None:
+            host_config["CapAdd"] = service.cap_add
+        if service.cap_drop is not None:
+            host_config["CapDrop"] = service.cap_drop
+        if service.privileged is not None:
+            host_config["Privileged"] = service.privileged
+        if service.dns is not None:
+            host_config["Dns"] = (
+                [service.dns] if isinstance(service.dns, str) else service.dns
+            )
+        if isinstance(service.restart, str):
+            host_config["RestartPolicy"] = {"Name": service.restart}
+        elif service.restart is not None:
+            host_config["RestartPolicy"] = {
+                "Name": "on-failure",
+                "MaximumRetryCount": service.restart.max_retries or 0,
+            }
+
+        if network is not None:
+            network_name, network_spec = network
+            endpoint_config: dict[str, Any] = {}
+
+            if network_spec is not None and network_spec.ipv4_address is not None:
+                endpoint_config["IPAMConfig"] = {
+                    "IPv4Address": network_spec.ipv4_address
+                }
+
+            host_config["NetworkMode"] = network_name
+            spec["NetworkingConfig"] = {
+                "EndpointsConfig": {network_name: endpoint_config}
+            }
+
+        spec["HostConfig"] = host_config
+
+        return spec
+
+    def _bind(self, volume: str | GenerateConfig) -> str:
+        if not isinstance(volume, str):
+            raise ValueError(
+                "The Engine API backend only supports volumes in short syntax"
+            )
+
+        source, separator, rest = volume.partition(":")
+
+        if source.startswith("."):
+            source = os.path.normpath(os.path.join(self.project_dir, source))
+
+        return f"{source}{separator}{rest}"
+
+
+def _port_bindings(
+    ports: list[str | GenerateConfig],
+) -> tuple[dict[str, dict], dict[str, list[dict[str, str]]]]:
+    """Translates ports in short syntax, e.g. "8080:80/tcp", into exposed ports and port bindings."""
+
+    exposed_ports: dict[str, dict] = {}
+    port_bindings: dict[str, list[dict[str, str]]] = {}
+
+    for port in ports:
+        if not isinstance(port, (str, int)):
+            raise ValueError("The Engine API backend only supports ports in short syntax")
+
+        port, _, protocol = str(port).partition("/")
+        parts = port.split(":")
+
+        container_port = f"{parts[-1]}/{protocol or 'tcp'}"
+        exposed_ports[container_port] = {}
+
+        if len(parts) > 1:
+            binding = {"HostPort": parts[-2]}
+            if len(parts) > 2:
+                binding["HostIp"] = parts[-3]
+
+            port_bindings.setdefault(container_port, []).append(binding)
+
+    return exposed_ports, port_bindings
+
+
+def get_backend(
+    name: Optional[str], handler: DockerComposeManifestHandler
+) -> ComposeBackend:
+    """Get a backend by name.
+
+    Args:
+        name (Optional[str]): either "cli" or "api", taken from DOCKER_BACKEND when not given
+        handler (DockerComposeManifestHandler): the manifest handler used by the CLI backend
+
+    Returns:
+        ComposeBackend: the backend
+
+    Raises:
+        ValueError: if there is no backend with the given name
+    """
+
+    if name is None:
+        name = os.getenv("DOCKER_BACKEND", "cli")
+
+    match name:
+        case "cli":
+            return CLIBackend(handler)
+        case "api":
+            return EngineAPIBackend()
+        case _:
+            raise ValueError(f"Unknown Docker backend: {name}")
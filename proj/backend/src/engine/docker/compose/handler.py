@@ -1,6 +1,8 @@
 """_summary_
 """
 
+from typing import Optional
+
 import yaml
 
 from .manifest import ManifestTemplate, Manifest
@@ -15,13 +17,20 @@ class DockerComposeManifestHandler:
     def __init__(self):
         pass
 
-    def load(self, path: str) -> ManifestTemplate:
+    def load(
+        self, path: str, structural: bool = False, cache_size: Optional[int] = None
+    ) -> ManifestTemplate:
         """Loads a docker-compose.yaml manifest file and
 
         returns a DockerComposeManifestTemplate object.
 
         Args:
             path (str): the path to the docker-compose.yaml manifest file
+            structural (bool): whether to parse the template's YAML once up front,
+                instead of parsing the populated manifest on every compilation
+            cache_size (Optional[int]): how many compiled manifests to keep cached, 0 disables caching.
+                Defaults to 128 for textual templates and to no cache for structural ones,
+                since copying a cached manifest costs about as much as compiling it structurally.
 
         Returns:
             ManifestTemplate: An object which can generate a concrete manifest.
@@ -30,7 +39,12 @@ class DockerComposeManifestHandler:
         with open(path, "r", encoding="utf-8") as f:
             manifest_str = f.read()
 
-            manifest = ManifestTemplate(manifest_str)
+            if cache_size is None:
+                cache_size = 0 if structural else 128
+
+            manifest = ManifestTemplate(
+                manifest_str, structural=structural, cache_size=cache_size, path=path
+            )
 
             return manifest
 
@@ -1,6 +1,11 @@
 from dataclasses import dataclass, field
 
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Optional
+import copy
+import hashlib
+import os
+import re
 import yaml
 
 
@@ -21,39 +26,261 @@ class Manifest:
     configs: dict[str, Config | str] = field(default_factory=dict)
 
 
+class ManifestTemplateError(ValueError):
+    """
+    Raised when the values given to a template do not match its placeholders.
+    """
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+"""Matches a `{{ variable }}` placeholder inside a template."""
+
+_MARKER_PATTERN = re.compile(r"xTPLx(\d+)xTPLx")
+"""Matches the plain-scalar-safe markers placeholders are swapped with before parsing a template."""
+
+_Renderer = Callable[[dict[str, str]], object]
+
+
+class _TreeTemplate:
+    """
+    A template parsed into its YAML tree once, with the location of each placeholder recorded.
+
+    Rendering rebuilds the tree, patching only the keys and scalar values holding placeholders.
+    Patched plain scalars are resolved exactly like the YAML parser would,
+    so `ipv4_address: {{ ip }}` yields an int when given 0 and a string when given an address.
+
+    Values are always inserted as scalars:
+    unlike textual substitution, a value can never change the structure of the document.
+    """
+
+    def __init__(self, segments: list[str]):
+        variables = segments[1::2]
+
+        text = "".join(
+            f"xTPLx{index // 2}xTPLx" if index % 2 else segment
+            for index, segment in enumerate(segments)
+        )
+
+        self._variables = variables
+        self._loader = yaml.SafeLoader("")
+
+        node = yaml.compose(text, Loader=yaml.SafeLoader)
+        self._render = self._compile(node) if node is not None else lambda _: None
+
+    def render(self, values: dict[str, str]) -> object:
+        """Builds a new YAML tree with the given (already stringified) values."""
+
+        return self._render(values)
+
+    def _compile(self, node: yaml.Node) -> _Renderer:
+        if isinstance(node, yaml.MappingNode):
+            if any(key.tag == "tag:yaml.org,2002:merge" for key, _ in node.value):
+                raise ValueError("Merge keys are not supported in structural templates")
+
+            items = [(self._compile(key), self._compile(value)) for key, value in node.value]
+
+            return lambda values: {key(values): value(values) for key, value in items}
+
+        if isinstance(node, yaml.SequenceNode):
+            items = [self._compile(item) for item in node.value]
+
+            return lambda values: [item(values) for item in items]
+
+        parts = _MARKER_PATTERN.split(node.value)
+
+        if len(parts) == 1:
+            constant = self._loader.construct_object(node)
+            self._loader.constructed_objects.clear()
+
+            if isinstance(constant, (list, dict, set)):
+                raise ValueError(f"Unexpected mutable scalar: {node.value}")
+
+            return lambda _: constant
+
+        for index in range(1, len(parts), 2):
+            parts[index] = self._variables[int(parts[index])]
+
+        if node.style is not None:
+            return lambda values: self._join(parts, values)
+
+        return lambda values: self._resolve(self._join(parts, values))
+
+    @staticmethod
+    def _join(parts: list[str], values: dict[str, str]) -> str:
+        rendered = parts.copy()
+        for index in range(1, len(rendered), 2):
+            rendered[index] = values[rendered[index]]
+
+        return "".join(rendered)
+
+    def _resolve(self, value: str) -> object:
+        """Constructs a plain scalar the same way the YAML parser would."""
+
+        tag = self._loader.resolve(yaml.ScalarNode, value, (True, False))
+
+        return self._loader.yaml_constructors[tag](
+            self._loader, yaml.ScalarNode(tag, value)
+        )
+
+
 class ManifestTemplate:
     """
     Representation of a docker-compose.yaml manifest file template.
 
     This file is populated with given values to generate a concrete manifest.
+
+    Placeholders are located once, when the template is created,
+    so compiling only has to join the literal text with the given values.
+
+    In structural mode the template is also parsed into its YAML tree once,
+    and compiling patches that tree instead of parsing the populated text again.
+
+    Compiled manifests can be kept in a bounded LRU cache keyed by the template content and the given values.
+    Callers always get their own deep copy, so mutating a returned manifest never affects the cache.
+    When the template was loaded from a file, it is reloaded, and the cache cleared,
+    as soon as that file changes on disk.
     """
 
-    def __init__(self, manifest_str: str):
+    def __init__(
+        self,
+        manifest_str: str,
+        structural: bool = False,
+        cache_size: int = 0,
+        path: Optional[str] = None,
+    ):
+        self.path = path
+        self.cache_size = cache_size
+
+        self._structural = structural
+        self._cache: OrderedDict[str, Manifest] = OrderedDict()
+        self._file_stamp = self._stat() if path is not None else None
+
+        self._load(manifest_str)
+
+    def _load(self, manifest_str: str):
         self.manifest_str = manifest_str
+        self._digest = hashlib.sha256(manifest_str.encode("utf-8")).hexdigest()
+        self._cache.clear()
+
+        # even indexes hold literal text, odd indexes hold variable names
+        self._segments: list[str] = PLACEHOLDER_PATTERN.split(manifest_str)
+        self.variables: frozenset[str] = frozenset(self._segments[1::2])
+
+        self._tree: Optional[_TreeTemplate] = None
+        if self._structural:
+            if _MARKER_PATTERN.search(manifest_str):
+                raise ManifestTemplateError("Template clashes with placeholder markers")
+
+            self._tree = _TreeTemplate(self._segments)
+
+    @property
+    def structural(self) -> bool:
+        """Whether this template is compiled by patching a pre-parsed YAML tree."""
+
+        return self._tree is not None
 
     def compile(self, values: Optional[dict[str, Value]] = None) -> Manifest:
-        """_summary_
+        """Populates this template with the given values and parses the resulting manifest.
 
         Args:
-            values (dict): _description_
+            values (dict): the value of each placeholder in this template
 
         Returns:
-            Manifest: _description_
+            Manifest: the concrete manifest
+
+        Raises:
+            ManifestTemplateError: if a placeholder has no value or a value has no placeholder
         """
         if values is None:
             values = {}
 
-        manifest_str = self.manifest_str
+        if self.path is not None:
+            self._reload_if_changed()
+
+        if self.cache_size <= 0:
+            return self._compile(values)
+
+        key = self._cache_key(values)
+
+        manifest = self._cache.get(key)
+        if manifest is not None:
+            self._cache.move_to_end(key)
+
+            return copy.deepcopy(manifest)
+
+        manifest = self._compile(values)
+
+        self._cache[key] = copy.deepcopy(manifest)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
-        for key, value in values.items():
-            pattern = f"{{{{ {key} }}}}"
+        return manifest
 
-            manifest_str = manifest_str.replace(pattern, str(value))
+    def _compile(self, values: dict[str, Value]) -> Manifest:
+        if self._tree is not None:
+            self._check_values(values)
 
-        yaml_object = yaml.safe_load(manifest_str)
+            yaml_object = self._tree.render(
+                {key: str(value) for key, value in values.items()}
+            )
+        else:
+            yaml_object = yaml.safe_load(self.render(values))
 
         return self._parse_yaml_manifest_object(yaml_object)
 
+    def _cache_key(self, values: dict[str, Value]) -> str:
+        items = sorted((key, str(value)) for key, value in values.items())
+
+        return hashlib.sha256(repr((self._digest, items)).encode("utf-8")).hexdigest()
+
+    def _stat(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload_if_changed(self):
+        file_stamp = self._stat()
+
+        if file_stamp != self._file_stamp:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._load(f.read())
+
+            self._file_stamp = file_stamp
+
+    def render(self, values: dict[str, Value]) -> str:
+        """Populates this template with the given values, in a single pass over the template.
+
+        Args:
+            values (dict): the value of each placeholder in this template
+
+        Returns:
+            str: the populated manifest, as YAML text
+
+        Raises:
+            ManifestTemplateError: if a placeholder has no value or a value has no placeholder
+        """
+
+        self._check_values(values)
+
+        segments = self._segments.copy()
+        for index in range(1, len(segments), 2):
+            segments[index] = str(values[segments[index]])
+
+        return "".join(segments)
+
+    def _check_values(self, values: dict[str, Value]):
+        missing = self.variables.difference(values)
+        if missing:
+            raise ManifestTemplateError(
+                f"Missing values for template variables: {', '.join(sorted(missing))}"
+            )
+
+        unused = set(values).difference(self.variables)
+        if unused:
+            raise ManifestTemplateError(
+                f"Values given for unknown template variables: {', '.join(sorted(unused))}"
+            )
+
     def _parse_yaml_manifest_object(self, yaml_object: dict[str, Value]) -> Manifest:
 
         services = {}
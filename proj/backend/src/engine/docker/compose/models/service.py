@@ -2,10 +2,11 @@
 Classes related to service configuration specifications inside a docker-compose.yaml file.
 """
 
-from typing import Optional, Literal
+from typing import Any, Callable, Optional, Literal
 from dataclasses import dataclass, field
+import re
 
-from .traits import HasLabels, GenerateConfig
+from .traits import HasLabels, GenerateConfig, PARSER, parse_fields
 from .types import Duration, ByteValue, Value
 
 
@@ -1762,6 +1763,110 @@ class BuildSpec(HasLabels, GenerateConfig):
         )
 
 
+def _parse_mapping(parse: Callable[[dict[str, Value]], Any]) -> Callable[[Value], Any]:
+    """Parses a value with the given parser when it is a mapping, keeping it as is otherwise."""
+
+    return lambda spec: parse(spec) if isinstance(spec, dict) else spec
+
+
+def _parse_items(parse: Callable[[dict[str, Value]], Any]) -> Callable[[Value], Any]:
+    """Parses the mapping items of a list value with the given parser, keeping other values as they are."""
+
+    def parse_items(spec: Value) -> Any:
+        if not isinstance(spec, list):
+            return spec
+
+        return [parse(item) if isinstance(item, dict) else item for item in spec]
+
+    return parse_items
+
+
+def _parse_list(parse: Callable[[dict[str, Value]], Any]) -> Callable[[Value], Any]:
+    """Parses every item of a list value with the given parser."""
+
+    return lambda spec: [parse(item) for item in spec]
+
+
+def _parse_mapping_values(
+    parse: Callable[[dict[str, Value]], Any]
+) -> Callable[[Value], Any]:
+    """Parses every value of a mapping with the given parser, keeping other values as they are."""
+
+    def parse_mapping_values(spec: Value) -> Any:
+        if not isinstance(spec, dict):
+            return spec
+
+        return {name: parse(value) for name, value in spec.items()}
+
+    return parse_mapping_values
+
+
+def _parse_credential_spec(
+    credential_spec: dict[str, Value]
+) -> CredentialSpecFile | CredentialSpecRegistry | CredentialSpecConfig:
+    match credential_spec:
+        case {"registry": _}:
+            return CredentialSpecRegistry.parse(credential_spec)
+        case {"config": _}:
+            return CredentialSpecConfig.parse(credential_spec)
+        case {"file": _}:
+            return CredentialSpecFile.parse(credential_spec)
+        case _:
+            raise ValueError("Invalid credential specification", credential_spec)
+
+
+def _parse_ipc(ipc: str) -> str | IPCService:
+    if isinstance(ipc, str) and ipc != "shareable":
+        return IPCService(ipc)
+
+    return ipc
+
+
+def _parse_network_mode(network_mode: str) -> str | NetworkMode:
+    if network_mode not in ("none", "host"):
+        return NetworkMode(network_mode)
+
+    return network_mode
+
+
+def _parse_pull_policy(pull_policy: str) -> str:
+    if pull_policy not in ("always", "never", "missing", "build", "if_not_present"):
+        raise ValueError(f"Invalid value for pull policy: {pull_policy}")
+
+    return pull_policy
+
+
+_FAILURE_RESTART_PATTERN = re.compile(r"on-failure(?::(\d+))?")
+
+
+def _parse_restart(restart: str) -> str | FailureRestartPolicy:
+    match restart:
+        case "no" | "always" | "unless-stopped":
+            return restart
+        case str() if (m := _FAILURE_RESTART_PATTERN.fullmatch(restart)) is not None:
+            max_retries = m.group(1)
+
+            return FailureRestartPolicy(
+                int(max_retries) if max_retries is not None else None
+            )
+        case _:
+            raise ValueError(f"Invalid value for restart: {restart}")
+
+
+def _parse_runtime(runtime: str) -> str:
+    if runtime and runtime not in ("runc",):
+        raise ValueError(f"Invalid value for runtime: {runtime}")
+
+    return runtime
+
+
+def _parse_uts(uts: str) -> str:
+    if uts and uts not in ("host",):
+        raise ValueError(f"Unexpected UTS value: {uts}")
+
+    return uts
+
+
 @dataclass(kw_only=True, slots=True)
 class Service(HasLabels, GenerateConfig):
     """
@@ -1779,12 +1884,12 @@ class Service(HasLabels, GenerateConfig):
     until you explicitly request it to.
     """
 
-    build: Optional[str | BuildSpec] = None
+    build: Optional[str | BuildSpec] = field(default=None, metadata={PARSER: _parse_mapping(BuildSpec.parse)})
     """
     Build context configuration for this service.
     """
 
-    blkio_config: Optional[BlockIOConfig] = None
+    blkio_config: Optional[BlockIOConfig] = field(default=None, metadata={PARSER: _parse_mapping(BlockIOConfig.parse)})
     """
     Defines a set of configuration options to set block IO limits for a service
     """
@@ -1814,14 +1919,14 @@ class Service(HasLabels, GenerateConfig):
     Configures CPU CFS (Completely Fair Scheduler) quota when a platform is based on Linux kernel.
     """
 
-    cpu_rt_runtime: Optional[Duration] = None
+    cpu_rt_runtime: Optional[Duration] = field(default=None, metadata={PARSER: Duration.from_string})
     """
     Configures CPU allocation parameters for platforms with support for realtime scheduler.
     
     It can be either an integer value using microseconds as unit or a duration.
     """
 
-    cpu_rt_period: Optional[Duration] = None
+    cpu_rt_period: Optional[Duration] = field(default=None, metadata={PARSER: Duration.from_string})
     """
     Configures CPU allocation parameters for platforms with support for realtime scheduler.
     
@@ -1868,7 +1973,7 @@ class Service(HasLabels, GenerateConfig):
     Overrides the default command declared by the container image.
     """
 
-    configs: Optional[list[str | Config]] = None
+    configs: Optional[list[str | Config]] = field(default=None, metadata={PARSER: _parse_items(Config.parse)})
     """
     Specifies configuration values accessible to this container.
     """
@@ -1880,22 +1985,22 @@ class Service(HasLabels, GenerateConfig):
 
     credential_spec: Optional[
         CredentialSpecRegistry | CredentialSpecConfig | CredentialSpecFile
-    ] = None
+    ] = field(default=None, metadata={PARSER: _parse_credential_spec})
     """
     Credential specification for this managed services.
     """
 
-    depends_on: Optional[list[str] | dict[str, DependencyConfig]] = None
+    depends_on: Optional[list[str] | dict[str, DependencyConfig]] = field(default=None, metadata={PARSER: _parse_mapping_values(DependencyConfig.parse)})
     """
     Specifies services that this service depends on.
     """
 
-    deploy: Optional[Deployment] = None
+    deploy: Optional[Deployment] = field(default=None, metadata={PARSER: Deployment.parse})
     """
     Specifies the configuration for the deployment and lifecycle of this service.
     """
 
-    develop: Optional[Development] = None
+    develop: Optional[Development] = field(default=None, metadata={PARSER: Development.parse})
     """
     Specifies the development configuration for maintaining a container in sync with source.
     """
@@ -1935,7 +2040,7 @@ class Service(HasLabels, GenerateConfig):
     Declares the default entrypoint for the service container.
     """
 
-    env_file: Optional[str | list[str | EnvFile]] = None
+    env_file: Optional[str | list[str | EnvFile]] = field(default=None, metadata={PARSER: _parse_items(EnvFile.parse)})
     """
     Adds environment variables to the container based on the file content.
     """
@@ -1950,7 +2055,7 @@ class Service(HasLabels, GenerateConfig):
     Defines the (incoming) port or a range of ports that Compose exposes from the container.
     """
 
-    extends: Optional[list[ExtensionsSpec]] = None
+    extends: Optional[list[ExtensionsSpec]] = field(default=None, metadata={PARSER: _parse_list(ExtensionsSpec.parse)})
     """
     Defines extensions to this compose service.
     """
@@ -1971,7 +2076,7 @@ class Service(HasLabels, GenerateConfig):
     which the user inside the container must be a member of.
     """
 
-    healthcheck: Optional[HealthCheck] = None
+    healthcheck: Optional[HealthCheck] = field(default=None, metadata={PARSER: _parse_mapping(HealthCheck.parse)})
     """
     Defines the configuration used to verify the health of this service's container.
     """
@@ -1992,7 +2097,7 @@ class Service(HasLabels, GenerateConfig):
     Set this option to true to enable this feature for the service.
     """
 
-    ipc: Optional[Literal["shareable"] | IPCService] = None
+    ipc: Optional[Literal["shareable"] | IPCService] = field(default=None, metadata={PARSER: _parse_ipc})
     """
     Configures the IPC isolation mode set by the service container.
     """
@@ -2009,7 +2114,7 @@ class Service(HasLabels, GenerateConfig):
     Defines a network link to containers in another service.
     """
 
-    logging: Optional[LoggingConfig] = None
+    logging: Optional[LoggingConfig] = field(default=None, metadata={PARSER: _parse_mapping(LoggingConfig.parse)})
     """
     Configures the logging subsystem for this service container.
     """
@@ -2019,12 +2124,12 @@ class Service(HasLabels, GenerateConfig):
     Sets a mac_address for the service container.
     """
 
-    mem_limit: Optional[ByteValue] = None
+    mem_limit: Optional[ByteValue] = field(default=None, metadata={PARSER: ByteValue.from_string})
     """
     Configures a limit on the amount of memory a container can allocate.
     """
 
-    mem_reservation: Optional[ByteValue] = None
+    mem_reservation: Optional[ByteValue] = field(default=None, metadata={PARSER: ByteValue.from_string})
     """
     Configures a reservation on the amount of memory a container can allocate.
     """
@@ -2035,17 +2140,17 @@ class Service(HasLabels, GenerateConfig):
     for the host kernel to swap out anonymous memory pages used by a container
     """
 
-    memswap_limit: Optional[ByteValue] = None
+    memswap_limit: Optional[ByteValue] = field(default=None, metadata={PARSER: ByteValue.from_string})
     """
     Controls the amount of memory a container can swap to disk.
     """
 
-    network_mode: Optional[Literal["none", "host"] | NetworkMode] = None
+    network_mode: Optional[Literal["none", "host"] | NetworkMode] = field(default=None, metadata={PARSER: _parse_network_mode})
     """
     Sets a service container's network mode.
     """
 
-    networks: Optional[list[str] | dict[str, NetworkSpec]] = None
+    networks: Optional[list[str] | dict[str, NetworkSpec]] = field(default=None, metadata={PARSER: _parse_mapping_values(NetworkSpec.parse)})
     """
     Configures networks to which this service's container should connect to.
     """
@@ -2075,7 +2180,7 @@ class Service(HasLabels, GenerateConfig):
     Defines the target platform the containers for the service run on.
     """
 
-    ports: Optional[list[str | PortSpec]] = None
+    ports: Optional[list[str | PortSpec]] = field(default=None, metadata={PARSER: _parse_items(PortSpec.parse)})
     """
     Exposes container ports.
     """
@@ -2092,7 +2197,7 @@ class Service(HasLabels, GenerateConfig):
 
     pull_policy: Optional[
         Literal["always", "never", "missing", "build", "if_not_present"]
-    ] = None
+    ] = field(default=None, metadata={PARSER: _parse_pull_policy})
     """
     Defines the decisions Compose makes when it starts to pull images
     """
@@ -2104,12 +2209,12 @@ class Service(HasLabels, GenerateConfig):
 
     restart: Optional[
         Literal["no", "always", "unless-stopped"] | FailureRestartPolicy
-    ] = None
+    ] = field(default=None, metadata={PARSER: _parse_restart})
     """
     Defines the policy that the platform applies on container termination.
     """
 
-    runtime: Optional[Literal["runc"]] = None
+    runtime: Optional[Literal["runc"]] = field(default=None, metadata={PARSER: _parse_runtime})
     """
     Specifies which runtime to use for the service’s containers.
     """
@@ -2119,7 +2224,7 @@ class Service(HasLabels, GenerateConfig):
     Specifies the default number of containers to deploy for this service
     """
 
-    secrets: Optional[list[str] | dict[str, Secret]] = None
+    secrets: Optional[list[str] | dict[str, Secret]] = field(default=None, metadata={PARSER: _parse_mapping_values(Secret.parse)})
     """
     Grants access to sensitive data defined by secrets on a per-service basis.
     """
@@ -2129,7 +2234,7 @@ class Service(HasLabels, GenerateConfig):
     Overrides the default labeling scheme for each container.
     """
 
-    shm_size: Optional[ByteValue] = None
+    shm_size: Optional[ByteValue] = field(default=None, metadata={PARSER: ByteValue.from_string})
     """
     Configures the size of the shared memory
     """
@@ -2139,7 +2244,7 @@ class Service(HasLabels, GenerateConfig):
     Configures a service containers to run with an allocated stdin.
     """
 
-    stop_grace_period: Optional[Duration] = None
+    stop_grace_period: Optional[Duration] = field(default=None, metadata={PARSER: Duration.from_string})
     """
     Duration of time for a container to stop gracefully before the Docker Engine forcefully kills it.
     """
@@ -2169,7 +2274,7 @@ class Service(HasLabels, GenerateConfig):
     Configures a service container to run with a TTY.
     """
 
-    ulimits: Optional[int | ULimits] = None
+    ulimits: Optional[int | ULimits] = field(default=None, metadata={PARSER: _parse_mapping(ULimits.parse)})
     """
     Overrides the default ulimits for a container.
     """
@@ -2184,12 +2289,12 @@ class Service(HasLabels, GenerateConfig):
     Sets the user namespace for the service.
     """
 
-    uts: Optional[Literal["host"]] = None
+    uts: Optional[Literal["host"]] = field(default=None, metadata={PARSER: _parse_uts})
     """
     Configures the UTS namespace mode set for the service container.-
     """
 
-    volumes: Optional[list[Volume]] = None
+    volumes: Optional[list[Volume]] = field(default=None, metadata={PARSER: _parse_items(Volume.parse)})
     """
     Define mount host paths or named volumes that are accessible by service containers
     """
@@ -2208,414 +2313,21 @@ class Service(HasLabels, GenerateConfig):
     def parse(service_spec: dict[str, Value]):
         """Parses a service specification and returns a Service object.
 
+        Only the keys present in the specification are visited,
+        each one converted according to the metadata of the matching field.
+
         Args:
             service_spec (dict[str, Value]): a specification of the service
 
         Raises:
-            ValueError: If some of the values fall out of their domain range
+            ValueError: If some of the values fall out of their domain range,
+                or the specification has keys that are not service attributes
 
         Returns:
             Service: a Service object holding the parsed data
         """
 
-        annotations = service_spec.get("annotations", None)
-        attach = service_spec.get("attach", None)
-
-        build = None
-        if "build" in service_spec:
-
-            build = service_spec.get("build")
-
-            if isinstance(build, dict):
-                build = BuildSpec.parse(build)
-
-        blkio_config = None
-        if "blkio_config" in service_spec:
-            blkio_config = service_spec.get("blkio_config")
-
-            if isinstance(blkio_config, dict):
-                blkio_config = BlockIOConfig.parse(blkio_config)
-
-        cpu_count = service_spec.get("cpu_count", None)
-        cpu_percent = service_spec.get("cpu_percent", None)
-        cpu_shares = service_spec.get("cpu_shares", None)
-        cpu_period = service_spec.get("cpu_period", None)
-        cpu_quota = service_spec.get("cpu_quota", None)
-
-        cpu_rt_runtime = service_spec.get("cpu_rt_runtime", None)
-        if cpu_rt_runtime is not None:
-            cpu_rt_runtime = Duration.from_string(cpu_rt_runtime)
-
-        cpu_rt_period = service_spec.get("cpu_rt_period", None)
-        if cpu_rt_period is not None:
-            cpu_rt_period = Duration.from_string(cpu_rt_period)
-
-        cpus = service_spec.get("cpus", None)
-        cpuset = service_spec.get("cpuset", None)
-
-        cap_add = service_spec.get("cap_add", None)
-        cap_drop = service_spec.get("cap_drop", None)
-
-        cgroup = service_spec.get("cgroup", None)
-        cgroup_parent = service_spec.get("cgroup_parent", None)
-
-        command = service_spec.get("command", None)
-
-        configs = None
-        if "configs" in service_spec:
-            configs = service_spec.get("configs")
-
-            configs = [
-                (
-                    Config.parse(config_spec)
-                    if isinstance(config_spec, dict)
-                    else config_spec
-                )
-                for config_spec in configs
-            ]
-
-        container_name = service_spec.get("container_name", None)
-
-        credential_spec = None
-        if "credential_spec" in service_spec:
-
-            credential_spec = service_spec.get("credential_spec")
-
-            match credential_spec:
-                case {"registry": _}:
-                    credential_spec = CredentialSpecRegistry.parse(credential_spec)
-                case {"config": _}:
-                    credential_spec = CredentialSpecConfig.parse(credential_spec)
-                case {"file": _}:
-                    credential_spec = CredentialSpecFile.parse(credential_spec)
-                case _:
-                    raise ValueError(
-                        "Invalid credential specification", credential_spec
-                    )
-
-        depends_on = None
-        if "depends_on" in service_spec:
-            depends_on = service_spec.get("depends_on")
-
-            if isinstance(depends_on, dict):
-                depends_on = {
-                    service_name: DependencyConfig.parse(dependency_spec)
-                    for service_name, dependency_spec in depends_on.items()
-                }
-
-        deploy = None
-        if "deploy" in service_spec:
-            deploy = Deployment.parse(service_spec.get("deploy"))
-
-        develop = None
-        if "develop" in service_spec:
-            develop = Development.parse(service_spec.get("develop"))
-
-        device_cgroup_rules = service_spec.get("device_cgroup_rules", None)
-
-        devices = service_spec.get("devices", None)
-
-        dns = service_spec.get("dns", None)
-        dns_opt = service_spec.get("dns_opt", None)
-        dns_search = service_spec.get("dns_search", None)
-
-        domainname = service_spec.get("domainname", None)
-
-        entrypoint = service_spec.get("entrypoint", None)
-
-        env_file = None
-        if "env_file" in service_spec:
-            env_file = service_spec.get("env_file")
-
-            env_file = [
-                (
-                    EnvFile.parse(env_file_spec)
-                    if isinstance(env_file_spec, dict)
-                    else env_file_spec
-                )
-                for env_file_spec in env_file
-            ]
-
-            if isinstance(env_file, list):
-                env_file = [EnvFile.parse(env_file_spec) for env_file_spec in env_file]
-
-        environment = service_spec.get("environment", None)
-
-        expose = service_spec.get("expose", None)
-
-        extends = None
-        if "extends" in service_spec:
-            extends = service_spec.get("extends")
-
-            extends = [
-                ExtensionsSpec.parse(extension_spec) for extension_spec in extends
-            ]
-
-        external_links = service_spec.get("external_links", None)
-        extra_hosts = service_spec.get("extra_hosts", None)
-        group_add = service_spec.get("group_add", None)
-
-        healthcheck = None
-        if "healthcheck" in service_spec:
-            healthcheck = service_spec.get("healthcheck")
-
-            if isinstance(healthcheck, dict):
-                healthcheck = HealthCheck.parse(healthcheck)
-
-        hostname = service_spec.get("hostname", None)
-        image = service_spec.get("image", None)
-
-        init = service_spec.get("init", None)
-
-        ipc = None
-        if "ipc" in service_spec:
-            ipc = service_spec.get("ipc", None)
-
-            if isinstance(ipc, str):
-                if ipc != "shareable":
-                    ipc = IPCService(ipc)
-
-        isolation = service_spec.get("isolation", None)
-        links = service_spec.get("links", None)
-
-        logging = None
-        if "logging" in service_spec:
-            logging = service_spec.get("logging")
-
-            if isinstance(logging, dict):
-                logging = LoggingConfig.parse(logging)
-
-        mac_address = service_spec.get("mac_address", None)
-
-        mem_limit = None
-        if "mem_limit" in service_spec:
-            mem_limit = ByteValue.from_string(service_spec.get("mem_limit"))
-
-        mem_reservation = None
-        if "mem_reservation" in service_spec:
-            mem_reservation = ByteValue.from_string(service_spec.get("mem_reservation"))
-        mem_swappiness = service_spec.get("mem_swappiness", None)
-
-        memswap_limit = None
-        if "memswap_limit" in service_spec:
-            memswap_limit = ByteValue.from_string(service_spec.get("memswap_limit"))
-
-        network_mode = None
-        if "network_mode" in service_spec:
-            network_mode = service_spec.get("network_mode")
-
-            if network_mode not in ("none", "host"):
-                network_mode = NetworkMode(network_mode)
-
-        networks = None
-        if "networks" in service_spec:
-            networks = service_spec.get("networks")
-
-            if isinstance(networks, dict):
-                networks = {
-                    network_name: NetworkSpec.parse(network_spec)
-                    for network_name, network_spec in networks.items()
-                }
-
-        oom_kill_disable = service_spec.get("oom_kill_disable", None)
-        oom_score_adj = service_spec.get("oom_score_adj", None)
-        pid = service_spec.get("pid", None)
-        pids_limit = service_spec.get("pids_limit", None)
-        platform = service_spec.get("platform", None)
-
-        ports = None
-        if "ports" in service_spec:
-            ports = service_spec.get("ports")
-
-            ports = [
-                PortSpec.parse(port_spec) if isinstance(port_spec, dict) else port_spec
-                for port_spec in ports
-            ]
-
-        privileged = service_spec.get("privileged", None)
-        profiles = service_spec.get("profiles", None)
-
-        pull_policy = None
-        if "pull_policy" in service_spec:
-            pull_policy = service_spec.get("pull_policy")
-
-            if pull_policy not in (
-                "always",
-                "never",
-                "missing",
-                "build",
-                "if_not_present",
-            ):
-                raise ValueError(f"Invalid value for pull policy: {pull_policy}")
-
-        read_only = service_spec.get("read_only", None)
-
-        restart = None
-        if "restart" in service_spec:
-            _restart = service_spec.get("restart", None)
-
-            match _restart:
-                case "no" | "always" | "unless-stopped":
-                    restart = _restart
-                case str():
-                    import re
-
-                    pattern = re.compile(r"on-failure(:\d+)?")
-
-                    if (m := pattern.match(_restart)) is not None:
-                        max_retries = int(m.group())
-
-                        restart = FailureRestartPolicy(max_retries)
-                case _:
-                    raise ValueError(f"Invalid value for restart: {_restart}")
-
-        runtime = service_spec.get("runtime", None)
-        if runtime and runtime not in ("runc",):
-            raise ValueError(f"Invalid value for runtime: {runtime}")
-
-        scale = service_spec.get("scale", None)
-
-        secrets = None
-        if "secrets" in service_spec:
-            secrets = service_spec.get("secrets")
-
-            if isinstance(secrets, dict):
-                secrets = {
-                    secret_name: Secret.parse(secret_spec)
-                    for secret_name, secret_spec in secrets.items()
-                }
-
-        security_opt = service_spec.get("security_opt", None)
-        shm_size = None
-        if "shm_size" in service_spec:
-            shm_size = ByteValue.from_string(service_spec.get("shm_size"))
-
-        stdin_open = service_spec.get("stdin_open")
-
-        stop_grace_period = None
-        if "stop_grace_period" in service_spec:
-            stop_grace_period = Duration.from_string(
-                service_spec.get("stop_grace_period")
-            )
-
-        stop_signal = service_spec.get("stop_signal", None)
-        storage_opt = service_spec.get("storage_opt", None)
-        sysctl = service_spec.get("sysctl", None)
-        tmpfs = service_spec.get("tmpfs", None)
-        tty = service_spec.get("tty", None)
-
-        ulimits = None
-        if "ulimits" in service_spec:
-            ulimits = service_spec.get("ulimits")
-
-            if isinstance(ulimits, dict):
-                ulimits = ULimits.parse(ulimits)
-
-        userns_mode = service_spec.get("userns_mode", None)
-        uts = service_spec.get("uts", None)
-        if uts and uts not in ("host",):
-            raise ValueError(f"Unexpected UTS value: {uts}")
-
-        volumes = None
-        if "volumes" in service_spec:
-            volumes = service_spec.get("volumes")
-
-            volumes = [
-                (
-                    Volume.parse(volume_spec)
-                    if isinstance(volume_spec, dict)
-                    else volume_spec
-                )
-                for volume_spec in volumes
-            ]
-
-        volumes_from = service_spec.get("volumes_from", None)
-
-        working_dir = service_spec.get("working_dir", None)
-
-        service = Service(
-            annotations=annotations,
-            attach=attach,
-            build=build,
-            blkio_config=blkio_config,
-            cpu_count=cpu_count,
-            cpu_percent=cpu_percent,
-            cpu_shares=cpu_shares,
-            cpu_period=cpu_period,
-            cpu_quota=cpu_quota,
-            cpu_rt_runtime=cpu_rt_runtime,
-            cpu_rt_period=cpu_rt_period,
-            cpus=cpus,
-            cpuset=cpuset,
-            cap_add=cap_add,
-            cap_drop=cap_drop,
-            cgroup=cgroup,
-            cgroup_parent=cgroup_parent,
-            command=command,
-            container_name=container_name,
-            credential_spec=credential_spec,
-            depends_on=depends_on,
-            deploy=deploy,
-            develop=develop,
-            device_cgroup_rules=device_cgroup_rules,
-            devices=devices,
-            dns=dns,
-            dns_opt=dns_opt,
-            dns_search=dns_search,
-            domainname=domainname,
-            entrypoint=entrypoint,
-            env_file=env_file,
-            environment=environment,
-            expose=expose,
-            extends=extends,
-            external_links=external_links,
-            extra_hosts=extra_hosts,
-            group_add=group_add,
-            healthcheck=healthcheck,
-            hostname=hostname,
-            image=image,
-            init=init,
-            ipc=ipc,
-            isolation=isolation,
-            links=links,
-            logging=logging,
-            mac_address=mac_address,
-            mem_limit=mem_limit,
-            mem_reservation=mem_reservation,
-            mem_swappiness=mem_swappiness,
-            memswap_limit=memswap_limit,
-            network_mode=network_mode,
-            networks=networks,
-            oom_kill_disable=oom_kill_disable,
-            oom_score_adj=oom_score_adj,
-            pid=pid,
-            pids_limit=pids_limit,
-            platform=platform,
-            ports=ports,
-            privileged=privileged,
-            profiles=profiles,
-            pull_policy=pull_policy,
-            read_only=read_only,
-            restart=restart,
-            runtime=runtime,
-            scale=scale,
-            secrets=secrets,
-            security_opt=security_opt,
-            shm_size=shm_size,
-            stdin_open=stdin_open,
-            stop_grace_period=stop_grace_period,
-            stop_signal=stop_signal,
-            storage_opt=storage_opt,
-            sysctl=sysctl,
-            tmpfs=tmpfs,
-            tty=tty,
-            ulimits=ulimits,
-            userns_mode=userns_mode,
-            uts=uts,
-            volumes=volumes,
-            volumes_from=volumes_from,
-            working_dir=working_dir,
-        )
+        service = Service(**parse_fields(Service, service_spec, ignore=("labels",)))
         service.labels = service_spec.get("labels", None)
 
         return service
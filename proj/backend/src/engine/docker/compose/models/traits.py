@@ -3,7 +3,8 @@ Useful traits shared by multiple Compose configuration blocks.
 """
 
 from abc import ABC
-from typing import Optional
+from typing import Any, Callable, Iterable, Optional
+import dataclasses
 
 
 class HasLabels(ABC):
@@ -41,36 +42,169 @@ class CanBeExternal(ABC):
 class GenerateConfig(ABC):
     """
     Abstract class that provides the ability to generate configuration from models.
+
+    The attributes to serialize are worked out once per class, from its dataclass fields
+    and the attributes declared by its traits, so generating configuration only visits those.
     """
 
     def _filter_attr(self, attr):
         return not attr.startswith("_") and attr not in ("parse", "to_dict")
 
     def to_dict(self):
-        """ """
+        """Generates the configuration this object represents.
 
-        config = {}
+        Attributes that are not set are left out.
+        Nested models, including those inside lists and dictionaries, are converted as well.
+
+        Returns:
+            dict: the configuration, keyed by attribute name in alphabetical order
+        """
 
-        attrs = (attr for attr in dir(self) if self._filter_attr(attr))
+        config = {}
 
-        for attr in attrs:
-            value = getattr(self, attr)
+        for attr in _serialized_attributes(self):
+            value = getattr(self, attr, None)
 
             if value is not None:
+                convert = _VALUE_CONVERTERS.get(type(value))
+                if convert is None:
+                    convert = _converter_for(type(value))
 
-                if isinstance(value, GenerateConfig):
-                    config[attr] = value.to_dict()
-                elif isinstance(value, list):
-                    config[attr] = [
-                        v.to_dict() if isinstance(v, GenerateConfig) else v
-                        for v in value
-                    ]
-                elif isinstance(value, dict):
-                    config[attr] = {
-                        k: v.to_dict() if isinstance(v, GenerateConfig) else v
-                        for k, v in value.items()
-                    }
-                else:
-                    config[attr] = value
+                config[attr] = convert(value)
 
         return config
+
+
+_SERIALIZED_ATTRIBUTES: dict[type, tuple[str, ...]] = {}
+"""The attributes serialized by `to_dict`, per dataclass model."""
+
+_VALUE_CONVERTERS: dict[type, Callable[[Any], Any]] = {}
+"""How `to_dict` converts an attribute value, per value type."""
+
+_ITEM_CONVERTERS: dict[type, Callable[[Any], Any]] = {}
+"""How `to_dict` converts the items of list and dictionary values, per item type."""
+
+
+def _serialized_attributes(obj: GenerateConfig) -> Iterable[str]:
+    cls = type(obj)
+
+    attrs = _SERIALIZED_ATTRIBUTES.get(cls)
+    if attrs is not None:
+        return attrs
+
+    if not dataclasses.is_dataclass(cls):
+        # plain models may set arbitrary attributes, so they have to be looked up every time
+        return sorted(attr for attr in dir(obj) if obj._filter_attr(attr))
+
+    names = {field.name for field in dataclasses.fields(cls)}
+
+    # attributes declared by traits are not dataclass fields
+    for base in cls.__mro__:
+        if not dataclasses.is_dataclass(base):
+            names.update(vars(base).get("__annotations__", {}))
+
+    attrs = _SERIALIZED_ATTRIBUTES[cls] = tuple(
+        sorted(attr for attr in names if obj._filter_attr(attr))
+    )
+
+    return attrs
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_dict(value: GenerateConfig) -> dict:
+    return value.to_dict()
+
+
+def _convert_item(value: Any) -> Any:
+    convert = _ITEM_CONVERTERS.get(type(value))
+
+    if convert is None:
+        convert = _ITEM_CONVERTERS[type(value)] = (
+            _to_dict if issubclass(type(value), GenerateConfig) else _identity
+        )
+
+    return convert(value)
+
+
+def _convert_list(value: list) -> list:
+    return [_convert_item(v) for v in value]
+
+
+def _convert_dict(value: dict) -> dict:
+    return {k: _convert_item(v) for k, v in value.items()}
+
+
+def _converter_for(value_type: type) -> Callable[[Any], Any]:
+    if issubclass(value_type, GenerateConfig):
+        convert = _to_dict
+    elif issubclass(value_type, list):
+        convert = _convert_list
+    elif issubclass(value_type, dict):
+        convert = _convert_dict
+    else:
+        convert = _identity
+
+    _VALUE_CONVERTERS[value_type] = convert
+
+    return convert
+
+
+PARSER = "parse"
+"""
+Key of the dataclass field metadata holding the function that converts a field's raw specification value.
+
+Fields without one keep the value found in the specification as is.
+"""
+
+_FIELD_PARSERS: dict[type, dict[str, Optional[Callable[[Any], Any]]]] = {}
+"""The converter of every field accepted by `parse_fields`, per dataclass model."""
+
+
+def parse_fields(
+    cls: type, spec: dict[str, Any], ignore: Iterable[str] = ()
+) -> dict[str, Any]:
+    """Converts a specification into the keyword arguments of a dataclass model.
+
+    The converters are read once per model from the `PARSER` metadata of its fields,
+    and only the keys present in the specification are visited.
+    Compose extension keys (starting with "x-") are skipped.
+
+    Args:
+        cls (type): the dataclass model to build
+        spec (dict[str, Any]): the specification to convert
+        ignore (Iterable[str]): keys the caller handles itself, e.g. attributes declared by traits
+
+    Returns:
+        dict[str, Any]: the converted value of every field set in the specification
+
+    Raises:
+        ValueError: if the specification has keys that are not fields of the model
+    """
+
+    parsers = _FIELD_PARSERS.get(cls)
+    if parsers is None:
+        parsers = _FIELD_PARSERS[cls] = {
+            field.name: field.metadata.get(PARSER)
+            for field in dataclasses.fields(cls)
+            if field.init
+        }
+
+    kwargs = {}
+    unknown = []
+
+    for key, value in spec.items():
+        if key in parsers:
+            parser = parsers[key]
+            kwargs[key] = value if parser is None or value is None else parser(value)
+        elif key not in ignore and not str(key).startswith("x-"):
+            unknown.append(key)
+
+    if unknown:
+        raise ValueError(
+            f"Unknown keys in {cls.__name__} specification: {', '.join(sorted(unknown))}"
+        )
+
+    return kwargs
@@ -0,0 +1,178 @@
+"""
+Images derived from public base images, with the tools team containers need installed at build time
+instead of on every start.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+import asyncio
+import hashlib
+import os
+import tempfile
+
+import yaml
+
+from .compose import AsyncDockerCompose
+
+
+@dataclass(kw_only=True, frozen=True)
+class ToolImage:
+    """
+    A base image with a list of Debian packages installed on top of it.
+
+    The image is tagged with a hash of its Dockerfile, so that changing the base image
+    or the packages gives a new tag, and an unchanged image is never rebuilt.
+    """
+
+    name: str
+    """
+    The name of the image, without repository nor tag, e.g. "dns".
+    """
+
+    base: str
+    """
+    The image to install the packages on, e.g. "nginx:latest".
+    """
+
+    packages: tuple[str, ...]
+    """
+    The packages to install.
+    """
+
+    repository: str = "grs"
+    """
+    The repository the image is tagged in.
+    """
+
+    @property
+    def dockerfile(self) -> str:
+        """The Dockerfile building the image. Packages are sorted, so their order does not change the image."""
+
+        packages = " ".join(sorted(set(self.packages)))
+
+        return (
+            f"FROM {self.base}\n"
+            "\n"
+            "USER root\n"
+            "\n"
+            f"RUN apt-get update && apt-get install -y {packages} && rm -rf /var/lib/apt/lists/*\n"
+        )
+
+    @property
+    def content_hash(self) -> str:
+        """A hash of the Dockerfile building the image."""
+
+        return hashlib.sha256(self.dockerfile.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def tag(self) -> str:
+        """The full name of the image, e.g. "grs/dns:3f1c2a9b0d4e"."""
+
+        return f"{self.repository}/{self.name}:{self.content_hash}"
+
+
+def load_tool_images(path: str) -> dict[str, ToolImage]:
+    """Loads the tool images described by a YAML file.
+
+    The file maps names, usually the template variables the images are given to, to the `name`,
+    `base`, `packages` and optional `repository` of an image.
+
+    Args:
+        path (str): the path to the YAML file
+
+    Returns:
+        dict[str, ToolImage]: the images, by name
+
+    Raises:
+        ValueError: if an image misses its base or its packages
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        specs: dict[str, dict[str, Any]] = yaml.safe_load(f) or {}
+
+    images = {}
+
+    for key, spec in specs.items():
+        if not spec.get("base") or not spec.get("packages"):
+            raise ValueError(f"Tool image {key} needs a base image and packages")
+
+        images[key] = ToolImage(
+            name=spec.get("name", key),
+            base=spec["base"],
+            packages=tuple(spec["packages"]),
+            repository=spec.get("repository", ToolImage.repository),
+        )
+
+    return images
+
+
+class ToolImageBuilder:
+    """
+    Builds tool images that are not present locally.
+
+    Images are only looked up once: after that, they are assumed to stay present,
+    until `forget` is called for them. Concurrent requests for the same image share a single build.
+    """
+
+    def __init__(self, compose: AsyncDockerCompose, images: Iterable[ToolImage]):
+        self.compose = compose
+        self.images = {image.tag: image for image in images}
+
+        self._present: set[str] = set()
+        self._builds: dict[str, asyncio.Task] = {}
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self.images
+
+    def forget(self, tag: str):
+        """Looks an image up again the next time it is needed, e.g. because it was removed.
+
+        Args:
+            tag (str): the tag of one of the images of this builder
+        """
+
+        self._present.discard(tag)
+
+    async def ensure(self, tag: str, timeout: Optional[float] = None) -> bool:
+        """Builds an image unless it is present locally.
+
+        Args:
+            tag (str): the tag of one of the images of this builder
+            timeout (Optional[float]): seconds to wait before giving up
+
+        Returns:
+            bool: whether the image was built
+
+        Raises:
+            TimeoutError: if building did not finish in time
+        """
+
+        if tag in self._present:
+            return False
+
+        build = self._builds.get(tag)
+
+        if build is None:
+            build = asyncio.create_task(self._ensure(self.images[tag], timeout))
+            build.add_done_callback(lambda _: self._builds.pop(tag, None))
+
+            self._builds[tag] = build
+
+        # cancelling one of the callers must not cancel the build the others wait for
+        return await asyncio.shield(build)
+
+    async def _ensure(self, image: ToolImage, timeout: Optional[float]) -> bool:
+        built = False
+
+        if await self.compose.inspect_image(image.tag, timeout=timeout) is None:
+            with tempfile.TemporaryDirectory() as context_path:
+                with open(os.path.join(context_path, "Dockerfile"), "w", encoding="utf-8") as f:
+                    f.write(image.dockerfile)
+
+                await self.compose.build_image(image.tag, context_path, timeout=timeout)
+
+            built = True
+
+        self._present.add(image.tag)
+
+        return built
@@ -0,0 +1,337 @@
+"""
+Reconciliation of the containers and networks of a deployment with the ones actually running in Docker.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+import hashlib
+import json
+
+from .api import DockerEngineClient
+from ..models import CIDR, Deployment, IPAddress, Router
+
+DEPLOYMENT_LABEL = "grs.deployment"
+"""Label carrying the name of the deployment an object belongs to."""
+
+SPEC_HASH_LABEL = "grs.spec-hash"
+"""Label carrying a hash of the configuration a container was created with."""
+
+Operation = Literal["create", "update", "start", "remove", "conflict"]
+
+_SYMBOLS: dict[Operation, str] = {"create": "+", "update": "~", "start": ">", "remove": "-", "conflict": "!"}
+
+
+@dataclass(kw_only=True, frozen=True)
+class Action:
+    """
+    A change to a single Docker object.
+    """
+
+    operation: Operation
+    """
+    What to do: create the object, recreate it with a new configuration, start it, or remove it.
+    Conflicts are objects in the way that the deployment does not own: they block the whole plan.
+    """
+
+    kind: Literal["network", "container"]
+    """
+    The kind of object.
+    """
+
+    name: str
+    """
+    The name of the object.
+    """
+
+    reason: Optional[str] = None
+    """
+    Why the object has to change, when it is not obvious from the operation.
+    """
+
+    spec: Optional[dict[str, Any]] = field(default=None, compare=False)
+    """
+    The configuration the object is created with.
+    """
+
+    def __str__(self) -> str:
+        return f"{_SYMBOLS[self.operation]} {self.kind} {self.name}" + (
+            f" ({self.reason})" if self.reason else ""
+        )
+
+
+@dataclass
+class Plan:
+    """
+    The changes bringing the actual state of a deployment to its desired state.
+    """
+
+    deployment: str
+    """
+    The name of the deployment.
+    """
+
+    actions: list[Action] = field(default_factory=list)
+    """
+    The changes, in the order they were found. They are applied in dependency order.
+    """
+
+    @property
+    def empty(self) -> bool:
+        """Whether the deployment is already in its desired state."""
+
+        return not self.actions
+
+    def of(self, kind: str, *operations: Operation) -> list[Action]:
+        """Get the actions on the given kind of object, with any of the given operations."""
+
+        return [
+            action
+            for action in self.actions
+            if action.kind == kind and action.operation in operations
+        ]
+
+    def __str__(self) -> str:
+        if self.empty:
+            return f"Deployment {self.deployment} is up to date"
+
+        return "\n".join(
+            [f"Deployment {self.deployment}:", *(f"  {action}" for action in self.actions)]
+        )
+
+
+class Reconciler:
+    """
+    Computes and applies the minimal changes bringing Docker to the state described by a deployment.
+
+    Every object of a deployment is labelled with the deployment's name,
+    so objects no longer described by the deployment can be found and removed.
+    Containers are also labelled with a hash of their configuration, so that only those whose
+    configuration changed are recreated.
+    """
+
+    def __init__(self, client: DockerEngineClient):
+        self.client = client
+
+    def plan(self, deployment: Deployment) -> Plan:
+        """Compares a deployment with the actual state of Docker.
+
+        Args:
+            deployment (Deployment): the desired state
+
+        Returns:
+            Plan: the changes needed to reach it
+        """
+
+        labels = {DEPLOYMENT_LABEL: deployment.team_name}
+        networks, containers = self.desired_state(deployment)
+
+        plan = Plan(deployment.team_name)
+
+        actual_networks = {
+            network["Name"]: network for network in self.client.list_networks(labels)
+        }
+        actual_containers = {
+            container["Names"][0].lstrip("/"): container
+            for container in self.client.list_containers(labels)
+        }
+
+        recreated_networks = set()
+
+        for name, spec in networks.items():
+            actual = actual_networks.get(name) or self.client.inspect_network(name)
+
+            if actual is None:
+                plan.actions.append(Action(operation="create", kind="network", name=name, spec=spec))
+                continue
+
+            actual_subnets = [config.get("Subnet") for config in (actual.get("IPAM") or {}).get("Config") or ()]
+
+            # recreating it would cut off the containers of whoever created it, e.g. docker compose
+            if (actual.get("Labels") or {}).get(DEPLOYMENT_LABEL) != deployment.team_name:
+                plan.actions.append(
+                    Action(
+                        operation="conflict",
+                        kind="network",
+                        name=name,
+                        reason="exists but is not managed by this deployment",
+                    )
+                )
+            elif actual_subnets != [spec["subnet"]]:
+                plan.actions.append(
+                    Action(
+                        operation="update",
+                        kind="network",
+                        name=name,
+                        reason=f"subnet {', '.join(map(str, actual_subnets)) or 'none'} -> {spec['subnet']}",
+                        spec=spec,
+                    )
+                )
+                recreated_networks.add(name)
+
+        for name, spec in containers.items():
+            actual = actual_containers.get(name)
+
+            if actual is None:
+                # left over by something else, e.g. docker compose
+                inspected = self.client.inspect_container(name)
+
+                if inspected is None:
+                    plan.actions.append(Action(operation="create", kind="container", name=name, spec=spec))
+                else:
+                    plan.actions.append(
+                        Action(
+                            operation="update",
+                            kind="container",
+                            name=name,
+                            reason="not managed by this deployment",
+                            spec=spec,
+                        )
+                    )
+
+                continue
+
+            network = spec["HostConfig"]["NetworkMode"]
+
+            if (actual.get("Labels") or {}).get(SPEC_HASH_LABEL) != spec["Labels"][SPEC_HASH_LABEL]:
+                plan.actions.append(
+                    Action(operation="update", kind="container", name=name, reason="configuration changed", spec=spec)
+                )
+            elif network in recreated_networks:
+                plan.actions.append(
+                    Action(operation="update", kind="container", name=name, reason=f"network {network} recreated", spec=spec)
+                )
+            elif actual.get("State") != "running":
+                plan.actions.append(
+                    Action(operation="start", kind="container", name=name, reason=f"{actual.get('State')}")
+                )
+
+        for name in actual_containers.keys() - containers.keys():
+            plan.actions.append(Action(operation="remove", kind="container", name=name))
+
+        for name in actual_networks.keys() - networks.keys():
+            plan.actions.append(Action(operation="remove", kind="network", name=name))
+
+        return plan
+
+    def apply(self, plan: Plan):
+        """Applies a plan: containers that go away first, then networks, then new containers.
+
+        Containers of other deployments attached to a recreated network, e.g. the organization router,
+        are connected to it again, keeping their address when it is still inside the network's subnet.
+
+        Args:
+            plan (Plan): the plan, as computed by `plan`
+
+        Raises:
+            ValueError: if the plan has conflicts. Nothing is changed then.
+        """
+
+        conflicts = [action for action in plan.actions if action.operation == "conflict"]
+
+        if conflicts:
+            raise ValueError(
+                f"Cannot deploy {plan.deployment}: {', '.join(f'{action.kind} {action.name} {action.reason}' for action in conflicts)}"
+            )
+
+        for action in plan.of("container", "remove", "update"):
+            self.client.remove_container(action.name, force=True)
+
+        for action in plan.of("network", "remove"):
+            self._remove_network(action.name)
+
+        attached = {action.name: self._remove_network(action.name) for action in plan.of("network", "update")}
+
+        for action in plan.of("network", "create", "update"):
+            self.client.create_network(action.name, **action.spec)
+
+            subnet = CIDR.from_string(action.spec["subnet"])
+
+            for container, address in attached.get(action.name, []):
+                if address is not None and IPAddress.from_string(address) not in subnet:
+                    address = None
+
+                self.client.connect_network(action.name, container, address)
+
+        for action in plan.of("container", "create", "update"):
+            if not self.client.image_exists(action.spec["Image"]):
+                self.client.pull_image(action.spec["Image"])
+
+            self.client.create_container(action.name, action.spec)
+            self.client.start_container(action.name)
+
+        for action in plan.of("container", "start"):
+            self.client.start_container(action.name)
+
+    def desired_state(
+        self, deployment: Deployment
+    ) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+        """Translates a deployment into the networks and containers it is made of.
+
+        Args:
+            deployment (Deployment): the deployment
+
+        Returns:
+            tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]: the arguments of `create_network`
+                for every network, and the Engine API configuration of every container, by name
+        """
+
+        labels = {DEPLOYMENT_LABEL: deployment.team_name}
+        network = deployment.team_network
+
+        networks = {
+            network.name: {"subnet": str(network.cidr), "labels": labels},
+        }
+
+        containers = {}
+
+        for address, host in network.hosts.items():
+            spec: dict[str, Any] = {
+                "Image": host.image,
+                "Hostname": host.name,
+                "Labels": dict(labels),
+                "HostConfig": {"NetworkMode": network.name},
+                "NetworkingConfig": {
+                    "EndpointsConfig": {
+                        network.name: {"IPAMConfig": {"IPv4Address": str(address)}}
+                    }
+                },
+            }
+
+            # routers manage routes and firewall rules
+            if isinstance(host, Router):
+                spec["HostConfig"]["CapAdd"] = ["NET_ADMIN"]
+
+            spec["Labels"][SPEC_HASH_LABEL] = _spec_hash(spec)
+
+            containers[f"{deployment.team_name}_{host.name}"] = spec
+
+        return networks, containers
+
+    def _remove_network(self, name: str) -> list[tuple[str, Optional[str]]]:
+        """Removes a network, disconnecting the containers still attached to it first.
+
+        Returns:
+            list[tuple[str, Optional[str]]]: the containers that were disconnected, with the address they had
+        """
+
+        network = self.client.inspect_network(name)
+
+        if network is None:
+            return []
+
+        attached = []
+
+        # containers of other deployments, e.g. the organization router, may still be attached
+        for container, endpoint in (network.get("Containers") or {}).items():
+            address = (endpoint or {}).get("IPv4Address") or None
+
+            self.client.disconnect_network(name, container, force=True)
+            attached.append((container, address.split("/")[0] if address else None))
+
+        self.client.remove_network(name)
+
+        return attached
+
+
+def _spec_hash(spec: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
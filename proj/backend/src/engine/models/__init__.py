@@ -2,6 +2,6 @@
 """
 
 from .host import HostConverter, Host
-from .network import Network, CIDR, IPAddress, NetworkConverter
+from .network import Network, CIDR, IPAddress, NetworkConverter, AddressAllocator, CIDRIndex
 from .router import Router, RouterConverter
 from .deployment import Deployment
@@ -5,31 +5,66 @@ from typing import TypeVar
 
 from ...converter import Converter
 from .address import IPAddress, CIDR
+from .allocator import AddressAllocator, AllocationPolicy
+from .index import CIDRIndex
+from .batch import AddressArray
 from ..host import Host
 
 
 class Network:
     """ """
 
-    def __init__(self, name: str, cidr: CIDR):
+    def __init__(
+        self, name: str, cidr: CIDR, policy: AllocationPolicy = "first-fit"
+    ):
         """ """
 
         self.name = name
         self.cidr = cidr
         self.hosts: dict[IPAddress, Host] = {}
-        self._next_host = self.cidr.base_address + 1
+        self.allocator = AddressAllocator(cidr, policy)
 
     def next_host_address(self) -> IPAddress:
-        """_summary_
+        """Allocates the next free host address in this network.
+
+        The network and broadcast addresses are never handed out.
 
         Returns:
-            IPAddress: _description_
+            IPAddress: the allocated address
+
+        Raises:
+            ValueError: if there are no free host addresses left
         """
 
-        next_host = self._next_host
-        self._next_host = next_host + 1
+        return self.allocator.allocate()
+
+    def reserve_host_address(self, address: IPAddress) -> IPAddress:
+        """Marks a specific host address in this network as in use.
+
+        Args:
+            address (IPAddress): the address to reserve
+
+        Returns:
+            IPAddress: the reserved address
+
+        Raises:
+            ValueError: if the address is outside of this network or already in use
+        """
+
+        return self.allocator.reserve(address)
+
+    def release_host_address(self, address: IPAddress):
+        """Frees a host address so it can be handed out again.
+
+        Args:
+            address (IPAddress): the address to release
+
+        Raises:
+            ValueError: if the address is outside of this network or not in use
+        """
 
-        return next_host
+        self.allocator.release(address)
+        self.hosts.pop(address, None)
 
     def add_host(self, host: Host, address: IPAddress):
         """ """
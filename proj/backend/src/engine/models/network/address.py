@@ -1,12 +1,87 @@
 """
 """
 
+MAX_ADDRESS = 2**32 - 1
+"""The largest value representable by an IPv4 address."""
+
 
 class IPAddress:
-    """ """
+    """
+    An immutable IPv4 address.
+
+    The address is stored as its 32-bit integer value,
+    the dotted-quad representation is only built when first requested and then cached.
+    """
+
+    __slots__ = ("_value", "_address")
+
+    _value: int
+    _address: str | None
+
+    def __init__(self, address: "str | int"):
+        if isinstance(address, int):
+            if not 0 <= address <= MAX_ADDRESS:
+                raise ValueError(f"Address out of range: {address}")
+
+            object.__setattr__(self, "_value", address)
+            object.__setattr__(self, "_address", None)
+        else:
+            object.__setattr__(self, "_value", IPAddress._parse(address))
+            object.__setattr__(self, "_address", address)
+
+    @classmethod
+    def from_int(cls, value: int) -> "IPAddress":
+        """Builds an address from its 32-bit integer value, skipping any range checks.
+
+        Only meant for values that are already known to be valid addresses.
+
+        Args:
+            value (int): the integer value of the address
+
+        Returns:
+            IPAddress: the corresponding address
+        """
+
+        address = object.__new__(cls)
+        object.__setattr__(address, "_value", value)
+        object.__setattr__(address, "_address", None)
+
+        return address
+
+    @staticmethod
+    def _parse(address_str: str) -> int:
+        """
+        Returns the number corresponding to the given dotted-quad address.
+
+        Raises:
+            ValueError: if the string is not a valid IPv4 address
+        """
+
+        parts = address_str.split(".")
+        if len(parts) != 4:
+            raise ValueError(f"Invalid IPv4 address: {address_str}")
+
+        value = 0
+        for part in parts:
+            octet = int(part)
+            if not 0 <= octet <= 255:
+                raise ValueError(f"Invalid IPv4 address: {address_str}")
 
-    def __init__(self, address: str):
-        self.address = address
+            value = (value << 8) | octet
+
+        return value
+
+    @property
+    def address(self) -> str:
+        """The dotted-quad representation of this address."""
+
+        address = self._address
+        if address is None:
+            value = self._value
+            address = f"{value >> 24}.{(value >> 16) & 0xFF}.{(value >> 8) & 0xFF}.{value & 0xFF}"
+            object.__setattr__(self, "_address", address)
+
+        return address
 
     def _as_number(self) -> int:
         """
@@ -16,27 +91,50 @@ class IPAddress:
             int: the number corresponding to this address
         """
 
-        part1, part2, part3, part4 = self.address.split(".")
+        return self._value
 
-        return (
-            (int(part1) * (256**3))
-            + (int(part2) * (256**2))
-            + (int(part3) * 256)
-            + int(part4)
-        )
+    def __int__(self) -> int:
+        return self._value
 
-    def __gt__(self, other: "IPAddress") -> bool:
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (IPAddress, (self._value,))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value == other._value
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value != other._value
+
+    def __hash__(self) -> int:
+        return hash(self._value)
+
+    def __lt__(self, other: "IPAddress") -> bool:
         """
-        Checks if this address is greater than another address.
+        Checks if this address is less than another address.
 
         Args:
             other (IPAddress): the address to check against
 
         Returns:
-            bool: whether this address is greater than the specified address
+            bool: whether this address is less than the specified address
         """
 
-        return self._as_number() > other._as_number()
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value < other._value
 
     def __le__(self, other: "IPAddress") -> bool:
         """
@@ -49,7 +147,42 @@ class IPAddress:
             bool: whether this address is less than or equal to the specified address
         """
 
-        return not self > other
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value <= other._value
+
+    def __gt__(self, other: "IPAddress") -> bool:
+        """
+        Checks if this address is greater than another address.
+
+        Args:
+            other (IPAddress): the address to check against
+
+        Returns:
+            bool: whether this address is greater than the specified address
+        """
+
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value > other._value
+
+    def __ge__(self, other: "IPAddress") -> bool:
+        """
+        Checks if this address is greater than or equal to another address.
+
+        Args:
+            other (IPAddress): the address to check against
+
+        Returns:
+            bool: whether this address is greater than or equal to the specified address
+        """
+
+        if not isinstance(other, IPAddress):
+            return NotImplemented
+
+        return self._value >= other._value
 
     def __add__(self, offset: int) -> "IPAddress":
         """Adds the given offset to this address, returning the corresponding IPAddress
@@ -59,37 +192,60 @@ class IPAddress:
 
         Returns:
             IPAddress: the address distanced <offset> from this address
+
+        Raises:
+            ValueError: if the resulting address falls outside of the IPv4 address space
         """
 
-        self_as_number = self._as_number()
+        if not isinstance(offset, int):
+            return NotImplemented
+
+        value = self._value + offset
+        if not 0 <= value <= MAX_ADDRESS:
+            raise ValueError(f"Address out of range: {value}")
+
+        return IPAddress.from_int(value)
+
+    def __sub__(self, other: "int | IPAddress") -> "IPAddress | int":
+        """Subtracts an offset or another address from this address.
 
-        final_address_number = self_as_number + offset
+        Args:
+            other (int | IPAddress): the offset or address to subtract
+
+        Returns:
+            IPAddress | int: the address distanced <other> from this address when given an offset,
+                or the distance between both addresses when given an address
+
+        Raises:
+            ValueError: if the resulting address falls outside of the IPv4 address space
+        """
 
-        part4 = final_address_number % 256
-        part3 = (final_address_number // 256) % 256
-        part2 = (final_address_number // (256**2)) % 256
-        part1 = (final_address_number // (256**3)) % 256
+        if isinstance(other, IPAddress):
+            return self._value - other._value
 
-        return IPAddress(f"{part1}.{part2}.{part3}.{part4}")
+        if not isinstance(other, int):
+            return NotImplemented
+
+        return self + (-other)
 
     @staticmethod
     def from_string(address_str: str) -> "IPAddress":
-        """_summary_
+        """Parses an IPv4 address in dotted-quad notation.
 
         Args:
-            cidr_string (str): _description_
+            address_str (str): the address to parse, e.g. "10.0.0.1"
 
         Returns:
-            IPAddress: _description_
+            IPAddress: the parsed address
 
         Raises:
-            ValueError: _description_
+            ValueError: if the string is empty or is not a valid IPv4 address
         """
 
         if not address_str:
-            raise ValueError("CIDR string cannot be empty")
+            raise ValueError("Address string cannot be empty")
 
-        return IPAddress(address_str)
+        return IPAddress(address_str.strip())
 
     def __str__(self) -> str:
         """ """
@@ -105,12 +261,39 @@ class IPAddress:
 class CIDR:
     """ """
 
+    __slots__ = ("base_address", "mask_size", "_first", "_last")
+
     def __init__(self, base_address: IPAddress, mask_size: int) -> None:
         """ """
 
+        if not 0 <= mask_size <= 32:
+            raise ValueError(f"Invalid mask size: {mask_size}")
+
         self.base_address = base_address
         self.mask_size = mask_size
 
+        host_bits = 32 - mask_size
+        self._first = (int(base_address) >> host_bits) << host_bits
+        self._last = self._first + (1 << host_bits) - 1
+
+    @property
+    def size(self) -> int:
+        """The number of addresses in this address range."""
+
+        return self._last - self._first + 1
+
+    @property
+    def network_address(self) -> IPAddress:
+        """The first address of this address range."""
+
+        return IPAddress.from_int(self._first)
+
+    @property
+    def broadcast_address(self) -> IPAddress:
+        """The last address of this address range."""
+
+        return IPAddress.from_int(self._last)
+
     def __contains__(self, address: IPAddress) -> bool:
         """
         Checks if this CIDR address range contains the given address
@@ -122,11 +305,7 @@ class CIDR:
             bool: whether the given address belongs to this address range or not
         """
 
-        return (
-            self.base_address
-            <= address
-            <= (self.base_address + 2 ** (32 - self.mask_size))
-        )
+        return self._first <= address._value <= self._last
 
     def contains(self, address: IPAddress) -> bool:
         """Checks if the given address is part of this address range, denoted in CIDR notation.
@@ -140,18 +319,27 @@ class CIDR:
 
         return address in self
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CIDR):
+            return NotImplemented
+
+        return self._first == other._first and self.mask_size == other.mask_size
+
+    def __hash__(self) -> int:
+        return hash((self._first, self.mask_size))
+
     @staticmethod
     def from_string(cidr_str: str) -> "CIDR":
-        """_summary_
+        """Parses an address range in CIDR notation.
 
         Args:
-            cidr_string (str): _description_
+            cidr_str (str): the address range to parse, e.g. "10.0.0.0/24"
 
         Returns:
-            CIDR: _description_
+            CIDR: the parsed address range
 
         Raises:
-            ValueError: _description_
+            ValueError: if the string is empty or is not valid CIDR notation
         """
 
         if not cidr_str:
@@ -0,0 +1,246 @@
+"""
+Address allocation inside a network's address range.
+"""
+
+from typing import Iterator, Literal
+import zlib
+
+from .address import IPAddress, CIDR
+
+AllocationPolicy = Literal["first-fit", "next-fit"]
+"""
+How an allocator picks the next free address.
+
+- first-fit: always hands out the lowest free address in the range.
+- next-fit: continues from the last allocated address, wrapping around at the end of the range.
+"""
+
+
+class AddressAllocator:
+    """
+    Keeps track of which addresses of a CIDR address range are in use.
+
+    State is kept in a bitmap with one bit per address in the range,
+    so a /16 costs 8KiB regardless of how many addresses are allocated.
+    The network and broadcast addresses are reserved up front for ranges larger than a /31.
+    """
+
+    def __init__(self, cidr: CIDR, policy: AllocationPolicy = "first-fit"):
+        if policy not in ("first-fit", "next-fit"):
+            raise ValueError(f"Unknown allocation policy: {policy}")
+
+        self.cidr = cidr
+        self.policy = policy
+
+        self._first = int(cidr.network_address)
+        self._size = cidr.size
+        self._bitmap = bytearray((self._size + 7) // 8)
+        self._allocated = 0
+
+        # every address below this index is known to be allocated
+        self._hint = 0
+        # where the next next-fit search starts from
+        self._cursor = 0
+
+        if cidr.mask_size < 31:
+            self._set(0)
+            self._set(self._size - 1)
+
+    def __len__(self) -> int:
+        """Returns the number of allocated addresses, reserved ones included."""
+
+        return self._allocated
+
+    @property
+    def free_count(self) -> int:
+        """The number of addresses that can still be allocated."""
+
+        return self._size - self._allocated
+
+    def __contains__(self, address: IPAddress) -> bool:
+        """Checks whether the given address is currently allocated.
+
+        Args:
+            address (IPAddress): the address to check
+
+        Returns:
+            bool: whether the address is part of this range and allocated
+        """
+
+        index = int(address) - self._first
+        if not 0 <= index < self._size:
+            return False
+
+        return self._test(index)
+
+    def __iter__(self) -> Iterator[IPAddress]:
+        """Iterates over the allocated addresses, in ascending order."""
+
+        first = self._first
+        for byte_index, byte in enumerate(self._bitmap):
+            if byte == 0:
+                continue
+
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield IPAddress.from_int(first + (byte_index << 3) + bit)
+
+    def allocate(self) -> IPAddress:
+        """Allocates a free address according to this allocator's policy.
+
+        Returns:
+            IPAddress: the allocated address
+
+        Raises:
+            ValueError: if every address in the range is already allocated
+        """
+
+        if self._allocated >= self._size:
+            raise ValueError(f"No free addresses left in {self.cidr}")
+
+        if self.policy == "first-fit":
+            index = self._find_free(self._hint, self._size)
+            self._hint = index + 1
+        else:
+            index = self._find_free(self._cursor, self._size)
+            if index < 0:
+                index = self._find_free(0, self._cursor)
+            self._cursor = index + 1 if index + 1 < self._size else 0
+
+        self._set(index)
+
+        return IPAddress.from_int(self._first + index)
+
+    def reserve(self, address: IPAddress) -> IPAddress:
+        """Marks a specific address as allocated.
+
+        Args:
+            address (IPAddress): the address to reserve
+
+        Returns:
+            IPAddress: the reserved address
+
+        Raises:
+            ValueError: if the address is outside of this range or is already allocated
+        """
+
+        index = self._index(address)
+
+        if self._test(index):
+            raise ValueError(f"Address {address} is already allocated")
+
+        self._set(index)
+
+        return address
+
+    def release(self, address: IPAddress) -> None:
+        """Returns a previously allocated address to the pool.
+
+        Args:
+            address (IPAddress): the address to release
+
+        Raises:
+            ValueError: if the address is outside of this range or is not allocated
+        """
+
+        index = self._index(address)
+
+        if not self._test(index):
+            raise ValueError(f"Address {address} is not allocated")
+
+        self._bitmap[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        self._allocated -= 1
+
+        if index < self._hint:
+            self._hint = index
+
+    def to_bytes(self) -> bytes:
+        """Encodes the allocation state of this allocator into a compact binary form.
+
+        The bitmap is compressed, so mostly empty or mostly full ranges take a few bytes.
+
+        Returns:
+            bytes: the encoded allocation state
+        """
+
+        return zlib.compress(bytes(self._bitmap))
+
+    @classmethod
+    def from_bytes(
+        cls,
+        cidr: CIDR,
+        data: bytes,
+        policy: AllocationPolicy = "first-fit",
+        cursor: int = 0,
+    ) -> "AddressAllocator":
+        """Rebuilds an allocator from the state encoded by `to_bytes`.
+
+        Args:
+            cidr (CIDR): the address range the state belongs to
+            data (bytes): the encoded allocation state
+            policy (AllocationPolicy): the allocation policy to use
+            cursor (int): where the next next-fit search starts from
+
+        Returns:
+            AddressAllocator: an allocator with the given addresses allocated
+
+        Raises:
+            ValueError: if the encoded state does not match the size of the address range
+        """
+
+        allocator = cls(cidr, policy)
+
+        bitmap = bytearray(zlib.decompress(data))
+        if len(bitmap) != len(allocator._bitmap):
+            raise ValueError(f"Allocation state does not match the size of {cidr}")
+
+        allocator._bitmap = bitmap
+        allocator._allocated = sum(byte.bit_count() for byte in bitmap)
+        allocator._cursor = cursor if 0 <= cursor < allocator._size else 0
+
+        return allocator
+
+    @property
+    def cursor(self) -> int:
+        """Offset, from the start of the range, where the next next-fit search starts from."""
+
+        return self._cursor
+
+    def _index(self, address: IPAddress) -> int:
+        index = int(address) - self._first
+
+        if not 0 <= index < self._size:
+            raise ValueError(f"Address {address} does not belong to {self.cidr}")
+
+        return index
+
+    def _test(self, index: int) -> bool:
+        return bool(self._bitmap[index >> 3] & (1 << (index & 7)))
+
+    def _set(self, index: int) -> None:
+        self._bitmap[index >> 3] |= 1 << (index & 7)
+        self._allocated += 1
+
+    def _find_free(self, start: int, end: int) -> int:
+        """
+        Returns the index of the first free address in [start, end), or -1 if there is none.
+
+        Fully allocated bytes are skipped whole, so scanning costs one step per 8 addresses.
+        """
+
+        bitmap = self._bitmap
+        index = start
+
+        while index < end:
+            byte = bitmap[index >> 3]
+
+            if byte == 0xFF:
+                index = ((index >> 3) + 1) << 3
+                continue
+
+            if not byte & (1 << (index & 7)):
+                return index
+
+            index += 1
+
+        return -1
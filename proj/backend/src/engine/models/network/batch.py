@@ -0,0 +1,288 @@
+"""
+Bulk operations over many IPv4 addresses at once.
+
+Addresses are stored as packed unsigned 32-bit integers:
+a NumPy uint32 array when NumPy is installed, or an `array('I')` otherwise.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Sequence
+
+from .address import IPAddress, CIDR
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, everything falls back to the standard library
+    numpy = None
+
+_ARRAY_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+
+def _merge_ranges(cidrs: Sequence[CIDR]) -> tuple[list[int], list[int]]:
+    """Returns the start and end addresses of the union of the given ranges, sorted and disjoint."""
+
+    starts: list[int] = []
+    ends: list[int] = []
+
+    for cidr in sorted(cidrs, key=lambda c: int(c.network_address)):
+        start, end = int(cidr.network_address), int(cidr.broadcast_address)
+
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+
+    return starts, ends
+
+
+class AddressArray:
+    """
+    An immutable sequence of IPv4 addresses stored as packed 32-bit integers.
+
+    Indexing and iterating yield `IPAddress` objects,
+    while the bulk methods work directly on the integer values.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: "Iterable[int] | array | numpy.ndarray" = ()):
+        if numpy is not None:
+            if hasattr(values, "__len__"):
+                self._values = numpy.asarray(values, dtype=numpy.uint32)
+            else:
+                self._values = numpy.fromiter(values, dtype=numpy.uint32)
+        else:
+            self._values = array(_ARRAY_TYPECODE, values)
+
+    @property
+    def values(self) -> "array | numpy.ndarray":
+        """The underlying integer values, as a NumPy uint32 array or an `array('I')`."""
+
+        return self._values
+
+    @classmethod
+    def from_strings(cls, addresses: Sequence[str]) -> "AddressArray":
+        """Parses many addresses in dotted-quad notation at once.
+
+        Args:
+            addresses (Sequence[str]): the addresses to parse
+
+        Returns:
+            AddressArray: the parsed addresses, in the same order
+
+        Raises:
+            ValueError: if any of the strings is not a valid IPv4 address
+        """
+
+        if numpy is None:
+            return cls(IPAddress._parse(address) for address in addresses)
+
+        if len(addresses) == 0:
+            return cls()
+
+        strings = numpy.asarray(addresses, dtype=str)
+
+        # every string must be 4 non-empty runs of digits separated by dots, before they are split all at once
+        invalid = (
+            (numpy.char.count(strings, ".") != 3)
+            | ~numpy.char.isdigit(numpy.char.replace(strings, ".", ""))
+            | numpy.char.startswith(strings, ".")
+            | numpy.char.endswith(strings, ".")
+            | (numpy.char.find(strings, "..") >= 0)
+            | (numpy.char.str_len(strings) > 15)
+        )
+
+        if invalid.any():
+            raise ValueError(f"Invalid IPv4 address: {strings[invalid.argmax()]}")
+
+        octets = numpy.array(".".join(strings).split("."), dtype=numpy.int64).reshape(-1, 4)
+
+        out_of_range = (octets > 255).any(axis=1)
+
+        if out_of_range.any():
+            raise ValueError(f"Invalid IPv4 address: {strings[out_of_range.argmax()]}")
+
+        values = (
+            (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+        )
+
+        return cls(values)
+
+    @classmethod
+    def from_addresses(cls, addresses: Iterable[IPAddress]) -> "AddressArray":
+        """Packs the given addresses.
+
+        Args:
+            addresses (Iterable[IPAddress]): the addresses to pack
+
+        Returns:
+            AddressArray: the packed addresses, in the same order
+        """
+
+        return cls(int(address) for address in addresses)
+
+    @classmethod
+    def from_cidr(cls, cidr: CIDR, hosts_only: bool = False) -> "AddressArray":
+        """Enumerates the addresses of an address range.
+
+        Args:
+            cidr (CIDR): the address range to enumerate
+            hosts_only (bool): whether to leave out the network and broadcast addresses
+                of ranges larger than a /31
+
+        Returns:
+            AddressArray: the addresses of the range, in ascending order
+        """
+
+        start, end = int(cidr.network_address), int(cidr.broadcast_address) + 1
+
+        if hosts_only and cidr.mask_size < 31:
+            start, end = start + 1, end - 1
+
+        if numpy is not None:
+            return cls(numpy.arange(start, end, dtype=numpy.uint32))
+
+        return cls(range(start, end))
+
+    def to_strings(self) -> list[str]:
+        """Formats every address in dotted-quad notation.
+
+        Returns:
+            list[str]: the formatted addresses, in the same order
+        """
+
+        if numpy is not None:
+            values = self._values
+            octets = zip(
+                (values >> 24).tolist(),
+                ((values >> 16) & 0xFF).tolist(),
+                ((values >> 8) & 0xFF).tolist(),
+                (values & 0xFF).tolist(),
+            )
+        else:
+            octets = (
+                (value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+                for value in self._values
+            )
+
+        return [f"{a}.{b}.{c}.{d}" for a, b, c, d in octets]
+
+    def to_addresses(self) -> list[IPAddress]:
+        """Unpacks every address into an `IPAddress`.
+
+        Returns:
+            list[IPAddress]: the addresses, in the same order
+        """
+
+        return [IPAddress.from_int(value) for value in self._tolist()]
+
+    def contains(self, cidrs: Sequence[CIDR]) -> list[bool]:
+        """Checks, for every address, whether it belongs to any of the given address ranges.
+
+        Args:
+            cidrs (Sequence[CIDR]): the address ranges to check against, which may overlap
+
+        Returns:
+            list[bool]: whether each address, in order, belongs to at least one range
+        """
+
+        if len(self) == 0:
+            return []
+
+        starts, ends = _merge_ranges(cidrs)
+        if not starts:
+            return [False] * len(self)
+
+        if numpy is not None:
+            positions = numpy.searchsorted(starts, self._values, side="right") - 1
+            inside = (positions >= 0) & (
+                self._values <= numpy.asarray(ends, dtype=numpy.uint32)[positions]
+            )
+
+            return inside.tolist()
+
+        result = []
+        for value in self._values:
+            position = bisect_right(starts, value) - 1
+            result.append(position >= 0 and value <= ends[position])
+
+        return result
+
+    def locate(self, cidrs: Sequence[CIDR]) -> list[int]:
+        """Finds, for every address, which of the given address ranges it belongs to.
+
+        Args:
+            cidrs (Sequence[CIDR]): disjoint address ranges, e.g. the subnets of every team
+
+        Returns:
+            list[int]: for each address, the index in `cidrs` of the range holding it, or -1
+
+        Raises:
+            ValueError: if the given ranges overlap
+        """
+
+        order = sorted(range(len(cidrs)), key=lambda i: int(cidrs[i].network_address))
+        starts = [int(cidrs[i].network_address) for i in order]
+        ends = [int(cidrs[i].broadcast_address) for i in order]
+
+        for previous_end, start in zip(ends, starts[1:]):
+            if start <= previous_end:
+                raise ValueError("Address ranges must not overlap")
+
+        if not starts:
+            return [-1] * len(self)
+
+        if numpy is not None:
+            positions = numpy.searchsorted(starts, self._values, side="right") - 1
+            clipped = numpy.maximum(positions, 0)
+            inside = (positions >= 0) & (
+                self._values <= numpy.asarray(ends, dtype=numpy.uint32)[clipped]
+            )
+
+            return numpy.where(inside, numpy.asarray(order)[clipped], -1).tolist()
+
+        result = []
+        for value in self._values:
+            position = bisect_right(starts, value) - 1
+            inside = position >= 0 and value <= ends[position]
+            result.append(order[position] if inside else -1)
+
+        return result
+
+    def difference(self, other: "AddressArray") -> "AddressArray":
+        """Computes the addresses in this array that are not in another one.
+
+        Args:
+            other (AddressArray): the addresses to remove
+
+        Returns:
+            AddressArray: the remaining addresses, sorted and without duplicates
+        """
+
+        if numpy is not None:
+            return AddressArray(numpy.setdiff1d(self._values, other._values))
+
+        return AddressArray(sorted(set(self._values).difference(other._values)))
+
+    def _tolist(self) -> list[int]:
+        return self._values.tolist()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[IPAddress]:
+        return iter(self.to_addresses())
+
+    def __getitem__(self, index: int) -> IPAddress:
+        return IPAddress.from_int(int(self._values[index]))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AddressArray):
+            return NotImplemented
+
+        return self._tolist() == other._tolist()
+
+    def __repr__(self) -> str:
+        return f"AddressArray({self.to_strings()})"
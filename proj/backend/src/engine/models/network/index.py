@@ -0,0 +1,301 @@
+"""
+Indexing of allocated address ranges inside a larger address range.
+"""
+
+from typing import Iterator, Optional
+
+from .address import IPAddress, CIDR
+
+_NO_FREE_BLOCK = 33
+"""Marker prefix length meaning a subtree has no free block of any size."""
+
+
+class _Node:
+    """A prefix in the binary trie of allocated ranges."""
+
+    __slots__ = ("children", "allocated", "best")
+
+    def __init__(self, depth: int):
+        self.children: list[Optional["_Node"]] = [None, None]
+        self.allocated = False
+
+        # the shortest prefix length of a completely free block in this subtree
+        self.best = depth
+
+
+class CIDRIndex:
+    """
+    Index of the CIDR address ranges allocated inside a supernet.
+
+    Ranges are kept in a binary radix trie over the address bits,
+    where every node also remembers the largest free block below it.
+    Overlap, containment and "next free /N" queries walk a single path from the root,
+    so they take at most 32 steps regardless of how many ranges are allocated.
+    """
+
+    def __init__(self, supernet: CIDR):
+        self.supernet = supernet
+
+        self._root = _Node(supernet.mask_size)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Returns the number of allocated address ranges."""
+
+        return self._count
+
+    def __iter__(self) -> Iterator[CIDR]:
+        """Iterates over the allocated address ranges, in ascending address order."""
+
+        stack = [(self._root, int(self.supernet.network_address), self.supernet.mask_size)]
+
+        while stack:
+            node, prefix, depth = stack.pop()
+
+            if node.allocated:
+                yield CIDR(IPAddress.from_int(prefix), depth)
+                continue
+
+            for bit in (1, 0):
+                child = node.children[bit]
+                if child is not None:
+                    stack.append((child, prefix | (bit << (31 - depth)), depth + 1))
+
+    def __contains__(self, cidr: CIDR) -> bool:
+        """Checks whether exactly the given address range is allocated."""
+
+        node = self._root
+        for bit in self._path(cidr):
+            node = node.children[bit]
+            if node is None:
+                return False
+
+        return node.allocated
+
+    def within_supernet(self, cidr: CIDR) -> bool:
+        """Checks whether the given address range lies inside the indexed supernet.
+
+        Args:
+            cidr (CIDR): the address range to check
+
+        Returns:
+            bool: whether every address of the range belongs to the supernet
+        """
+
+        return (
+            cidr.mask_size >= self.supernet.mask_size
+            and cidr.network_address in self.supernet
+        )
+
+    def overlaps(self, cidr: CIDR) -> bool:
+        """Checks whether the given address range shares any address with an allocated range.
+
+        Args:
+            cidr (CIDR): the address range to check
+
+        Returns:
+            bool: whether the range overlaps an allocated range
+        """
+
+        return self.find_overlap(cidr) is not None
+
+    def find_overlap(self, cidr: CIDR) -> Optional[CIDR]:
+        """Finds an allocated address range that overlaps the given one.
+
+        Args:
+            cidr (CIDR): the address range to check
+
+        Returns:
+            Optional[CIDR]: an allocated range that contains, or is contained in, the given range,
+                or None if there is no overlap
+        """
+
+        self._check_within_supernet(cidr)
+
+        node = self._root
+        prefix = int(self.supernet.network_address)
+        depth = self.supernet.mask_size
+
+        for bit in self._path(cidr):
+            if node.allocated:
+                return CIDR(IPAddress.from_int(prefix), depth)
+
+            node = node.children[bit]
+            if node is None:
+                return None
+
+            prefix |= bit << (31 - depth)
+            depth += 1
+
+        if node.allocated or node.best != depth:
+            return next(self._allocated_below(node, prefix, depth))
+
+        return None
+
+    def find_containing(self, address: IPAddress) -> Optional[CIDR]:
+        """Finds the allocated address range a given address belongs to.
+
+        Args:
+            address (IPAddress): the address to look up
+
+        Returns:
+            Optional[CIDR]: the allocated range containing the address, or None
+        """
+
+        if address not in self.supernet:
+            return None
+
+        return self.find_overlap(CIDR(address, 32))
+
+    def add(self, cidr: CIDR):
+        """Marks an address range as allocated.
+
+        Args:
+            cidr (CIDR): the address range to allocate
+
+        Raises:
+            ValueError: if the range lies outside the supernet or overlaps an allocated range
+        """
+
+        overlap = self.find_overlap(cidr)
+        if overlap is not None:
+            raise ValueError(f"{cidr} overlaps already allocated range {overlap}")
+
+        path = [self._root]
+        depth = self.supernet.mask_size
+
+        for bit in self._path(cidr):
+            depth += 1
+
+            child = path[-1].children[bit]
+            if child is None:
+                child = path[-1].children[bit] = _Node(depth)
+
+            path.append(child)
+
+        path[-1].allocated = True
+        self._count += 1
+
+        self._update(path)
+
+    def remove(self, cidr: CIDR):
+        """Frees a previously allocated address range.
+
+        Args:
+            cidr (CIDR): the address range to free
+
+        Raises:
+            ValueError: if exactly this range is not allocated
+        """
+
+        self._check_within_supernet(cidr)
+
+        path = [self._root]
+        bits = []
+
+        for bit in self._path(cidr):
+            child = path[-1].children[bit]
+            if child is None:
+                raise ValueError(f"{cidr} is not allocated")
+
+            path.append(child)
+            bits.append(bit)
+
+        if not path[-1].allocated:
+            raise ValueError(f"{cidr} is not allocated")
+
+        path[-1].allocated = False
+        self._count -= 1
+
+        # prune nodes that no longer lead to any allocation
+        while len(path) > 1:
+            node = path[-1]
+            if node.allocated or node.children[0] is not None or node.children[1] is not None:
+                break
+
+            path.pop()
+            path[-1].children[bits.pop()] = None
+
+        self._update(path)
+
+    def next_free(self, mask_size: int) -> Optional[CIDR]:
+        """Finds the lowest address range of the given size that does not overlap any allocated range.
+
+        Args:
+            mask_size (int): the mask size of the wanted range, e.g. 24 for a /24
+
+        Returns:
+            Optional[CIDR]: a free address range, or None if the supernet has no room for it
+
+        Raises:
+            ValueError: if the wanted range is larger than the supernet
+        """
+
+        depth = self.supernet.mask_size
+
+        if not depth <= mask_size <= 32:
+            raise ValueError(
+                f"Cannot fit a /{mask_size} inside {self.supernet}"
+            )
+
+        node = self._root
+        prefix = int(self.supernet.network_address)
+
+        if node.best > mask_size:
+            return None
+
+        while depth < mask_size and not (node.best == depth and not node.allocated):
+            for bit in (0, 1):
+                child = node.children[bit]
+
+                if child is None or child.best <= mask_size:
+                    break
+
+            prefix |= bit << (31 - depth)
+            depth += 1
+
+            if child is None:
+                break
+
+            node = child
+
+        return CIDR(IPAddress.from_int(prefix), mask_size)
+
+    def _check_within_supernet(self, cidr: CIDR):
+        if not self.within_supernet(cidr):
+            raise ValueError(f"{cidr} does not belong to {self.supernet}")
+
+    def _path(self, cidr: CIDR) -> Iterator[int]:
+        """Yields the address bits leading from the supernet down to the given range."""
+
+        value = int(cidr.network_address)
+
+        for depth in range(self.supernet.mask_size, cidr.mask_size):
+            yield (value >> (31 - depth)) & 1
+
+    def _allocated_below(self, node: _Node, prefix: int, depth: int) -> Iterator[CIDR]:
+        while not node.allocated:
+            bit = 0 if node.children[0] is not None else 1
+            node = node.children[bit]
+            prefix |= bit << (31 - depth)
+            depth += 1
+
+        yield CIDR(IPAddress.from_int(prefix), depth)
+
+    def _update(self, path: list[_Node]):
+        """Recomputes the largest free block of every node in a path, from the bottom up."""
+
+        depth = self.supernet.mask_size + len(path) - 1
+
+        for node in reversed(path):
+            if node.allocated:
+                node.best = _NO_FREE_BLOCK
+            elif node.children[0] is None and node.children[1] is None:
+                node.best = depth
+            else:
+                node.best = min(
+                    child.best if child is not None else depth + 1
+                    for child in node.children
+                )
+
+            depth -= 1
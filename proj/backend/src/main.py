@@ -4,12 +4,13 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from engine.docker.compose import DockerCompose
+from engine.docker.compose import AsyncDockerCompose
 from engine.docker.compose.handler import DockerComposeManifestHandler
 
 from dotenv import load_dotenv
 
-from api.routers import team, services
+from api.routers import team, services, jobs, events, images
+from api.dependencies import db, async_db, jobs as job_queue, images as image_warmer
 
 
 @asynccontextmanager
@@ -17,10 +18,10 @@ async def lifespan(app: FastAPI):
 
     load_dotenv()
 
-    compose = DockerCompose()
+    compose = AsyncDockerCompose()
     handler = DockerComposeManifestHandler()
 
-    manifest_template = handler.load("./templates/org-router.yml")
+    manifest_template = handler.load("./templates/org-router.yml", structural=True)
 
     # TODO: make these configurable, env vars?
     manifest = manifest_template.compile(
@@ -36,12 +37,21 @@ async def lifespan(app: FastAPI):
 
     print(handler.dump(manifest))
 
-    compose.provision(manifest)
+    await compose.provision(manifest)
+
+    db.catalog.start()
+    await image_warmer.start()
+    await job_queue.start()
 
     # run the app
     yield
 
-    compose.tear_down(manifest)
+    await job_queue.stop()
+    await image_warmer.stop()
+    db.catalog.stop()
+    await async_db.close()
+
+    await compose.tear_down(manifest)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -52,10 +62,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(team.router)
 app.include_router(services.router)
+app.include_router(jobs.router)
+app.include_router(events.router)
+app.include_router(images.router)
 
 
 @app.get("/")
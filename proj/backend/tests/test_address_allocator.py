@@ -0,0 +1,142 @@
+"""
+Tests of AddressAllocator against a brute-force model keeping the allocated addresses in a set.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+import random
+import unittest
+
+from engine.models.network import AddressAllocator, CIDR, IPAddress
+
+
+def _addresses(cidr: CIDR) -> list[IPAddress]:
+    return [cidr.network_address + offset for offset in range(cidr.size)]
+
+
+class AddressAllocatorTest(unittest.TestCase):
+    def test_network_and_broadcast_addresses_are_reserved(self):
+        allocator = AddressAllocator(CIDR.from_string("10.0.0.0/24"))
+
+        self.assertEqual(
+            list(allocator),
+            [IPAddress.from_string("10.0.0.0"), IPAddress.from_string("10.0.0.255")],
+        )
+        self.assertEqual(allocator.free_count, 254)
+
+        for mask_size in (31, 32):
+            self.assertEqual(len(AddressAllocator(CIDR.from_string(f"10.0.0.0/{mask_size}"))), 0)
+
+    def test_first_fit_matches_brute_force(self):
+        self._check_against_brute_force("first-fit")
+
+    def test_next_fit_matches_brute_force(self):
+        self._check_against_brute_force("next-fit")
+
+    def _check_against_brute_force(self, policy: str):
+        rng = random.Random(4)
+        cidr = CIDR.from_string("10.0.0.0/26")
+        addresses = _addresses(cidr)
+
+        allocator = AddressAllocator(cidr, policy)
+        allocated = {addresses[0], addresses[-1]}
+        cursor = 0
+
+        for _ in range(2000):
+            operation = rng.choice(("allocate", "allocate", "reserve", "release"))
+            address = rng.choice(addresses)
+
+            if operation == "allocate":
+                free = [candidate for candidate in addresses if candidate not in allocated]
+
+                if not free:
+                    with self.assertRaises(ValueError):
+                        allocator.allocate()
+                    continue
+
+                if policy == "first-fit":
+                    expected = free[0]
+                else:
+                    expected = next(
+                        (candidate for candidate in free if candidate - cidr.network_address >= cursor),
+                        free[0],
+                    )
+                    cursor = (expected - cidr.network_address + 1) % cidr.size
+
+                self.assertEqual(allocator.allocate(), expected)
+                allocated.add(expected)
+            elif operation == "reserve":
+                if address in allocated:
+                    with self.assertRaises(ValueError):
+                        allocator.reserve(address)
+                else:
+                    self.assertEqual(allocator.reserve(address), address)
+                    allocated.add(address)
+            elif address in allocated:
+                allocator.release(address)
+                allocated.remove(address)
+            else:
+                with self.assertRaises(ValueError):
+                    allocator.release(address)
+
+            self.assertEqual(list(allocator), sorted(allocated))
+            self.assertEqual(len(allocator), len(allocated))
+            self.assertEqual(allocator.free_count, cidr.size - len(allocated))
+
+    def test_exhausted_range_raises(self):
+        allocator = AddressAllocator(CIDR.from_string("10.0.0.0/30"))
+
+        allocator.allocate()
+        allocator.allocate()
+
+        with self.assertRaises(ValueError):
+            allocator.allocate()
+
+    def test_addresses_outside_the_range_are_rejected(self):
+        allocator = AddressAllocator(CIDR.from_string("10.0.0.0/24"))
+        outside = IPAddress.from_string("10.0.1.1")
+
+        self.assertNotIn(outside, allocator)
+
+        with self.assertRaises(ValueError):
+            allocator.reserve(outside)
+
+        with self.assertRaises(ValueError):
+            allocator.release(outside)
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            AddressAllocator(CIDR.from_string("10.0.0.0/24"), "best-fit")
+
+    def test_bytes_round_trip(self):
+        rng = random.Random(4)
+        cidr = CIDR.from_string("10.0.0.0/22")
+
+        for policy in ("first-fit", "next-fit"):
+            allocator = AddressAllocator(cidr, policy)
+
+            for _ in range(300):
+                allocator.allocate()
+            for address in rng.sample(list(allocator), 100):
+                allocator.release(address)
+
+            restored = AddressAllocator.from_bytes(cidr, allocator.to_bytes(), policy, allocator.cursor)
+
+            self.assertEqual(list(restored), list(allocator))
+            self.assertEqual(len(restored), len(allocator))
+            self.assertEqual(restored.cursor, allocator.cursor)
+
+            for _ in range(50):
+                self.assertEqual(restored.allocate(), allocator.allocate())
+
+    def test_bytes_of_another_range_size_are_rejected(self):
+        data = AddressAllocator(CIDR.from_string("10.0.0.0/24")).to_bytes()
+
+        with self.assertRaises(ValueError):
+            AddressAllocator.from_bytes(CIDR.from_string("10.0.0.0/23"), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
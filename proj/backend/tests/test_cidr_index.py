@@ -0,0 +1,127 @@
+"""
+Tests of CIDRIndex against a brute-force model built on the standard ipaddress module.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+from typing import Optional
+import ipaddress
+import random
+import unittest
+
+from engine.models.network import CIDR, CIDRIndex, IPAddress
+
+SUPERNET = "10.0.0.0/20"
+
+
+def _network(cidr: CIDR) -> ipaddress.IPv4Network:
+    return ipaddress.ip_network(str(cidr))
+
+
+def _random_cidr(rng: random.Random, supernet: CIDR, min_mask: int, max_mask: int) -> CIDR:
+    mask_size = rng.randint(min_mask, max_mask)
+    offset = rng.randrange(supernet.size) & ~((1 << (32 - mask_size)) - 1)
+
+    return CIDR(IPAddress.from_int(int(supernet.network_address) + offset), mask_size)
+
+
+def _brute_next_free(supernet: CIDR, allocated: list[CIDR], mask_size: int) -> Optional[CIDR]:
+    for candidate in _network(supernet).subnets(new_prefix=mask_size):
+        if not any(candidate.overlaps(_network(cidr)) for cidr in allocated):
+            return CIDR.from_string(str(candidate))
+
+    return None
+
+
+class CIDRIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.supernet = CIDR.from_string(SUPERNET)
+        self.index = CIDRIndex(self.supernet)
+
+    def test_matches_brute_force_under_random_changes(self):
+        rng = random.Random(4)
+        allocated: list[CIDR] = []
+
+        for _ in range(400):
+            cidr = _random_cidr(rng, self.supernet, 21, 28)
+            overlapping = [other for other in allocated if _network(other).overlaps(_network(cidr))]
+
+            if allocated and rng.random() < 0.3:
+                removed = allocated.pop(rng.randrange(len(allocated)))
+                self.index.remove(removed)
+            elif overlapping:
+                with self.assertRaises(ValueError):
+                    self.index.add(cidr)
+            else:
+                self.index.add(cidr)
+                allocated.append(cidr)
+
+            self.assertEqual(len(self.index), len(allocated))
+            self.assertEqual(
+                list(self.index),
+                sorted(allocated, key=lambda cidr: int(cidr.network_address)),
+            )
+
+            probe = _random_cidr(rng, self.supernet, 20, 32)
+            expected = [other for other in allocated if _network(other).overlaps(_network(probe))]
+            overlap = self.index.find_overlap(probe)
+
+            self.assertEqual(self.index.overlaps(probe), bool(expected))
+            self.assertTrue(overlap is None if not expected else overlap in expected)
+
+            mask_size = rng.randint(20, 28)
+            self.assertEqual(
+                self.index.next_free(mask_size),
+                _brute_next_free(self.supernet, allocated, mask_size),
+            )
+
+    def test_find_containing(self):
+        self.index.add(CIDR.from_string("10.0.4.0/24"))
+
+        self.assertEqual(
+            self.index.find_containing(IPAddress.from_string("10.0.4.200")),
+            CIDR.from_string("10.0.4.0/24"),
+        )
+        self.assertIsNone(self.index.find_containing(IPAddress.from_string("10.0.5.1")))
+        self.assertIsNone(self.index.find_containing(IPAddress.from_string("192.168.0.1")))
+
+    def test_contains_only_exact_ranges(self):
+        self.index.add(CIDR.from_string("10.0.4.0/24"))
+
+        self.assertIn(CIDR.from_string("10.0.4.0/24"), self.index)
+        self.assertNotIn(CIDR.from_string("10.0.4.0/25"), self.index)
+        self.assertNotIn(CIDR.from_string("10.0.4.0/23"), self.index)
+
+    def test_full_supernet_has_no_free_range(self):
+        self.index.add(self.supernet)
+
+        self.assertIsNone(self.index.next_free(24))
+        self.assertIsNone(self.index.next_free(32))
+
+        self.index.remove(self.supernet)
+
+        self.assertEqual(self.index.next_free(20), self.supernet)
+
+    def test_rejects_invalid_ranges(self):
+        with self.assertRaises(ValueError):
+            self.index.add(CIDR.from_string("10.1.0.0/24"))
+
+        with self.assertRaises(ValueError):
+            self.index.add(CIDR.from_string("10.0.0.0/16"))
+
+        with self.assertRaises(ValueError):
+            self.index.remove(CIDR.from_string("10.0.4.0/24"))
+
+        with self.assertRaises(ValueError):
+            self.index.next_free(19)
+
+        self.index.add(CIDR.from_string("10.0.4.0/24"))
+
+        with self.assertRaises(ValueError):
+            self.index.remove(CIDR.from_string("10.0.4.0/25"))
+
+
+if __name__ == "__main__":
+    unittest.main()
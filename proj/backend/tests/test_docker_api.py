@@ -0,0 +1,269 @@
+"""
+Tests of DockerEngineClient against a fake Docker daemon serving canned Engine API responses on a Unix socket.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote, urlparse
+import http.client
+import json
+import os
+import re
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+import unittest
+
+from engine.docker.api import DockerAPIError, DockerEngineClient, _split_image
+
+
+class _FakeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Keeps networks, containers and execs in memory, and records every request it receives."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.networks: dict[str, dict] = {}
+        self.containers: dict[str, dict] = {}
+        self.execs: dict[str, list[str]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.connections = 0
+
+        # paths for which the connection is dropped once the request is read, without answering
+        self.drop: set[str] = set()
+
+        # whether to close connections after answering, while letting the client believe they stay open
+        self.close_idle = False
+
+        super().__init__(path, _FakeDaemonHandler)
+
+
+class _FakeDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    server: _FakeDaemon
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _reply(self, status: int, body=None, raw: bytes = b""):
+        data = json.dumps(body).encode("utf-8") if body is not None else raw
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+        if self.server.close_idle:
+            self.close_connection = True
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        path = re.sub(r"^/v[\d.]+", "", unquote(url.path))
+        params = parse_qs(url.query)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        self.server.requests.append((method, path))
+
+        if path in self.server.drop:
+            self.server.drop.discard(path)
+            self.close_connection = True
+            return
+
+        networks, containers = self.server.networks, self.server.containers
+
+        if path == "/networks/create":
+            networks[body["Name"]] = {"Name": body["Name"], "Containers": {}, "IPAM": body.get("IPAM")}
+            return self._reply(201, {"Id": body["Name"]})
+
+        if match := re.fullmatch(r"/networks/([^/]+)(/connect|/disconnect)?", path):
+            network = networks.get(match.group(1))
+
+            if network is None:
+                return self._reply(404, {"message": f"network {match.group(1)} not found"})
+
+            if match.group(2) == "/connect":
+                network["Containers"][body["Container"]] = body.get("EndpointConfig")
+            elif match.group(2) == "/disconnect":
+                network["Containers"].pop(body["Container"], None)
+            else:
+                return self._reply(200, network)
+
+            return self._reply(200)
+
+        if path == "/containers/create":
+            containers[params["name"][0]] = {"Config": body, "State": {"Running": False}}
+            return self._reply(201, {"Id": params["name"][0]})
+
+        if match := re.fullmatch(r"/containers/([^/]+)(/json|/start|/stop|/exec)?", path):
+            container = containers.get(match.group(1))
+
+            if container is None:
+                return self._reply(404, {"message": f"No such container: {match.group(1)}"})
+
+            match match.group(2):
+                case "/json":
+                    return self._reply(200, container)
+                case "/start":
+                    container["State"]["Running"] = True
+                case "/stop":
+                    container["State"]["Running"] = False
+                case "/exec":
+                    exec_id = str(len(self.server.execs))
+                    self.server.execs[exec_id] = body["Cmd"]
+                    return self._reply(201, {"Id": exec_id})
+                case None if method == "DELETE":
+                    del containers[match.group(1)]
+
+            return self._reply(204)
+
+        if match := re.fullmatch(r"/exec/([^/]+)/(start|json)", path):
+            command = self.server.execs[match.group(1)]
+
+            if match.group(2) == "json":
+                return self._reply(200, {"ExitCode": 1 if "false" in command else 0})
+
+            stdout, stderr = " ".join(command).encode("utf-8"), b"!"
+            return self._reply(
+                200,
+                raw=struct.pack(">BxxxL", 1, len(stdout)) + stdout + struct.pack(">BxxxL", 2, len(stderr)) + stderr,
+            )
+
+        self._reply(404, {"message": f"page not found: {path}"})
+
+
+class DockerEngineClientTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(directory, "docker.sock")
+
+        self.daemon = _FakeDaemon(self.socket_path)
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+
+        self.client = DockerEngineClient(self.socket_path, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        os.unlink(self.socket_path)
+        os.rmdir(os.path.dirname(self.socket_path))
+
+    def test_networks(self):
+        self.client.create_network("team_net", subnet="10.1.0.0/24")
+        self.client.create_container("team_web", {"Image": "nginx"})
+
+        self.client.connect_network("team_net", "team_web", "10.1.0.5")
+
+        network = self.client.inspect_network("team_net")
+        self.assertEqual(network["IPAM"]["Config"], [{"Subnet": "10.1.0.0/24"}])
+        self.assertEqual(
+            network["Containers"]["team_web"], {"IPAMConfig": {"IPv4Address": "10.1.0.5"}}
+        )
+
+        self.client.disconnect_network("team_net", "team_web")
+
+        self.assertEqual(self.client.inspect_network("team_net")["Containers"], {})
+
+    def test_containers(self):
+        self.assertEqual(self.client.create_container("team_web", {"Image": "nginx"}), "team_web")
+
+        self.client.start_container("team_web")
+        self.assertTrue(self.client.inspect_container("team_web")["State"]["Running"])
+
+        self.client.stop_container("team_web")
+        self.assertFalse(self.client.inspect_container("team_web")["State"]["Running"])
+
+        self.client.remove_container("team_web", force=True)
+        self.assertIsNone(self.client.inspect_container("team_web"))
+
+    def test_exec(self):
+        self.client.create_container("team_web", {"Image": "nginx"})
+
+        self.assertEqual(self.client.exec("team_web", ["echo", "hello"]), (0, b"echo hello!"))
+        self.assertEqual(self.client.exec("team_web", ["false"])[0], 1)
+
+    def test_missing_objects(self):
+        self.assertIsNone(self.client.inspect_network("nope"))
+        self.assertIsNone(self.client.inspect_container("nope"))
+
+        # removing what does not exist is not an error
+        self.client.remove_container("nope")
+        self.client.stop_container("nope")
+
+        with self.assertRaises(DockerAPIError) as error:
+            self.client.start_container("nope")
+
+        self.assertEqual(error.exception.status, 404)
+
+    def test_connection_reuse(self):
+        self.client.create_network("team_net")
+
+        for _ in range(5):
+            self.client.inspect_network("team_net")
+
+        self.assertEqual(self.daemon.connections, 1)
+
+    def test_idempotent_request_retried_when_dropped(self):
+        self.client.create_network("team_net")
+        self.daemon.drop.add("/networks/team_net")
+
+        self.assertEqual(self.client.inspect_network("team_net")["Name"], "team_net")
+        self.assertEqual(self.daemon.requests.count(("GET", "/networks/team_net")), 2)
+
+    def test_post_not_retried_when_dropped(self):
+        self.client.create_network("team_net")
+        self.daemon.drop.add("/networks/create")
+
+        with self.assertRaises(http.client.RemoteDisconnected):
+            self.client.create_network("other_net")
+
+        self.assertEqual(self.daemon.requests.count(("POST", "/networks/create")), 2)
+
+    def test_post_after_idle_connection_closed(self):
+        self.daemon.close_idle = True
+
+        self.client.create_network("team_net")
+
+        # give the daemon time to close the connection the client keeps in its pool
+        time.sleep(0.2)
+
+        self.client.create_network("other_net")
+
+        self.assertEqual(self.daemon.requests.count(("POST", "/networks/create")), 2)
+        self.assertEqual(self.daemon.connections, 2)
+
+    def test_split_image(self):
+        self.assertEqual(_split_image("nginx"), ("nginx", "latest"))
+        self.assertEqual(_split_image("nginx:1.25"), ("nginx", "1.25"))
+        self.assertEqual(_split_image("localhost:5000/web"), ("localhost:5000/web", "latest"))
+        self.assertEqual(_split_image("localhost:5000/web:1.0"), ("localhost:5000/web", "1.0"))
+        self.assertEqual(_split_image("nginx@sha256:abc"), ("nginx", "sha256:abc"))
+        self.assertEqual(
+            _split_image("localhost:5000/web:1.0@sha256:abc"), ("localhost:5000/web", "sha256:abc")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests of IPAMStore against a fake collection implementing the few MongoDB operations it uses.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+from types import SimpleNamespace
+import copy
+import unittest
+
+from api.ipam import IPAMConflictError, IPAMStore
+from engine.models.network import CIDR, Network
+
+
+class _FakeCollection:
+    """Keeps documents in memory, matching queries on equality of top-level fields only."""
+
+    def __init__(self):
+        self.documents: dict[str, dict] = {}
+
+    def _matches(self, document: dict, query: dict) -> bool:
+        return all(document.get(key) == value for key, value in query.items())
+
+    def find_one(self, query: dict):
+        return next(
+            (copy.deepcopy(document) for document in self.documents.values() if self._matches(document, query)),
+            None,
+        )
+
+    def insert_one(self, document: dict):
+        if document["_id"] in self.documents:
+            raise ValueError(f"Duplicate key {document['_id']}")
+
+        self.documents[document["_id"]] = copy.deepcopy(document)
+
+    def update_one(self, query: dict, update: dict):
+        for document in self.documents.values():
+            if self._matches(document, query):
+                document.update(copy.deepcopy(update.get("$set", {})))
+                for key, value in update.get("$inc", {}).items():
+                    document[key] = document.get(key, 0) + value
+
+                return SimpleNamespace(matched_count=1)
+
+        return SimpleNamespace(matched_count=0)
+
+    def delete_one(self, query: dict):
+        for key, document in list(self.documents.items()):
+            if self._matches(document, query):
+                del self.documents[key]
+                return
+
+
+class IPAMStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = _FakeCollection()
+        self.store = IPAMStore(self.collection)
+
+        self.store.create("team", Network("t_net", CIDR.from_string("10.1.0.0/24"), policy="next-fit"))
+
+    def test_saved_state_is_loaded_by_other_stores(self):
+        network = self.store.get("team")
+        addresses = [network.next_host_address() for _ in range(3)]
+        network.release_host_address(addresses[1])
+        self.store.save("team")
+
+        loaded = IPAMStore(self.collection).get("team")
+
+        self.assertEqual(loaded.name, "t_net")
+        self.assertEqual(loaded.cidr, CIDR.from_string("10.1.0.0/24"))
+        self.assertEqual(loaded.allocator.policy, "next-fit")
+        self.assertEqual(list(loaded.allocator), list(network.allocator))
+        self.assertEqual(loaded.next_host_address(), network.next_host_address())
+        self.assertEqual(self.collection.documents["team"]["version"], 1)
+
+    def test_concurrent_save_conflicts(self):
+        other = IPAMStore(self.collection)
+
+        mine = self.store.get("team")
+        theirs = other.get("team")
+
+        address = theirs.next_host_address()
+        other.save("team")
+
+        mine.next_host_address()
+
+        with self.assertRaises(IPAMConflictError):
+            self.store.save("team")
+
+        # the stale copy is dropped, the next get sees the other store's allocation
+        reloaded = self.store.get("team")
+
+        self.assertIsNot(reloaded, mine)
+        self.assertIn(address, reloaded.allocator)
+
+        reloaded.next_host_address()
+        self.store.save("team")
+
+        with self.assertRaises(IPAMConflictError):
+            other.save("team")
+
+        self.assertEqual(self.collection.documents["team"]["version"], 2)
+
+    def test_deleted_network_is_gone(self):
+        self.store.delete("team")
+
+        self.assertIsNone(self.store.get("team"))
+        self.assertIsNone(IPAMStore(self.collection).get("team"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests of structural ManifestTemplate compilation against textual compilation and a fresh YAML parse.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+import os
+import unittest
+
+import yaml
+
+from engine.docker.compose.manifest import ManifestTemplate, ManifestTemplateError
+
+TEAM_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "team-template.yml")
+
+# values a YAML 1.1 parser resolves to something else than a string when plain
+_TRICKY_VALUES = ["0", "010", "0x1f", "1_000", "1:30", "1e3", ".5", ".inf", "true", "yes", "off", "null", "~", "2024-01-01"]
+
+
+class ManifestTemplateTest(unittest.TestCase):
+    def setUp(self):
+        with open(TEAM_TEMPLATE, "r", encoding="utf-8") as f:
+            manifest_str = f.read()
+
+        self.textual = ManifestTemplate(manifest_str)
+        self.structural = ManifestTemplate(manifest_str, structural=True)
+
+    def _values(self, **overrides) -> dict[str, str]:
+        values = {
+            "teamname": "team1",
+            "subnet": "10.1.0.0/24",
+            "web_ip": "10.1.0.3",
+            "proxy_ip": "10.1.0.2",
+            "dns_ip": "10.1.0.4",
+            "dns_image": "grs/bind9:latest",
+            "web_image": "grs/nginx:latest",
+        }
+        values.update(overrides)
+
+        return values
+
+    def test_structural_mode_is_used(self):
+        self.assertTrue(self.structural.structural)
+        self.assertFalse(self.textual.structural)
+        self.assertEqual(set(self._values()), self.structural.variables)
+
+    def test_tree_matches_a_fresh_parse(self):
+        for value in ["10.1.0.3", *_TRICKY_VALUES]:
+            for variable in sorted(self.structural.variables - {"teamname"}):
+                values = self._values(**{variable: value})
+
+                with self.subTest(variable=variable, value=value):
+                    self.assertEqual(
+                        self.structural._tree.render(values),
+                        yaml.safe_load(self.textual.render(values)),
+                    )
+
+    def test_structural_and_textual_manifests_are_equal(self):
+        for values in (
+            self._values(),
+            self._values(teamname="blue_team", subnet="10.2.16.0/20", web_ip="10.2.16.10"),
+            # as compiled to list the images of the template
+            {variable: 0 for variable in self.structural.variables},
+        ):
+            with self.subTest(values=values):
+                self.assertEqual(self.structural.compile(values), self.textual.compile(values))
+
+    def test_values_must_match_the_placeholders(self):
+        for template in (self.textual, self.structural):
+            with self.assertRaises(ManifestTemplateError):
+                template.compile({"teamname": "team1"})
+
+            with self.assertRaises(ManifestTemplateError):
+                template.compile(self._values(extra="x"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+"""
+Tests of Reconciler against a fake DockerEngineClient keeping networks and containers in memory.
+
+Run from the backend directory:
+
+    PYTHONPATH=src python -m unittest discover tests
+"""
+
+from typing import Optional
+import copy
+import unittest
+
+from engine.docker.reconciler import DEPLOYMENT_LABEL, Action, Reconciler
+from engine.models import CIDR, Deployment, Host, IPAddress, Network, Router
+
+
+class _FakeClient:
+    """Implements the DockerEngineClient methods used by the reconciler, and records the calls changing something."""
+
+    def __init__(self):
+        self.networks: dict[str, dict] = {}
+        self.containers: dict[str, dict] = {}
+        self.images: set[str] = set()
+        self.calls: list[tuple] = []
+
+    def add_network(self, name: str, subnet: str, labels: Optional[dict] = None):
+        self.networks[name] = {
+            "Name": name,
+            "IPAM": {"Config": [{"Subnet": subnet}]},
+            "Labels": labels or {},
+            "Containers": {},
+        }
+
+    def add_container(self, name: str, network: str, address: str, labels: Optional[dict] = None):
+        self.containers[name] = {"Names": [f"/{name}"], "Labels": labels or {}, "State": "running"}
+        self.networks[network]["Containers"][f"id-{name}"] = {"Name": name, "IPv4Address": f"{address}/24"}
+
+    def create_network(self, name, driver="bridge", subnet=None, gateway=None, internal=False, attachable=True, labels=None):
+        self.calls.append(("create_network", name))
+        self.add_network(name, subnet, labels)
+
+    def inspect_network(self, name):
+        return copy.deepcopy(self.networks.get(name))
+
+    def list_networks(self, labels=None):
+        return [
+            copy.deepcopy(network)
+            for network in self.networks.values()
+            if all(network["Labels"].get(key) == value for key, value in (labels or {}).items())
+        ]
+
+    def remove_network(self, name):
+        self.calls.append(("remove_network", name))
+        del self.networks[name]
+
+    def connect_network(self, network, container, ipv4_address=None):
+        self.calls.append(("connect_network", network, container, ipv4_address))
+        self.networks[network]["Containers"][container] = {"IPv4Address": f"{ipv4_address}/24" if ipv4_address else ""}
+
+    def disconnect_network(self, network, container, force=False):
+        self.calls.append(("disconnect_network", network, container))
+        del self.networks[network]["Containers"][container]
+
+    def create_container(self, name, spec):
+        self.calls.append(("create_container", name))
+        self.containers[name] = {"Names": [f"/{name}"], "Labels": spec["Labels"], "State": "created"}
+
+        network = spec["HostConfig"]["NetworkMode"]
+        address = spec["NetworkingConfig"]["EndpointsConfig"][network]["IPAMConfig"]["IPv4Address"]
+        self.networks[network]["Containers"][f"id-{name}"] = {"Name": name, "IPv4Address": f"{address}/24"}
+
+    def inspect_container(self, name):
+        return copy.deepcopy(self.containers.get(name))
+
+    def list_containers(self, labels=None):
+        return [
+            copy.deepcopy(container)
+            for container in self.containers.values()
+            if all(container["Labels"].get(key) == value for key, value in (labels or {}).items())
+        ]
+
+    def start_container(self, name):
+        self.calls.append(("start_container", name))
+        self.containers[name]["State"] = "running"
+
+    def remove_container(self, name, force=False):
+        self.calls.append(("remove_container", name))
+        del self.containers[name]
+
+        for network in self.networks.values():
+            network["Containers"].pop(f"id-{name}", None)
+
+    def image_exists(self, image):
+        return image in self.images
+
+    def pull_image(self, image):
+        self.calls.append(("pull_image", image))
+        self.images.add(image)
+
+
+def _deployment(cidr: str = "10.1.0.0/24", image: str = "alpine") -> Deployment:
+    network = Network("t_net", CIDR.from_string(cidr))
+    prefix = cidr.rsplit(".", 1)[0]
+    network.add_host(Router("router", "frr"), IPAddress.from_string(f"{prefix}.1"))
+    network.add_host(Host("web", image), IPAddress.from_string(f"{prefix}.10"))
+
+    return Deployment("t", network)
+
+
+class ReconcilerTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _FakeClient()
+        self.reconciler = Reconciler(self.client)
+
+    def deploy(self, deployment: Deployment):
+        plan = self.reconciler.plan(deployment)
+        self.reconciler.apply(plan)
+        self.client.calls.clear()
+
+        return plan
+
+    def test_creates_everything_from_scratch(self):
+        plan = self.reconciler.plan(_deployment())
+
+        self.assertEqual(
+            {(action.operation, action.kind, action.name) for action in plan.actions},
+            {
+                ("create", "network", "t_net"),
+                ("create", "container", "t_router"),
+                ("create", "container", "t_web"),
+            },
+        )
+
+        self.reconciler.apply(plan)
+
+        self.assertEqual(self.client.calls[0], ("create_network", "t_net"))
+        self.assertIn(("pull_image", "alpine"), self.client.calls)
+        self.assertEqual(self.client.containers["t_web"]["State"], "running")
+        self.assertEqual(self.client.networks["t_net"]["Labels"], {DEPLOYMENT_LABEL: "t"})
+
+    def test_up_to_date_deployment_has_an_empty_plan(self):
+        self.deploy(_deployment())
+
+        self.assertTrue(self.reconciler.plan(_deployment()).empty)
+
+    def test_changed_container_is_the_only_one_recreated(self):
+        self.deploy(_deployment())
+
+        plan = self.reconciler.plan(_deployment(image="nginx"))
+
+        self.assertEqual(plan.actions, [Action(operation="update", kind="container", name="t_web", reason="configuration changed")])
+
+        self.reconciler.apply(plan)
+
+        self.assertEqual(
+            self.client.calls,
+            [
+                ("remove_container", "t_web"),
+                ("pull_image", "nginx"),
+                ("create_container", "t_web"),
+                ("start_container", "t_web"),
+            ],
+        )
+
+    def test_stopped_container_is_started(self):
+        self.deploy(_deployment())
+        self.client.containers["t_web"]["State"] = "exited"
+
+        plan = self.reconciler.plan(_deployment())
+
+        self.assertEqual(plan.actions, [Action(operation="start", kind="container", name="t_web", reason="exited")])
+
+        self.reconciler.apply(plan)
+
+        self.assertEqual(self.client.calls, [("start_container", "t_web")])
+
+    def test_objects_no_longer_described_are_removed(self):
+        self.deploy(_deployment())
+        self.client.add_network("t_old", "10.2.0.0/24", {DEPLOYMENT_LABEL: "t"})
+        self.client.add_container("t_old_db", "t_old", "10.2.0.5", {DEPLOYMENT_LABEL: "t"})
+
+        plan = self.reconciler.plan(_deployment())
+
+        self.assertEqual(
+            plan.actions,
+            [
+                Action(operation="remove", kind="container", name="t_old_db"),
+                Action(operation="remove", kind="network", name="t_old"),
+            ],
+        )
+
+        self.reconciler.apply(plan)
+
+        self.assertEqual(set(self.client.networks), {"t_net"})
+        self.assertEqual(set(self.client.containers), {"t_router", "t_web"})
+
+    def test_unmanaged_network_is_a_conflict_and_nothing_is_changed(self):
+        self.client.add_network("t_net", "10.1.0.0/24")
+        self.client.containers["org_router"] = {"Names": ["/org_router"], "Labels": {}, "State": "running"}
+        self.client.networks["t_net"]["Containers"]["id-org_router"] = {"IPv4Address": "10.1.0.254/24"}
+
+        plan = self.reconciler.plan(_deployment())
+
+        self.assertEqual(
+            plan.of("network", "conflict", "update"),
+            [Action(operation="conflict", kind="network", name="t_net", reason="exists but is not managed by this deployment")],
+        )
+        self.assertIn("! network t_net", str(plan))
+
+        with self.assertRaisesRegex(ValueError, "t_net"):
+            self.reconciler.apply(plan)
+
+        self.assertEqual(self.client.calls, [])
+        self.assertIn("id-org_router", self.client.networks["t_net"]["Containers"])
+
+    def test_recreated_network_reconnects_foreign_containers(self):
+        self.deploy(_deployment())
+
+        # the organization router, deployed separately, is attached to the team network
+        self.client.containers["org_router"] = {"Names": ["/org_router"], "Labels": {}, "State": "running"}
+        self.client.connect_network("t_net", "id-org_router", "10.1.0.254")
+        self.client.calls.clear()
+
+        plan = self.reconciler.plan(_deployment("10.1.0.0/23"))
+
+        self.assertEqual(
+            {(action.operation, action.kind, action.name) for action in plan.actions},
+            {
+                ("update", "network", "t_net"),
+                ("update", "container", "t_router"),
+                ("update", "container", "t_web"),
+            },
+        )
+
+        self.reconciler.apply(plan)
+
+        self.assertIn(("disconnect_network", "t_net", "id-org_router"), self.client.calls)
+        self.assertIn(("connect_network", "t_net", "id-org_router", "10.1.0.254"), self.client.calls)
+        self.assertLess(
+            self.client.calls.index(("create_network", "t_net")),
+            self.client.calls.index(("connect_network", "t_net", "id-org_router", "10.1.0.254")),
+        )
+        self.assertEqual(self.client.networks["t_net"]["IPAM"]["Config"], [{"Subnet": "10.1.0.0/23"}])
+
+    def test_reconnected_container_gets_a_new_address_outside_the_new_subnet(self):
+        self.deploy(_deployment())
+        self.client.connect_network("t_net", "id-org_router", "10.1.0.254")
+        self.client.calls.clear()
+
+        self.reconciler.apply(self.reconciler.plan(_deployment("10.3.0.0/24")))
+
+        self.assertIn(("connect_network", "t_net", "id-org_router", None), self.client.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,8 @@ import type { RequestHandler } from '@sveltejs/kit';
 import { API_BASE_URL } from '$env/static/private';
 
 export const GET: RequestHandler = async ({ fetch }) => {
-	const endpoint = `${API_BASE_URL}/team/`
+	// every team, streamed page by page: without it, only the first page of the listing is returned
+	const endpoint = `${API_BASE_URL}/team/?stream=true`
 
 	return await fetch(endpoint);
 };
\ No newline at end of file